@@ -1,7 +1,14 @@
 from .routes import router as api_router
 from .auth_routes import router as auth_router
+from .analytics_routes import router as analytics_router
+from .export_routes import router as export_router
+from .metrics_routes import router as metrics_router, MetricsMiddleware
 
 __all__ = [
     'api_router',
-    'auth_router'
+    'auth_router',
+    'analytics_router',
+    'export_router',
+    'metrics_router',
+    'MetricsMiddleware'
 ]
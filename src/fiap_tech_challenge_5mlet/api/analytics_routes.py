@@ -0,0 +1,126 @@
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from ..models import TotalsResponse, RankingResponse, GrowthResponse
+from ..store.analytics import (
+    Aggregation,
+    Level,
+    growth,
+    ranking,
+    totals,
+    year_entity_matrix
+)
+from ..auth import require_token
+
+router = APIRouter(prefix="/analytics",
+                   tags=["Analytics"],
+                   dependencies=[Depends(require_token)])
+
+Dataset = Literal[
+    "producao",
+    "processamento",
+    "comercializacao",
+    "importacao",
+    "exportacao"
+]
+Metric = Literal["quantity", "quantity_kg", "value_usd"]
+
+
+# Create Endpoint: GET /analytics/{dataset}/totals
+@router.get("/{dataset}/totals", response_model=TotalsResponse)
+async def dataset_totals(
+    dataset: Dataset,
+    category: Optional[str] = None,
+    metric: Optional[Metric] = None,
+    level: Level = "item",
+    agg: Aggregation = "sum",
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> TotalsResponse:
+    """
+    Endpoint to aggregate a metric per product or country over a range of
+    years, computed from the Parquet store.
+
+    Args:
+        dataset (str): Dataset to aggregate.
+        category (Optional[str]): Only use this category (all when omitted).
+        metric (Optional[str]): value_usd or quantity_kg for importação and
+        exportação (default: value_usd), quantity for the others.
+        level (str): item (products) or subitem (subproducts).
+        agg (str): sum or mean over the years.
+        start_year (Optional[int]): First year, inclusive.
+        end_year (Optional[int]): Last year, inclusive.
+
+    Returns:
+        list[dict]: One aggregate per entity, largest first.
+    """
+    matrix = await run_in_threadpool(year_entity_matrix, dataset, category,
+                                     metric, level)
+    return totals(matrix, start_year, end_year, agg)
+
+
+# Create Endpoint: GET /analytics/{dataset}/ranking
+@router.get("/{dataset}/ranking", response_model=RankingResponse)
+async def dataset_ranking(
+    dataset: Dataset,
+    category: Optional[str] = None,
+    metric: Optional[Metric] = None,
+    level: Level = "item",
+    agg: Aggregation = "sum",
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    top: int = Query(10, ge=1, le=500),
+) -> RankingResponse:
+    """
+    Endpoint to rank products or countries by a metric over a range of
+    years (e.g. top 10 export destinations for espumantes).
+
+    Args:
+        dataset (str): Dataset to rank.
+        category (Optional[str]): Only use this category (all when omitted).
+        metric (Optional[str]): Metric to rank by.
+        level (str): item (products) or subitem (subproducts).
+        agg (str): sum or mean over the years.
+        start_year (Optional[int]): First year, inclusive.
+        end_year (Optional[int]): Last year, inclusive.
+        top (int): Number of entities to return.
+
+    Returns:
+        list[dict]: The top entities with their rank and value.
+    """
+    matrix = await run_in_threadpool(year_entity_matrix, dataset, category,
+                                     metric, level)
+    return ranking(matrix, start_year, end_year, agg, top)
+
+
+# Create Endpoint: GET /analytics/{dataset}/growth
+@router.get("/{dataset}/growth", response_model=GrowthResponse)
+async def dataset_growth(
+    dataset: Dataset,
+    category: Optional[str] = None,
+    metric: Optional[Metric] = None,
+    level: Level = "item",
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    entity: Optional[List[str]] = Query(None),
+) -> GrowthResponse:
+    """
+    Endpoint to compute the year-over-year change of a metric per product
+    or country.
+
+    Args:
+        dataset (str): Dataset to analyse.
+        category (Optional[str]): Only use this category (all when omitted).
+        metric (Optional[str]): Metric to compare.
+        level (str): item (products) or subitem (subproducts).
+        start_year (Optional[int]): First year, inclusive.
+        end_year (Optional[int]): Last year, inclusive.
+        entity (Optional[List[str]]): Only return these products/countries.
+
+    Returns:
+        list[dict]: Value, absolute delta and growth percentage per entity
+        and year.
+    """
+    matrix = await run_in_threadpool(year_entity_matrix, dataset, category,
+                                     metric, level)
+    return growth(matrix, start_year, end_year, entity)
@@ -0,0 +1,95 @@
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from ..scraper import page_validators
+from .page_query import PageQuery
+
+
+def _etag_matches(if_none_match: str, etag: Optional[str]) -> bool:
+    if etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = [tag.strip().removeprefix("W/")
+                  for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def _not_modified_since(if_modified_since: str,
+                        last_modified: Optional[str]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+        modified = parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return False
+    return modified <= since
+
+
+def _validators(dataset: str, year: int, category: Optional[str],
+                query: Optional[PageQuery]) -> dict[str, str]:
+    """
+    Returns the validators of the requested representation of a page: a
+    filtered or numeric response gets its own ETag, derived from the
+    page's.
+    """
+    headers = page_validators(dataset, year, category)
+    if query is not None and query != PageQuery() and "ETag" in headers:
+        headers["ETag"] = (f'"{headers["ETag"].strip(chr(34))}'
+                           f'-{query.variant()}"')
+    return headers
+
+
+def not_modified(request: Request, dataset: str, year: int,
+                 category: Optional[str] = None,
+                 query: Optional[PageQuery] = None) -> Optional[Response]:
+    """
+    Answers a conditional GET with 304 Not Modified when the client's copy
+    is current, before the page is loaded, parsed or serialized.
+
+    `If-None-Match` takes precedence over `If-Modified-Since`.
+
+    Args:
+        request (Request): The incoming request.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        query (Optional[PageQuery]): Filters, projection and pagination.
+
+    Returns:
+        Optional[Response]: A 304 response, or None if the full response
+        must be sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is None and if_modified_since is None:
+        return None
+
+    headers = _validators(dataset, year, category, query)
+    if if_none_match is not None:
+        matches = _etag_matches(if_none_match, headers.get("ETag"))
+    else:
+        matches = _not_modified_since(if_modified_since,
+                                      headers.get("Last-Modified"))
+
+    if matches:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def set_validators(response: Response, dataset: str, year: int,
+                   category: Optional[str] = None,
+                   query: Optional[PageQuery] = None) -> None:
+    """
+    Adds the `ETag` and `Last-Modified` headers of a page to a response.
+
+    Args:
+        response (Response): The response whose headers to update.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        query (Optional[PageQuery]): Filters, projection and pagination.
+    """
+    response.headers.update(_validators(dataset, year, category, query))
@@ -0,0 +1,59 @@
+import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from ..auth import require_token
+from ..export import FORMATS, stream_export
+
+router = APIRouter(tags=["Export"],
+                   dependencies=[Depends(require_token)])
+
+
+# Create Endpoint: GET /export
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_year: int = 1970,
+    end_year: Optional[int] = None,
+    datasets: Optional[List[Literal[
+        "producao",
+        "processamento",
+        "comercializacao",
+        "importacao",
+        "exportacao"
+    ]]] = Query(None),
+) -> StreamingResponse:
+    """
+    Endpoint to download every dataset, category and year in a range as
+    one NDJSON or CSV stream, with one row per product, subproduct,
+    country or total.
+
+    The response uses chunked transfer encoding: rows are sent as each
+    page is loaded, so clients can start consuming immediately. Pages
+    without data, or that could not be loaded, are skipped.
+
+    Args:
+        format (str): ndjson or csv.
+        start_year (int): First year, inclusive.
+        end_year (Optional[int]): Last year, inclusive (default: current
+        year).
+        datasets (Optional[List[str]]): Datasets to export (default: all).
+
+    Returns:
+        StreamingResponse: The rows, columns dataset, category, year, kind,
+        name, parent, quantity, unit and value_usd.
+
+    Raises:
+        HTTPException: If the year range is reversed.
+    """
+    end_year = end_year or datetime.date.today().year
+    if start_year > end_year:
+        raise HTTPException(status_code=400,
+                            detail="start_year must not be after end_year.")
+
+    filename = f"vitibrasil_{start_year}_{end_year}.{format}"
+    return StreamingResponse(
+        stream_export(start_year, end_year, datasets, format),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,147 @@
+import time
+
+from fastapi import APIRouter, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..auth import token_cache
+from ..metrics import REQUEST_LATENCY, Gauge, registry
+from ..scraper import (
+    CircuitBreaker,
+    fetch_flight,
+    load_flight,
+    negative_cache,
+    result_cache,
+    shared_cache,
+    upstream_breaker
+)
+from ..utils.parse_pool import parse_pool_stats
+
+router = APIRouter()
+
+
+def _cache_sizes() -> dict[tuple[str, ...], float]:
+    stats = result_cache.stats()
+    return {("result", "entries"): stats["entries"],
+            ("result", "bytes"): stats["bytes"],
+            ("negative", "entries"): negative_cache.stats()["entries"],
+            ("token", "entries"): token_cache.stats()["entries"]}
+
+
+def _token_lookups() -> dict[tuple[str, ...], float]:
+    stats = token_cache.stats()
+    return {("hit",): stats["hits"], ("miss",): stats["misses"]}
+
+
+def _circuit_state() -> dict[tuple[str, ...], float]:
+    state = upstream_breaker.stats()["state"]
+    return {(name,): float(name == state)
+            for name in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN,
+                         CircuitBreaker.HALF_OPEN)}
+
+
+def _circuit_counters() -> dict[tuple[str, ...], float]:
+    stats = upstream_breaker.stats()
+    return {(name,): stats[name]
+            for name in ("failures", "opened", "rejected")}
+
+
+def _single_flight() -> dict[tuple[str, ...], float]:
+    return {(flight, name): value
+            for flight, stats in (("fetch", fetch_flight.stats()),
+                                  ("load", load_flight.stats()))
+            for name, value in stats.items()}
+
+
+registry.register(Gauge(
+    "cache_size",
+    "Current size of the in-process caches.",
+    ("cache", "unit"),
+    _cache_sizes
+))
+registry.register(Gauge(
+    "token_cache_lookups",
+    "Verified-token cache lookups by outcome.",
+    ("outcome",),
+    _token_lookups
+))
+registry.register(Gauge(
+    "upstream_circuit_state",
+    "Embrapa circuit breaker state (1 for the current one).",
+    ("state",),
+    _circuit_state
+))
+registry.register(Gauge(
+    "upstream_circuit",
+    "Embrapa circuit breaker counters: consecutive failures, times opened "
+    "and requests failed fast.",
+    ("counter",),
+    _circuit_counters
+))
+registry.register(Gauge(
+    "single_flight",
+    "Coalescing of concurrent page fetches (fetch) and page loads (load): "
+    "leader calls, callers that waited for a leader, and calls in flight.",
+    ("flight", "counter"),
+    _single_flight
+))
+registry.register(Gauge(
+    "parse_pool",
+    "Parse process pool counters (all 0 while the pool is disabled).",
+    ("counter",),
+    lambda: {(name,): value for name, value in parse_pool_stats().items()}
+))
+if shared_cache is not None:
+    registry.register(Gauge(
+        "shared_cache_errors",
+        "Failed calls to the shared cache server.",
+        (),
+        lambda: {(): shared_cache.stats()["errors"]}
+    ))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of every HTTP request, labeled by
+    method, route template (e.g. "/exportacao") and status code.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started, scope["method"],
+                getattr(route, "path", "unmatched"), str(status)
+            )
+
+
+# Create Endpoint: GET /metrics
+@router.get("/metrics", tags=["Monitoring"])
+def metrics() -> Response:
+    """
+    Endpoint exposing the service metrics in the Prometheus text format.
+
+    Returns:
+        Response: Latency histograms per route and per pipeline stage,
+        cache and upstream counters.
+    """
+    return Response(registry.render(),
+                    media_type="text/plain; version=0.0.4; charset=utf-8")
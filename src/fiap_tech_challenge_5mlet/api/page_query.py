@@ -0,0 +1,253 @@
+import bisect
+import hashlib
+import unicodedata
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+from fastapi import HTTPException, Query
+
+from ..store.parquet_store import (
+    QUANTITY_FIELDS,
+    TRADE_DATASETS,
+    parse_quantity
+)
+
+
+@dataclass(frozen=True)
+class PageQuery:
+    """
+    Filters, projection, sorting and pagination requested for a page.
+
+    `names` and `prefix` match the country (trade datasets) or product
+    (other datasets): `names` exactly as written on the page, `prefix`
+    ignoring case and accents. `sort` is a field name, prefixed with "-"
+    for descending order. `numeric` asks for integer quantities instead of
+    pt-BR strings (product datasets only).
+    """
+    names: tuple[str, ...] = ()
+    prefix: Optional[str] = None
+    fields: tuple[str, ...] = ()
+    sort: Optional[str] = None
+    limit: Optional[int] = None
+    offset: int = 0
+    min_quantity: Optional[float] = None
+    min_value_usd: Optional[float] = None
+    numeric: bool = False
+
+    def is_empty(self) -> bool:
+        """
+        Whether the full page was requested, in either representation.
+        """
+        return replace(self, numeric=False) == PageQuery()
+
+    def variant(self) -> str:
+        """
+        Returns a short stable digest of the query, used to tell the
+        representations of a page apart (e.g. in ETags).
+        """
+        return hashlib.blake2b(repr(self).encode("utf-8"),
+                               digest_size=8).hexdigest()
+
+
+def _split_fields(fields: Optional[str]) -> tuple[str, ...]:
+    if not fields:
+        return ()
+    return tuple(f.strip() for f in fields.split(",") if f.strip())
+
+
+def trade_query(
+    country: Optional[List[str]] = Query(
+        None, description="Countries to keep (exact, case- and "
+                          "accent-sensitive match, repeatable)."),
+    country_prefix: Optional[str] = Query(
+        None, description="Keep countries starting with this text, "
+                          "ignoring case and accents."),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. "
+                          "country,value_usd."),
+    sort: Optional[str] = Query(
+        None, description="Sort field, '-' prefix for descending, e.g. "
+                          "-value_usd."),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    min_quantity: Optional[float] = Query(
+        None, description="Keep rows with quantity_kg at least this."),
+    min_value_usd: Optional[float] = Query(
+        None, description="Keep rows with value_usd at least this."),
+) -> PageQuery:
+    """
+    Query parameters of the country-level endpoints (importação and
+    exportação).
+    """
+    return PageQuery(tuple(country or ()), country_prefix,
+                     _split_fields(fields), sort, limit, offset,
+                     min_quantity, min_value_usd)
+
+
+def product_query(
+    product: Optional[List[str]] = Query(
+        None, description="Products to keep (exact, case- and "
+                          "accent-sensitive match, repeatable)."),
+    product_prefix: Optional[str] = Query(
+        None, description="Keep products starting with this text, "
+                          "ignoring case and accents."),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. "
+                          "product,subproducts."),
+    sort: Optional[str] = Query(
+        None, description="Sort field, '-' prefix for descending, e.g. "
+                          "-quantity_liters."),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    min_quantity: Optional[float] = Query(
+        None, description="Keep products with a quantity at least this."),
+    numeric: bool = Query(
+        False, description="Return quantities as integers (null for '-') "
+                           "instead of pt-BR strings."),
+) -> PageQuery:
+    """
+    Query parameters of the product-level endpoints (produção,
+    processamento and comercialização).
+    """
+    return PageQuery(tuple(product or ()), product_prefix,
+                     _split_fields(fields), sort, limit, offset,
+                     min_quantity, numeric=numeric)
+
+
+def _normalize(text: str) -> str:
+    """
+    Folds case and accents, so "sao" matches "São".
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed
+                   if not unicodedata.combining(c)).strip()
+
+
+class PageIndex:
+    """
+    Lookup structures over the rows of a validated page, built once per
+    page so queries do not rescan names or re-parse quantities.
+
+    Totals (the "Total" country and the `total_overall` block) are not
+    indexed: filtered responses list matching rows only.
+    """
+
+    def __init__(self, dataset: str, rows: list[dict]):
+        trade = dataset in TRADE_DATASETS
+        self.name_field = "country" if trade else "product"
+        self.quantity_field = ("quantity_kg" if trade
+                               else QUANTITY_FIELDS[dataset])
+        self.fields = ((self.name_field, self.quantity_field, "value_usd")
+                       if trade else
+                       (self.name_field, self.quantity_field, "subproducts"))
+
+        self.rows = [row for row in rows
+                     if self.name_field in row
+                     and not (trade and row[self.name_field] == "Total")]
+
+        self._by_name: dict[str, list[int]] = {}
+        for i, row in enumerate(self.rows):
+            self._by_name.setdefault(row[self.name_field], []).append(i)
+        keys = [_normalize(row[self.name_field]) for row in self.rows]
+        self._sorted_keys = sorted((key, i) for i, key in enumerate(keys))
+
+        self._numbers = {self.quantity_field: [
+            self._number(row[self.quantity_field]) for row in self.rows
+        ]}
+        if trade:
+            self._numbers["value_usd"] = [row["value_usd"]
+                                          for row in self.rows]
+
+        # Ascending row orders per sortable field, missing values last
+        self._orders = {self.name_field: [i for _, i in self._sorted_keys]}
+        self._missing: dict[str, list[int]] = {}
+        for field, numbers in self._numbers.items():
+            present = sorted((n, i) for i, n in enumerate(numbers)
+                             if n is not None)
+            self._orders[field] = [i for _, i in present]
+            self._missing[field] = [i for i, n in enumerate(numbers)
+                                    if n is None]
+
+    @staticmethod
+    def _number(value) -> Optional[float]:
+        if value is None or isinstance(value, (int, float)):
+            return value
+        return parse_quantity(value)
+
+    def _validate(self, query: PageQuery) -> None:
+        unknown = [f for f in query.fields if f not in self.fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=(f"Unknown field(s): {', '.join(unknown)}. "
+                        f"Choose from: {', '.join(self.fields)}.")
+            )
+        if query.sort and query.sort.lstrip("-") not in self._orders:
+            raise HTTPException(
+                status_code=400,
+                detail=(f"Cannot sort by '{query.sort.lstrip('-')}'. "
+                        f"Choose from: {', '.join(self._orders)}.")
+            )
+
+    def _candidates(self, query: PageQuery) -> list[int]:
+        if query.names:
+            found = set()
+            for name in query.names:
+                found.update(self._by_name.get(name, ()))
+            candidates = sorted(found)
+        else:
+            candidates = list(range(len(self.rows)))
+
+        if query.prefix:
+            prefix = _normalize(query.prefix)
+            start = bisect.bisect_left(self._sorted_keys, (prefix, -1))
+            matches = set()
+            for key, i in self._sorted_keys[start:]:
+                if not key.startswith(prefix):
+                    break
+                matches.add(i)
+            candidates = [i for i in candidates if i in matches]
+
+        for field, minimum in ((self.quantity_field, query.min_quantity),
+                               ("value_usd", query.min_value_usd)):
+            if minimum is not None and field in self._numbers:
+                numbers = self._numbers[field]
+                candidates = [i for i in candidates
+                              if numbers[i] is not None
+                              and numbers[i] >= minimum]
+        return candidates
+
+    def query(self, query: PageQuery) -> list[dict]:
+        """
+        Answers a query over the page.
+
+        Args:
+            query (PageQuery): Filters, projection, sort and pagination.
+
+        Returns:
+            list[dict]: The matching rows, projected to the requested
+            fields.
+
+        Raises:
+            HTTPException: If a field or sort key does not exist for the
+                dataset.
+        """
+        self._validate(query)
+        candidates = self._candidates(query)
+
+        if query.sort:
+            field = query.sort.lstrip("-")
+            wanted = set(candidates)
+            order = self._orders[field]
+            if query.sort.startswith("-"):
+                order = order[::-1]
+            order = order + self._missing.get(field, [])
+            candidates = [i for i in order if i in wanted]
+
+        end = None if query.limit is None else query.offset + query.limit
+        rows = [self.rows[i] for i in candidates[query.offset:end]]
+
+        if query.fields:
+            rows = [{f: row[f] for f in query.fields if f in row}
+                    for row in rows]
+        return rows
@@ -0,0 +1,283 @@
+import json
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # installed with the fast-json extra
+    orjson = None
+
+from ..config import settings
+from ..metrics import CACHE_EVENTS, stage_timer
+from ..models.multi_year import YearError
+from ..scraper.result_cache import (
+    CacheKey,
+    index_cache,
+    make_key,
+    numeric_key,
+    response_cache,
+    typed_cache
+)
+from ..utils.typed_page import TypedPage
+from .page_query import PageIndex, PageQuery
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def _encode(adapter: TypeAdapter, value: Any) -> bytes:
+    """
+    Encodes a validated value with the configured JSON encoder.
+    """
+    if settings.json_encoder == "orjson" and orjson is not None:
+        return orjson.dumps(adapter.dump_python(value, by_alias=True))
+    return adapter.dump_json(value, by_alias=True)
+
+
+def render_json(model: Any, data: Any, dataset: str) -> bytes:
+    """
+    Validates a payload against its response model and encodes it, timing
+    both stages separately.
+
+    Args:
+        model (Any): The response model (a pydantic type or annotation).
+        data (Any): The payload returned by the scraper.
+        dataset (str): Dataset label for the stage timings.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    adapter = _adapter(model)
+    with stage_timer("validation", dataset):
+        value = adapter.validate_python(data)
+    with stage_timer("serialization", dataset):
+        return _encode(adapter, value)
+
+
+def _encode_rows(rows: list[dict]) -> bytes:
+    """
+    Encodes rows that were already validated.
+    """
+    if settings.json_encoder == "orjson" and orjson is not None:
+        return orjson.dumps(rows)
+    return json.dumps(rows, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def json_response(model: Any, data: Any, dataset: str) -> Response:
+    """
+    Builds a JSON response from a payload validated against its response
+    model. Data endpoints return this response directly, so FastAPI does
+    not validate the payload a second time.
+
+    Args:
+        model (Any): The response model.
+        data (Any): The payload returned by the scraper.
+        dataset (str): Dataset label for the stage timings.
+
+    Returns:
+        Response: The JSON response.
+    """
+    return Response(render_json(model, data, dataset),
+                    media_type="application/json")
+
+
+def cached_page_response(dataset: str, year: int,
+                         category: Optional[str] = None,
+                         query: Optional[PageQuery] = None
+                         ) -> Optional[Response]:
+    """
+    Returns the response of a page from its already encoded body (or, for
+    a filtered request, from its query index), skipping the result cache
+    and validation.
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        query (Optional[PageQuery]): Filters, projection, pagination and
+            representation.
+
+    Returns:
+        Optional[Response]: The JSON response, or None if the page has not
+        been encoded (or indexed) yet.
+    """
+    key = _key(dataset, year, category, query)
+    if query is not None and not query.is_empty():
+        with stage_timer("cache_lookup", dataset):
+            index = index_cache.get(key)
+        CACHE_EVENTS.inc(dataset, "index",
+                         "miss" if index is None else "hit")
+        if index is None:
+            return None
+        return Response(_query_body(index, dataset, query),
+                        media_type="application/json")
+
+    with stage_timer("cache_lookup", dataset):
+        body = response_cache.get(key)
+    CACHE_EVENTS.inc(dataset, "response", "miss" if body is None else "hit")
+    if body is None:
+        return None
+    return Response(body, media_type="application/json")
+
+
+def page_index(model: Any, data: Any, dataset: str, year: int,
+               category: Optional[str] = None,
+               numeric: bool = False) -> PageIndex:
+    """
+    Returns the query index of a page, validating its rows and building the
+    index only the first time.
+
+    Args:
+        model (Any): The single-year response model.
+        data (Any): The page's parsed payload.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        numeric (bool): Index the numeric representation of the page.
+
+    Returns:
+        PageIndex: The index.
+    """
+    key = make_key(dataset, year, category)
+    index_key = numeric_key(key) if numeric else key
+    index = index_cache.get(index_key)
+    if index is None:
+        if numeric:
+            data = typed_page(key, data).to_rows()
+        adapter = _adapter(model)
+        with stage_timer("validation", dataset):
+            rows = adapter.dump_python(adapter.validate_python(data),
+                                       by_alias=True)
+        index = PageIndex(dataset, rows)
+        index_cache.set(index_key, index)
+    return index
+
+
+def typed_page(key: CacheKey, data: list[dict]) -> TypedPage:
+    """
+    Returns the typed copy of a product page, building it only the first
+    time.
+
+    Args:
+        key (CacheKey): The (dataset, category, year) key of the page.
+        data (list[dict]): The page's parsed payload.
+
+    Returns:
+        TypedPage: The typed page.
+    """
+    page = typed_cache.get(key)
+    if page is None:
+        page = TypedPage.from_rows(key[0], data)
+        typed_cache.set(key, page)
+    return page
+
+
+def _key(dataset: str, year: int, category: Optional[str],
+         query: Optional[PageQuery]) -> tuple:
+    key = make_key(dataset, year, category)
+    if query is not None and query.numeric:
+        return numeric_key(key)
+    return key
+
+
+def _query_body(index: PageIndex, dataset: str, query: PageQuery) -> bytes:
+    rows = index.query(query)
+    with stage_timer("serialization", dataset):
+        return _encode_rows(rows)
+
+
+def _body(model: Any, data: Any, dataset: str, year: int,
+          category: Optional[str], query: Optional[PageQuery]) -> bytes:
+    numeric = query is not None and query.numeric
+    if query is None or query.is_empty():
+        return page_body(model, data, dataset, year, category, numeric)
+    index = page_index(model, data, dataset, year, category, numeric)
+    return _query_body(index, dataset, query)
+
+
+def page_body(model: Any, data: Any, dataset: str, year: int,
+              category: Optional[str] = None,
+              numeric: bool = False) -> bytes:
+    """
+    Returns the encoded JSON of a page, validating and encoding it only the
+    first time.
+
+    Args:
+        model (Any): The single-year response model.
+        data (Any): The page's parsed payload.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        numeric (bool): Encode the numeric representation of the page.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    key = make_key(dataset, year, category)
+    body_key = numeric_key(key) if numeric else key
+    body = response_cache.get(body_key)
+    if body is None:
+        if numeric:
+            data = typed_page(key, data).to_rows()
+        body = render_json(model, data, dataset)
+        response_cache.set(body_key, body)
+    return body
+
+
+def page_response(model: Any, data: Any, dataset: str, year: int,
+                  category: Optional[str] = None,
+                  query: Optional[PageQuery] = None) -> Response:
+    """
+    Builds the JSON response of a page and keeps its encoded body (or query
+    index) for `cached_page_response`.
+
+    Args:
+        model (Any): The single-year response model.
+        data (Any): The page's parsed payload.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        query (Optional[PageQuery]): Filters, projection and pagination.
+
+    Returns:
+        Response: The JSON response.
+    """
+    return Response(_body(model, data, dataset, year, category, query),
+                    media_type="application/json")
+
+
+def multi_year_response(model: Any, result: dict, dataset: str,
+                        category: Optional[str] = None,
+                        query: Optional[PageQuery] = None) -> Response:
+    """
+    Builds a multi-year response from the encoded bodies of its pages, so
+    each year is validated and encoded once and reused across ranges.
+
+    Args:
+        model (Any): The single-year response model.
+        result (dict): The output of `get_multi_year_data`.
+        dataset (str): Dataset name.
+        category (Optional[str]): Category, for datasets that have one.
+        query (Optional[PageQuery]): Filters, projection and pagination,
+            applied to each year.
+
+    Returns:
+        Response: The JSON response, shaped as a `MultiYearResponse`.
+    """
+    years = b",".join(
+        b'{"year":%d,"data":%s}' % (
+            item["year"],
+            _body(model, item["data"], dataset, item["year"], category,
+                  query)
+        )
+        for item in result["years"]
+    )
+    errors = render_json(List[YearError], result["errors"], dataset)
+    return Response(b'{"years":[' + years + b'],"errors":' + errors + b"}",
+                    media_type="application/json")
@@ -1,27 +1,170 @@
-from fastapi import APIRouter, Depends
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
-from typing import Literal
+from typing import Any, Callable, List, Literal, Optional, Union
+from ..config import settings
 from ..scraper import (
-    get_comercializacao_data,
-    get_processamento_data,
-    get_producao_data,
-    get_exportacao_data,
-    get_importacao_data
+    route_deadline_seconds,
+    start_deadline,
+    get_comercializacao_data_async,
+    get_processamento_data_async,
+    get_producao_data_async,
+    get_exportacao_data_async,
+    get_importacao_data_async,
+    get_multi_year_data
 )
 from ..models import (
     ComercializacaoResponse,
     ProducaoResponse,
     ProcessamentoResponse,
     ExportacaoResponse,
-    ImportacaoResponse
+    ImportacaoResponse,
+    ComercializacaoMultiYearResponse,
+    ProducaoMultiYearResponse,
+    ProcessamentoMultiYearResponse,
+    ExportacaoMultiYearResponse,
+    ImportacaoMultiYearResponse,
+    ComercializacaoNumericResponse,
+    ProducaoNumericResponse,
+    ProcessamentoNumericResponse,
+    ComercializacaoNumericMultiYearResponse,
+    ProducaoNumericMultiYearResponse,
+    ProcessamentoNumericMultiYearResponse
 )
 from ..auth import (
     require_token
 )
+from .conditional import not_modified, set_validators
+from .page_query import PageQuery, product_query, trade_query
+from .rendering import (
+    cached_page_response,
+    multi_year_response,
+    page_response
+)
 
 router = APIRouter()
 
 
+def route_deadline(route: str) -> Callable:
+    """
+    Builds a dependency starting the time budget of a data route's request
+    (`settings.request_deadline_seconds` or the route's override).
+
+    Args:
+        route (str): Route name, the key in
+            `settings.request_deadline_by_route`.
+
+    Returns:
+        Callable: The dependency.
+    """
+    # Async, so the deadline is set in the request's own context rather
+    # than in a threadpool copy of it
+    async def start() -> None:
+        start_deadline(route_deadline_seconds(route))
+    return start
+
+
+def _requested_years(start_year: Optional[int], end_year: Optional[int],
+                     years: Optional[List[int]]) -> Optional[List[int]]:
+    """
+    Resolves the multi-year query parameters of a data endpoint.
+
+    Args:
+        start_year (Optional[int]): First year of a range, inclusive.
+        end_year (Optional[int]): Last year of a range, inclusive.
+        years (Optional[List[int]]): Explicit list of years.
+
+    Returns:
+        Optional[List[int]]: The years to retrieve, or None for a
+        single-year request.
+
+    Raises:
+        HTTPException: If the range is incomplete, reversed or too long.
+    """
+    if years:
+        requested = sorted(set(years))
+    elif start_year is not None or end_year is not None:
+        if start_year is None or end_year is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Both start_year and end_year are required."
+            )
+        if start_year > end_year:
+            raise HTTPException(
+                status_code=400,
+                detail="start_year must not be greater than end_year."
+            )
+        requested = list(range(start_year, end_year + 1))
+    else:
+        return None
+
+    if len(requested) > settings.multi_year_max_years:
+        raise HTTPException(
+            status_code=400,
+            detail=(f"At most {settings.multi_year_max_years} years can be "
+                    "requested at once.")
+        )
+    return requested
+
+
+def _cached_response(request: Request, dataset: str, year: int,
+                     category: Optional[str],
+                     query: PageQuery) -> Optional[Response]:
+    """
+    Answers a single-year request from the caches: a 304 when the client's
+    copy is current, or the already encoded page. Blocking (SQLite lookups
+    of the page's validators), so routes run it in the threadpool.
+
+    Args:
+        request (Request): The incoming request.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        query (PageQuery): Filters, projection and pagination.
+
+    Returns:
+        Optional[Response]: The response, or None if the page must be
+        loaded first.
+    """
+    response = not_modified(request, dataset, year, category, query=query)
+    if response is not None:
+        return response
+    response = cached_page_response(dataset, year, category, query=query)
+    if response is not None:
+        set_validators(response, dataset, year, category, query=query)
+    return response
+
+
+def _fresh_response(model: Any, data: Any, dataset: str, year: int,
+                    category: Optional[str], query: PageQuery) -> Response:
+    """
+    Validates, encodes and caches a freshly loaded page, with its
+    validators. Blocking, so routes run it in the threadpool.
+
+    Args:
+        model (Any): The single-year response model.
+        data (Any): The page's parsed payload.
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        query (PageQuery): Filters, projection and pagination.
+
+    Returns:
+        Response: The JSON response.
+    """
+    response = page_response(model, data, dataset, year, category,
+                             query=query)
+    set_validators(response, dataset, year, category, query=query)
+    return response
+
+
 @router.get("/",
             response_class=HTMLResponse,
             tags=["Root"])
@@ -69,31 +212,73 @@ def read_root():
 
 # Create Endpoint: GET /comercializacao
 @router.get("/comercializacao",
-            response_model=ComercializacaoResponse,
+            response_model=Union[ComercializacaoResponse,
+                                 ComercializacaoMultiYearResponse,
+                                 ComercializacaoNumericResponse,
+                                 ComercializacaoNumericMultiYearResponse],
             tags=["Comercialização"],
-            dependencies=[Depends(require_token)])
-def comercializacao(year: int = 2023) -> ComercializacaoResponse:
+            dependencies=[Depends(require_token),
+                          Depends(route_deadline("comercializacao"))])
+async def comercializacao(
+    request: Request,
+    year: int = 2023,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    years: Optional[List[int]] = Query(None),
+    query: PageQuery = Depends(product_query),
+) -> Union[ComercializacaoResponse, ComercializacaoMultiYearResponse]:
     """
     Endpoint to retrieve parsed 'Comercialização' data from Embrapa for a
     given year.
 
     Args:
+        request (Request): Used to honor If-None-Match/If-Modified-Since.
         year (int): The year for which to fetch and return data
         for comercialização.
+        start_year (Optional[int]): First year of a range, inclusive.
+        end_year (Optional[int]): Last year of a range, inclusive.
+        years (Optional[List[int]]): Explicit years to retrieve. Multi-year
+        requests return one entry per year plus per-year errors.
+        query (PageQuery): Filters, field projection, sort, pagination and
+        numeric output, applied to each year.
 
     Returns:
         list[dict]: A list of structured comercialização data including
         products and subproducts.
     """
-    return get_comercializacao_data(year)
+    model = (ComercializacaoNumericResponse if query.numeric
+             else ComercializacaoResponse)
+    requested = _requested_years(start_year, end_year, years)
+    if requested is not None:
+        data = await get_multi_year_data("comercializacao", requested)
+        return await run_in_threadpool(
+            multi_year_response, model, data, "comercializacao",
+            query=query
+        )
+
+    response = await run_in_threadpool(
+        _cached_response, request, "comercializacao", year, None, query
+    )
+    if response is None:
+        data = await get_comercializacao_data_async(year)
+        response = await run_in_threadpool(
+            _fresh_response, model, data, "comercializacao", year, None,
+            query
+        )
+    return response
 
 
 # Creat Endpoint: GET /processamento
 @router.get("/processamento",
-            response_model=ProcessamentoResponse,
+            response_model=Union[ProcessamentoResponse,
+                                 ProcessamentoMultiYearResponse,
+                                 ProcessamentoNumericResponse,
+                                 ProcessamentoNumericMultiYearResponse],
             tags=["Processamento"],
-            dependencies=[Depends(require_token)])
-def processamento(
+            dependencies=[Depends(require_token),
+                          Depends(route_deadline("processamento"))])
+async def processamento(
+    request: Request,
     year: int = 2023,
     category: Literal[
         "viniferas",
@@ -101,51 +286,118 @@ def processamento(
         "uvas_de_mesa",
         "sem_classificacao"
     ] = "viniferas",
-) -> ProcessamentoResponse:
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    years: Optional[List[int]] = Query(None),
+    query: PageQuery = Depends(product_query),
+) -> Union[ProcessamentoResponse, ProcessamentoMultiYearResponse]:
     """
     Endpoint to retrieve parsed 'Processamento' data from Embrapa
     for a given year and category.
 
     Args:
+        request (Request): Used to honor If-None-Match/If-Modified-Since.
         year (int): The year of data to retrieve.
         category (str): The category to filter by (viniferas,
                                                    americanas_hibridas,
                                                    uvas_de_mesa,
                                                    sem_classificacao)
+        start_year (Optional[int]): First year of a range, inclusive.
+        end_year (Optional[int]): Last year of a range, inclusive.
+        years (Optional[List[int]]): Explicit years to retrieve. Multi-year
+        requests return one entry per year plus per-year errors.
+        query (PageQuery): Filters, field projection, sort, pagination and
+        numeric output, applied to each year.
 
     Returns:
         list[dict]: Structured processamento data for the specified year
         category
     """
-    return get_processamento_data(year, category)
+    model = (ProcessamentoNumericResponse if query.numeric
+             else ProcessamentoResponse)
+    requested = _requested_years(start_year, end_year, years)
+    if requested is not None:
+        data = await get_multi_year_data("processamento", requested, category)
+        return await run_in_threadpool(
+            multi_year_response, model, data, "processamento", category,
+            query=query
+        )
+
+    response = await run_in_threadpool(
+        _cached_response, request, "processamento", year, category, query
+    )
+    if response is None:
+        data = await get_processamento_data_async(year, category)
+        response = await run_in_threadpool(
+            _fresh_response, model, data, "processamento", year, category,
+            query
+        )
+    return response
 
 
 # Create Endpoint: GET /producao
 @router.get("/producao",
-            response_model=ProducaoResponse,
+            response_model=Union[ProducaoResponse,
+                                 ProducaoMultiYearResponse,
+                                 ProducaoNumericResponse,
+                                 ProducaoNumericMultiYearResponse],
             tags=["Produção"],
-            dependencies=[Depends(require_token)])
-def producao(year: int = 2023) -> ProducaoResponse:
+            dependencies=[Depends(require_token),
+                          Depends(route_deadline("producao"))])
+async def producao(
+    request: Request,
+    year: int = 2023,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    years: Optional[List[int]] = Query(None),
+    query: PageQuery = Depends(product_query),
+) -> Union[ProducaoResponse, ProducaoMultiYearResponse]:
     """
     Endpoint to retrieve parsed 'Produção' data from Embrapa
     for a given year.
 
     Args:
+        request (Request): Used to honor If-None-Match/If-Modified-Since.
         year (int): The year of data to retrieve
+        start_year (Optional[int]): First year of a range, inclusive.
+        end_year (Optional[int]): Last year of a range, inclusive.
+        years (Optional[List[int]]): Explicit years to retrieve. Multi-year
+        requests return one entry per year plus per-year errors.
+        query (PageQuery): Filters, field projection, sort, pagination and
+        numeric output, applied to each year.
 
     Returns:
         list[dict]: Structured produção data for the
         specified year.
     """
-    return get_producao_data(year)
+    model = ProducaoNumericResponse if query.numeric else ProducaoResponse
+    requested = _requested_years(start_year, end_year, years)
+    if requested is not None:
+        data = await get_multi_year_data("producao", requested)
+        return await run_in_threadpool(
+            multi_year_response, model, data, "producao", query=query
+        )
+
+    response = await run_in_threadpool(
+        _cached_response, request, "producao", year, None, query
+    )
+    if response is None:
+        data = await get_producao_data_async(year)
+        response = await run_in_threadpool(
+            _fresh_response, model, data, "producao", year, None, query
+        )
+    return response
 
 
 # Create Endpoint: GET /exportacao
 @router.get("/exportacao",
-            response_model=ExportacaoResponse,
+            response_model=Union[ExportacaoResponse,
+                                 ExportacaoMultiYearResponse],
             tags=["Exportação"],
-            dependencies=[Depends(require_token)])
-def exportacao(
+            dependencies=[Depends(require_token),
+                          Depends(route_deadline("exportacao"))])
+async def exportacao(
+    request: Request,
     year: int = 2023,
     category: Literal[
         "vinhos_de_mesa",
@@ -153,31 +405,62 @@ def exportacao(
         "uvas_frescas",
         "suco_de_uva"
     ] = "vinhos_de_mesa",
-) -> ExportacaoResponse:
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    years: Optional[List[int]] = Query(None),
+    query: PageQuery = Depends(trade_query),
+) -> Union[ExportacaoResponse, ExportacaoMultiYearResponse]:
     """
     Endpoint to retrieve parsed 'Exportação' data from Embrapa
     for a given year and category.
 
     Args:
+        request (Request): Used to honor If-None-Match/If-Modified-Since.
         year (int): The year of data to retrieve.
         category (str): The category to filter by (vinhos_de_mesa,
                                                    espumantes,
                                                    uvas_frescas,
                                                    suco_de_uva)
+        start_year (Optional[int]): First year of a range, inclusive.
+        end_year (Optional[int]): Last year of a range, inclusive.
+        years (Optional[List[int]]): Explicit years to retrieve. Multi-year
+        requests return one entry per year plus per-year errors.
+        query (PageQuery): Filters, field projection, sort and pagination,
+        applied to each year.
 
     Returns:
         list[dict]: Structured exportação data for the specified year
         and category.
     """
-    return get_exportacao_data(year, category)
+    requested = _requested_years(start_year, end_year, years)
+    if requested is not None:
+        data = await get_multi_year_data("exportacao", requested, category)
+        return await run_in_threadpool(
+            multi_year_response, ExportacaoResponse, data, "exportacao",
+            category, query=query
+        )
+
+    response = await run_in_threadpool(
+        _cached_response, request, "exportacao", year, category, query
+    )
+    if response is None:
+        data = await get_exportacao_data_async(year, category)
+        response = await run_in_threadpool(
+            _fresh_response, ExportacaoResponse, data, "exportacao", year,
+            category, query
+        )
+    return response
 
 
 # Create Endpoint: GET /importacao
 @router.get("/importacao",
-            response_model=ImportacaoResponse,
+            response_model=Union[ImportacaoResponse,
+                                 ImportacaoMultiYearResponse],
             tags=["Importação"],
-            dependencies=[Depends(require_token)])
-def importacao(
+            dependencies=[Depends(require_token),
+                          Depends(route_deadline("importacao"))])
+async def importacao(
+    request: Request,
     year: int = 2023,
     category: Literal[
         "vinhos_de_mesa",
@@ -186,21 +469,49 @@ def importacao(
         "uvas_passas",
         "suco_de_uva"
     ] = "vinhos_de_mesa",
-) -> ImportacaoResponse:
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    years: Optional[List[int]] = Query(None),
+    query: PageQuery = Depends(trade_query),
+) -> Union[ImportacaoResponse, ImportacaoMultiYearResponse]:
     """
     Endpoint to retrieve parsed 'Importação' data from Embrapa
     for a given year and category.
 
     Args:
+        request (Request): Used to honor If-None-Match/If-Modified-Since.
         year (int): The year of data to retrieve.
         category (str): The category to filter by (vinhos_de_mesa,
                                                    espumantes,
                                                    uvas_frescas,
                                                    uvas_passas,
                                                    suco_de_uva)
+        start_year (Optional[int]): First year of a range, inclusive.
+        end_year (Optional[int]): Last year of a range, inclusive.
+        years (Optional[List[int]]): Explicit years to retrieve. Multi-year
+        requests return one entry per year plus per-year errors.
+        query (PageQuery): Filters, field projection, sort and pagination,
+        applied to each year.
 
     Returns:
         list[dict]: Structured importação data for the specified year
         and category.
     """
-    return get_importacao_data(year, category)
+    requested = _requested_years(start_year, end_year, years)
+    if requested is not None:
+        data = await get_multi_year_data("importacao", requested, category)
+        return await run_in_threadpool(
+            multi_year_response, ImportacaoResponse, data, "importacao",
+            category, query=query
+        )
+
+    response = await run_in_threadpool(
+        _cached_response, request, "importacao", year, category, query
+    )
+    if response is None:
+        data = await get_importacao_data_async(year, category)
+        response = await run_in_threadpool(
+            _fresh_response, ImportacaoResponse, data, "importacao", year,
+            category, query
+        )
+    return response
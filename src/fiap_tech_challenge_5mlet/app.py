@@ -1,5 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .api import api_router, auth_router
+from fastapi.concurrency import run_in_threadpool
+from .api import (
+    api_router,
+    auth_router,
+    analytics_router,
+    export_router,
+    metrics_router,
+    MetricsMiddleware
+)
+from .scraper import close_async_client, load_year_catalog
+from .utils.parse_pool import shutdown_parse_pool, start_parse_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the parse workers (if enabled) before the first request
+    await run_in_threadpool(start_parse_pool)
+    # Learn the valid years from the cached pages
+    await run_in_threadpool(load_year_catalog)
+    yield
+    # Release pooled upstream connections on shutdown
+    await close_async_client()
+    await run_in_threadpool(shutdown_parse_pool)
+
 
 app = FastAPI(
     title="FIAP Tech Challenge 5MLET",
@@ -7,9 +31,15 @@ app = FastAPI(
     description=(
         "FastAPI application to retrieve and serve data from "
         "Vitivinicultura Embrapa"
-    )
+    ),
+    lifespan=lifespan
 )
 
 
 app.include_router(auth_router)
 app.include_router(api_router)
+app.include_router(analytics_router)
+app.include_router(export_router)
+app.include_router(metrics_router)
+
+app.add_middleware(MetricsMiddleware)
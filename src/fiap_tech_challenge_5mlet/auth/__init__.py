@@ -1,7 +1,13 @@
-from .jwt_handler import require_token, authenticate_user, create_token
+from .jwt_handler import (
+    require_token,
+    authenticate_user,
+    create_token,
+    token_cache
+)
 
 __all__ = [
     'require_token',
     'authenticate_user',
-    'create_token'
+    'create_token',
+    'token_cache'
 ]
@@ -3,10 +3,18 @@ import datetime
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from ..config import settings
+from .token_cache import TokenCache
 
 # HTTPBearer scheme
 security = HTTPBearer()
 
+# Payloads of already verified tokens, so a reused token skips the signature
+# check
+token_cache = TokenCache(
+    max_entries=settings.token_cache_max_entries,
+    max_ttl_seconds=settings.token_cache_max_ttl_seconds
+)
+
 
 def create_token(username: str) -> str:
     """
@@ -33,6 +41,8 @@ def require_token(
 ):
     """
     FastAPI dependency to validate JWT token from Authorization header.
+    Tokens verified before are served from the token cache until they
+    expire.
 
     Args:
         credentials (HTTPAuthorizationCredentials): The bearer token.
@@ -47,9 +57,14 @@ def require_token(
     if not token:
         raise HTTPException(status_code=401, detail="Missing token")
 
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.jwt_secret_key,
                              algorithms=[settings.jwt_algorithm])
+        token_cache.set(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
@@ -0,0 +1,586 @@
+"""
+Benchmarks over the saved Embrapa pages in `cache/`.
+
+Measures the throughput (pages/s) and allocations of every parser, with each
+table extraction backend, the memory needed to hold the full history of the
+product datasets as parsed pages and as typed pages, and the end-to-end
+latency of the data endpoints through the FastAPI app at several concurrency
+levels, with a cold cache (pages fetched from a local stand-in upstream and
+parsed) and a warm one. Results are saved as JSON so runs can be compared
+between commits.
+
+Usage:
+    poetry run benchmark --output benchmarks/main.json
+    poetry run benchmark --compare benchmarks/main.json
+"""
+import argparse
+import asyncio
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import httpx
+
+from .config import PROJECT_ROOT, settings
+from .utils import (
+    parse_comercializacao,
+    parse_exportacao,
+    parse_importacao,
+    parse_processamento,
+    parse_producao
+)
+from .utils.table_extractor import BACKENDS
+from .utils.typed_page import QUANTITY_FIELDS, TypedPage
+
+PARSERS: dict[str, Callable[[str], list[dict]]] = {
+    "producao": parse_producao,
+    "processamento": parse_processamento,
+    "comercializacao": parse_comercializacao,
+    "importacao": parse_importacao,
+    "exportacao": parse_exportacao
+}
+
+
+@dataclass
+class Fixture:
+    """
+    A saved Embrapa page, identified from its cache filename.
+    """
+    dataset: str
+    category: Optional[str]
+    year: int
+    filename: str
+    html: str
+
+
+def load_fixtures(fixtures_dir: str) -> list[Fixture]:
+    """
+    Loads every saved page named `<dataset>[_<category>]_<year>.html`.
+
+    Args:
+        fixtures_dir (str): Directory of the saved pages.
+
+    Returns:
+        list[Fixture]: The pages, sorted by filename.
+    """
+    fixtures = []
+    for filename in sorted(os.listdir(fixtures_dir)):
+        stem, extension = os.path.splitext(filename)
+        dataset, _, rest = stem.partition("_")
+        category, _, year = rest.rpartition("_")
+        if extension != ".html" or dataset not in PARSERS \
+                or not year.isdigit():
+            continue
+        with open(os.path.join(fixtures_dir, filename), encoding="utf-8") \
+                as f:
+            fixtures.append(Fixture(dataset, category or None, int(year),
+                                    filename, f.read()))
+    return fixtures
+
+
+def _parses(fixture: Fixture) -> bool:
+    """
+    Whether a saved page holds a data table its parser accepts. Some saved
+    pages are empty tabs (e.g. a year Embrapa has no data for).
+    """
+    try:
+        return bool(PARSERS[fixture.dataset](fixture.html))
+    except Exception:
+        return False
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1,
+                max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def bench_parsers(fixtures: list[Fixture], backends: list[str],
+                  min_seconds: float) -> list[dict]:
+    """
+    Measures each parser over its pages with each extraction backend.
+
+    Args:
+        fixtures (list[Fixture]): The saved pages.
+        backends (list[str]): Table extraction backends to compare.
+        min_seconds (float): Minimum timing duration per parser/backend.
+
+    Returns:
+        list[dict]: Pages/s, time per page and allocation peaks.
+    """
+    results = []
+    original_backend = settings.html_parser_backend
+    try:
+        for backend in backends:
+            settings.html_parser_backend = backend
+            for dataset, parse in PARSERS.items():
+                pages = [f.html for f in fixtures
+                         if f.dataset == dataset and _parses(f)]
+                if not pages:
+                    continue
+
+                # Allocations: peak Python heap while parsing one page
+                # (tracemalloc does not see libxml2's own allocations)
+                peaks = []
+                tracemalloc.start()
+                for html in pages:
+                    tracemalloc.reset_peak()
+                    before = tracemalloc.get_traced_memory()[0]
+                    parse(html)
+                    peaks.append(tracemalloc.get_traced_memory()[1] - before)
+                tracemalloc.stop()
+
+                parsed = 0
+                started = time.perf_counter()
+                while time.perf_counter() - started < min_seconds:
+                    for html in pages:
+                        parse(html)
+                    parsed += len(pages)
+                elapsed = time.perf_counter() - started
+
+                results.append({
+                    "parser": parse.__name__,
+                    "backend": backend,
+                    "pages": len(pages),
+                    "pages_per_second": parsed / elapsed,
+                    "ms_per_page": elapsed / parsed * 1000,
+                    "peak_alloc_bytes_mean": statistics.mean(peaks),
+                    "peak_alloc_bytes_max": max(peaks)
+                })
+    finally:
+        settings.html_parser_backend = original_backend
+    return results
+
+
+def _retained(build: Callable[[], object]) -> tuple[object, int]:
+    """
+    Runs `build` and returns its result with the Python heap it keeps
+    alive once temporaries are freed.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        return value, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(fixtures: list[Fixture], start_year: int,
+                 end_year: int) -> list[dict]:
+    """
+    Measures the memory needed to hold the full history of each product
+    dataset (every category and year in the range) in RAM, as parsed pages
+    (dicts of pt-BR strings) and as `TypedPage`s. Years without a saved
+    page reuse the saved pages of the dataset in turn, so the row counts
+    match a real history.
+
+    Args:
+        fixtures (list[Fixture]): The saved pages.
+        start_year (int): First year of the history, inclusive.
+        end_year (int): Last year of the history, inclusive.
+
+    Returns:
+        list[dict]: Pages, rows and retained bytes per representation.
+    """
+    from .scraper.datasets import DATASETS
+
+    results = []
+    for dataset in QUANTITY_FIELDS:
+        pages = [f.html for f in fixtures
+                 if f.dataset == dataset and _parses(f)]
+        if not pages:
+            continue
+        parse = PARSERS[dataset]
+        count = (len(DATASETS[dataset].category_keys())
+                 * (end_year - start_year + 1))
+        history = [pages[i % len(pages)] for i in range(count)]
+
+        parsed, parsed_bytes = _retained(
+            lambda: [parse(html) for html in history])
+        rows = sum(len(TypedPage.from_rows(dataset, data))
+                   for data in parsed)
+        del parsed
+        _, typed_bytes = _retained(
+            lambda: [TypedPage.from_rows(dataset, parse(html))
+                     for html in history])
+
+        results.append({
+            "dataset": dataset,
+            "pages": count,
+            "rows": rows,
+            "parsed_bytes": parsed_bytes,
+            "typed_bytes": typed_bytes,
+            "ratio": typed_bytes / parsed_bytes
+        })
+    return results
+
+
+def _endpoint_url(fixture: Fixture) -> str:
+    url = f"/{fixture.dataset}?year={fixture.year}"
+    if fixture.category is not None:
+        url += f"&category={fixture.category}"
+    return url
+
+
+def _servable(fixtures: list[Fixture]) -> list[Fixture]:
+    """
+    Keeps the pages an endpoint can serve: a known category and a non-empty
+    table.
+    """
+    from .scraper import DATASETS
+
+    servable = []
+    for fixture in fixtures:
+        categories = DATASETS[fixture.dataset].categories
+        if (fixture.category is None) != (categories is None):
+            continue
+        if categories is not None and fixture.category not in categories:
+            continue
+        if _parses(fixture):
+            servable.append(fixture)
+    return servable
+
+
+async def _run_requests(client: httpx.AsyncClient, urls: list[str],
+                        concurrency: int, headers: dict) -> tuple:
+    """
+    Sends the requests with at most `concurrency` in flight.
+
+    Returns:
+        tuple: Latencies in seconds, number of non-200 responses and the
+        wall-clock duration.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(url: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(url) for url in urls))
+    return latencies, errors, time.perf_counter() - started
+
+
+def _latency_summary(scenario: str, concurrency: int, latencies: list,
+                     errors: int, elapsed: float) -> dict:
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p90_ms": _percentile(latencies, 90) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000
+    }
+
+
+async def bench_endpoints(fixtures: list[Fixture], fixtures_dir: str,
+                          concurrency_levels: list[int],
+                          requests_per_level: int,
+                          upstream_delay: float = 0.0) -> list[dict]:
+    """
+    Measures the data endpoints through the app, in-process, against a
+    local stand-in upstream serving the saved pages.
+
+    - cold: page and result caches are emptied before each pass over the
+      pages, so every request fetches from the stand-in and parses.
+    - warm: every page is loaded once, then requests are served from the
+      in-process result cache.
+
+    Args:
+        fixtures (list[Fixture]): The saved pages.
+        fixtures_dir (str): Directory served by the stand-in upstream.
+        concurrency_levels (list[int]): Concurrent requests to test.
+        requests_per_level (int): Requests per scenario and level.
+        upstream_delay (float): Artificial latency of the stand-in.
+
+    Returns:
+        list[dict]: Throughput and latency percentiles per scenario and
+        concurrency level.
+    """
+    from .app import app
+    from .auth import create_token
+    from .scraper import (
+        LocalUpstreamServer,
+        close_async_client,
+        make_cache_backend,
+        set_cache_backend
+    )
+
+    # The scraper package exports the cache object under the module's name
+    result_cache_module = importlib.import_module(".scraper.result_cache",
+                                                  __package__)
+
+    urls = [_endpoint_url(f) for f in _servable(fixtures)]
+    if not urls:
+        return []
+
+    headers = {"Authorization": f"Bearer {create_token('benchmark')}"}
+    scratch = tempfile.mkdtemp(prefix="benchmark-cache-")
+    original = (settings.embrapa_base_url, settings.data_source,
+                result_cache_module.shared_cache)
+
+    def reset_caches(run: int) -> None:
+        result_cache_module.clear_caches()
+        set_cache_backend(make_cache_backend(
+            cache_dir=os.path.join(scratch, str(run))
+        ))
+
+    results = []
+    upstream = LocalUpstreamServer(fixtures_dir,
+                                   delay_seconds=upstream_delay).start()
+    try:
+        settings.embrapa_base_url = upstream.base_url
+        settings.data_source = "html"
+        result_cache_module.shared_cache = None
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport,
+                                     base_url="http://benchmark") as client:
+            run = 0
+            for concurrency in concurrency_levels:
+                # Cold: each pass requests every page once on empty caches
+                latencies, errors, elapsed = [], 0, 0.0
+                while len(latencies) < requests_per_level:
+                    run += 1
+                    reset_caches(run)
+                    batch = await _run_requests(client, urls, concurrency,
+                                                headers)
+                    latencies += batch[0]
+                    errors += batch[1]
+                    elapsed += batch[2]
+                results.append(_latency_summary("cold", concurrency,
+                                                latencies, errors, elapsed))
+
+                # Warm: caches primed, requests cycle over the pages
+                run += 1
+                reset_caches(run)
+                await _run_requests(client, urls, concurrency, headers)
+                warm_urls = [urls[i % len(urls)]
+                             for i in range(requests_per_level)]
+                latencies, errors, elapsed = await _run_requests(
+                    client, warm_urls, concurrency, headers
+                )
+                results.append(_latency_summary("warm", concurrency,
+                                                latencies, errors, elapsed))
+        await close_async_client()
+    finally:
+        upstream.stop()
+        (settings.embrapa_base_url, settings.data_source,
+         result_cache_module.shared_cache) = original
+        result_cache_module.clear_caches()
+        set_cache_backend(None)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(fixtures_dir: Optional[str] = None,
+        backends: Optional[list[str]] = None,
+        concurrency_levels: tuple[int, ...] = (1, 8, 32),
+        requests_per_level: int = 200, min_seconds: float = 1.0,
+        upstream_delay: float = 0.0, parsers: bool = True,
+        endpoints: bool = True, memory: bool = True,
+        history: tuple[int, int] = (1970, 2023)) -> dict:
+    """
+    Runs the benchmarks.
+
+    Args:
+        fixtures_dir (Optional[str]): Directory of the saved pages. Defaults
+            to `settings.cache_dir`.
+        backends (Optional[list[str]]): Extraction backends for the parser
+            benchmark. Defaults to every available backend.
+        concurrency_levels (tuple[int, ...]): Concurrency levels for the
+            endpoint benchmark.
+        requests_per_level (int): Requests per scenario and level.
+        min_seconds (float): Minimum timing duration per parser/backend.
+        upstream_delay (float): Artificial latency of the stand-in upstream.
+        parsers (bool): Run the parser benchmark.
+        endpoints (bool): Run the endpoint benchmark.
+        memory (bool): Run the memory benchmark.
+        history (tuple[int, int]): First and last year of the history held
+            in RAM by the memory benchmark.
+
+    Returns:
+        dict: Run metadata and the results of each benchmark.
+    """
+    fixtures_dir = fixtures_dir or settings.cache_dir
+    fixtures = load_fixtures(fixtures_dir)
+    backends = backends or list(BACKENDS)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.datetime.now(
+                datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixtures": len(fixtures),
+            "cache_backend": settings.cache_backend,
+            "upstream_delay_seconds": upstream_delay
+        },
+        "parsers": [],
+        "memory": [],
+        "endpoints": []
+    }
+    if parsers:
+        report["parsers"] = bench_parsers(fixtures, backends, min_seconds)
+    if memory:
+        report["memory"] = bench_memory(fixtures, *history)
+    if endpoints:
+        report["endpoints"] = asyncio.run(bench_endpoints(
+            fixtures, fixtures_dir, list(concurrency_levels),
+            requests_per_level, upstream_delay
+        ))
+    return report
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """
+    Lines comparing a run with a baseline run, as current/baseline ratios
+    (above 1 is faster for throughput, slower for latency).
+
+    Args:
+        current (dict): The new report.
+        baseline (dict): The reference report.
+
+    Returns:
+        list[str]: Human-readable comparison lines.
+    """
+    lines = []
+    previous = {(r["parser"], r["backend"]): r for r in baseline["parsers"]}
+    for row in current["parsers"]:
+        ref = previous.get((row["parser"], row["backend"]))
+        if ref:
+            lines.append(
+                f"{row['parser']:<24} {row['backend']:<5} pages/s "
+                f"{row['pages_per_second']:9.1f} "
+                f"x{row['pages_per_second'] / ref['pages_per_second']:.2f}"
+            )
+
+    previous = {r["dataset"]: r for r in baseline.get("memory", [])}
+    for row in current.get("memory", []):
+        ref = previous.get(row["dataset"])
+        if ref:
+            lines.append(
+                f"{row['dataset']:<24} typed "
+                f"{row['typed_bytes'] / 1024:9.1f} KiB "
+                f"x{row['typed_bytes'] / ref['typed_bytes']:.2f}"
+            )
+
+    previous = {(r["scenario"], r["concurrency"]): r
+                for r in baseline["endpoints"]}
+    for row in current["endpoints"]:
+        ref = previous.get((row["scenario"], row["concurrency"]))
+        if ref:
+            lines.append(
+                f"{row['scenario']:<5} c={row['concurrency']:<3} p99 "
+                f"{row['p99_ms']:8.2f}ms x{row['p99_ms'] / ref['p99_ms']:.2f}"
+                f"  req/s {row['requests_per_second']:8.1f} "
+                f"x{row['requests_per_second']
+                    / ref['requests_per_second']:.2f}"
+            )
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parsers and endpoints on saved pages."
+    )
+    parser.add_argument("--fixtures-dir", default=None,
+                        help="Saved pages (default: CACHE_DIR).")
+    parser.add_argument("--output", default=None,
+                        help="JSON report path (default: "
+                             "benchmarks/<commit>.json).")
+    parser.add_argument("--compare", default=None,
+                        help="Baseline JSON report to compare with.")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS))
+    parser.add_argument("--concurrency", nargs="+", type=int,
+                        default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per scenario and concurrency level.")
+    parser.add_argument("--min-seconds", type=float, default=1.0,
+                        help="Minimum timing duration per parser.")
+    parser.add_argument("--upstream-delay", type=float, default=0.0,
+                        help="Artificial stand-in upstream latency (sec).")
+    parser.add_argument("--skip-parsers", action="store_true")
+    parser.add_argument("--skip-endpoints", action="store_true")
+    parser.add_argument("--skip-memory", action="store_true")
+    parser.add_argument("--history", nargs=2, type=int, default=[1970, 2023],
+                        metavar=("START_YEAR", "END_YEAR"),
+                        help="Years held in RAM by the memory benchmark.")
+    args = parser.parse_args(argv)
+
+    report = run(args.fixtures_dir, args.backends, tuple(args.concurrency),
+                 args.requests, args.min_seconds, args.upstream_delay,
+                 not args.skip_parsers, not args.skip_endpoints,
+                 not args.skip_memory, tuple(args.history))
+
+    for row in report["parsers"]:
+        print(f"[BENCH] {row['parser']:<24} {row['backend']:<5} "
+              f"{row['pages_per_second']:9.1f} pages/s "
+              f"peak {row['peak_alloc_bytes_max'] / 1024:8.1f} KiB")
+    for row in report["memory"]:
+        print(f"[BENCH] {row['dataset']:<24} {row['pages']} pages "
+              f"parsed {row['parsed_bytes'] / 1024:8.1f} KiB "
+              f"typed {row['typed_bytes'] / 1024:8.1f} KiB "
+              f"({row['ratio']:.0%})")
+    for row in report["endpoints"]:
+        print(f"[BENCH] {row['scenario']:<5} c={row['concurrency']:<3} "
+              f"{row['requests_per_second']:8.1f} req/s "
+              f"p50 {row['p50_ms']:7.2f}ms p99 {row['p99_ms']:7.2f}ms "
+              f"errors {row['errors']}")
+
+    output = args.output or os.path.join(
+        PROJECT_ROOT, "benchmarks", f"{report['meta']['commit'] or 'run'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Saved {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for line in compare(report, baseline):
+            print(f"[BENCH] {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,17 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 import os
 
+# Repository root, so cache and store paths do not depend on the process CWD
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "..")
+)
+
 
 class Settings(BaseSettings):
     """
-    Loads and validates environment variables for JWT settings
-    and test credentials.
+    Loads and validates environment variables for JWT settings,
+    test credentials, caching and the upstream HTTP client.
     Automatically reads from a '.env' file at the project root.
     """
     jwt_secret_key: str
@@ -14,9 +20,103 @@ class Settings(BaseSettings):
     test_username: str
     test_password: str
 
+    # Cache of verified tokens (0 entries disables it)
+    token_cache_max_entries: int = 1024
+    token_cache_max_ttl_seconds: int = 3600
+
+    # In-memory cache of parsed results
+    result_cache_max_entries: int = 512
+    result_cache_ttl_seconds: int = 3600
+    result_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Pages without data, answered with a 404 from memory until they expire
+    # (recent years are checked again sooner, as Embrapa fills them in)
+    negative_cache_max_entries: int = 4096
+    negative_cache_ttl_recent_seconds: int = 3600
+    negative_cache_ttl_historical_seconds: int = 7 * 24 * 3600
+
+    # Encoded JSON bodies of single-year responses, validated once
+    response_cache_max_entries: int = 512
+    response_cache_max_bytes: int = 32 * 1024 * 1024
+    # JSON encoder for response bodies: "pydantic" or "orjson" (optional)
+    json_encoder: str = "pydantic"
+
+    # Optional shared (second-tier) cache of parsed results in a Redis
+    # protocol server, e.g. "redis://localhost:6379/0"
+    shared_cache_url: Optional[str] = None
+    shared_cache_ttl_seconds: int = 86400
+    shared_cache_prefix: str = "vitibrasil"
+    shared_cache_timeout_seconds: float = 0.5
+    shared_cache_retry_seconds: float = 30
+
+    # Page cache: "sqlite" (indexed database) or "files" (one HTML file per
+    # page). Loose HTML files in cache_dir are imported by the SQLite backend.
+    cache_backend: str = "sqlite"
+    cache_dir: str = os.path.join(PROJECT_ROOT, "cache")
+    cache_db_path: Optional[str] = None  # Defaults to <cache_dir>/cache.db
+
+    # Freshness of cached pages (stale pages are served and refreshed in the
+    # background)
+    cache_recent_years: int = 2
+    cache_ttl_recent_seconds: int = 24 * 3600
+    cache_ttl_recent_by_dataset: dict[str, int] = {}
+    cache_ttl_historical_seconds: int = 30 * 24 * 3600
+    cache_refresh_workers: int = 2
+    cache_refresh_retry_seconds: int = 300
+
+    # HTML table extraction backend: "auto" (lxml), "lxml" or "bs4"
+    html_parser_backend: str = "auto"
+
+    # Process pool for the parse stage (0 parses on the request threads).
+    # Pages beyond workers + queue size wait up to the timeout, then get 503
+    parse_workers: int = 0
+    parse_queue_size: int = 32
+    parse_queue_timeout_seconds: float = 10
+    parse_start_method: str = "spawn"
+
+    # Data source for the endpoints: "html" (scraper) or "parquet" (store)
+    data_source: str = "html"
+    parquet_store_dir: str = os.path.join(PROJECT_ROOT, "store")
+    analytics_cache_ttl_seconds: int = 3600
+
+    # How often each dataset's year range is re-read from Embrapa
+    year_catalog_refresh_seconds: int = 24 * 3600
+
+    # Multi-year queries
+    multi_year_max_years: int = 60
+    multi_year_concurrency: int = 8
+
+    # Upstream (Embrapa) HTTP client
+    embrapa_base_url: str = "http://vitibrasil.cnpuv.embrapa.br/index.php"
+    # Per-tab CSV downloads, an alternative ingest source
+    embrapa_download_url: str = "http://vitibrasil.cnpuv.embrapa.br/download"
+    upstream_timeout_seconds: float = 30
+    upstream_max_connections: int = 20
+    upstream_max_keepalive_connections: int = 10
+    upstream_keepalive_expiry_seconds: float = 30
+    upstream_max_concurrency_per_host: int = 4
+    # Circuit breaker: consecutive failures before failing fast (0 turns it
+    # off), how long to fail fast and how many probes test the upstream then
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30
+    circuit_half_open_probes: int = 1
+    # Retries of failed requests (network errors, timeouts, 5xx), with
+    # exponential backoff and full jitter
+    upstream_max_attempts: int = 3
+    upstream_backoff_base_seconds: float = 0.25
+    upstream_backoff_max_seconds: float = 4
+    # Send a second request when the first has not answered after this long
+    # (async fetches only; 0 turns hedging off)
+    upstream_hedge_after_seconds: float = 0
+
+    # Time budget of a data request (0 for none), overridable per route
+    # (e.g. {"exportacao": 5}). Fetches, retries and parse queueing stop
+    # when it runs out
+    request_deadline_seconds: float = 20
+    request_deadline_by_route: dict[str, float] = {}
+
     class Config:
-        env_file = os.path.join(os.path.dirname(os.path.dirname(__file__)),
-                                "..", ".env")
+        env_file = os.path.join(PROJECT_ROOT, ".env")
 
 
 settings = Settings()
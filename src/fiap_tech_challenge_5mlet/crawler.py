@@ -0,0 +1,221 @@
+"""
+Bulk cache warm-up for the Embrapa pages.
+
+Crawls every dataset, category and year in a range with a bounded pool of
+worker threads. Failed requests are retried by the fetcher itself (see
+`settings.upstream_max_attempts`), and the crawl stops early when the
+upstream circuit opens. Pages that are already in the page cache are
+skipped, so an interrupted crawl resumes where it stopped when run again.
+
+Usage:
+    poetry run warm-cache --start-year 1970 --end-year 2023 --workers 8
+"""
+import argparse
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from .scraper import (
+    DATASETS,
+    CacheBackend,
+    CircuitOpenError,
+    fetch_or_cache,
+    get_cache_backend,
+    make_cache_backend
+)
+
+
+@dataclass(frozen=True)
+class CrawlTask:
+    dataset: str
+    category: Optional[str]
+    year: int
+    url: str
+    cache_filename: str
+
+
+@dataclass
+class CrawlReport:
+    """
+    Outcome of a crawl: counts per status and the tasks that failed.
+    """
+    total: int = 0
+    fetched: int = 0
+    skipped: int = 0
+    failed: list[CrawlTask] = field(default_factory=list)
+    stopped: bool = False
+    elapsed_seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.fetched / self.elapsed_seconds \
+            if self.elapsed_seconds else 0.0
+
+
+def build_tasks(start_year: int, end_year: int,
+                datasets: Optional[Iterable[str]] = None) -> list[CrawlTask]:
+    """
+    Lists every (dataset, category, year) page in the range.
+
+    Args:
+        start_year (int): First year, inclusive.
+        end_year (int): Last year, inclusive.
+        datasets (Optional[Iterable[str]]): Dataset names to crawl. Defaults
+            to all of them.
+
+    Returns:
+        list[CrawlTask]: One task per page.
+    """
+    tasks = []
+    for name in datasets or DATASETS:
+        dataset = DATASETS[name]
+        for category in dataset.category_keys():
+            for year in range(start_year, end_year + 1):
+                url, cache_filename = dataset.build_request(
+                    *dataset.args(year, category)
+                )
+                tasks.append(CrawlTask(name, category, year, url,
+                                       cache_filename))
+    return tasks
+
+
+def _fetch_page(task: CrawlTask, backend: CacheBackend,
+                stop: threading.Event) -> bool:
+    """
+    Fetches one page into the cache, unless the crawl has stopped. The
+    fetcher retries failed requests itself.
+
+    Returns:
+        bool: Whether the page was fetched (False once stopped).
+
+    Raises:
+        RuntimeError: If the page could not be fetched. `CircuitOpenError`
+            also stops the crawl.
+    """
+    if stop.is_set():
+        return False
+    try:
+        fetch_or_cache(task.url, task.cache_filename, backend)
+    except CircuitOpenError:
+        stop.set()
+        raise
+    return True
+
+
+def crawl(start_year: int, end_year: int,
+          datasets: Optional[Iterable[str]] = None,
+          cache_dir: Optional[str] = None, workers: int = 8,
+          verbose: bool = True) -> CrawlReport:
+    """
+    Warms the cache with every page in the range.
+
+    Args:
+        start_year (int): First year, inclusive.
+        end_year (int): Last year, inclusive.
+        datasets (Optional[Iterable[str]]): Dataset names to crawl. Defaults
+            to all of them.
+        cache_dir (Optional[str]): Cache directory, holding the database of
+            the SQLite backend. Defaults to the configured page cache.
+        workers (int): Maximum number of concurrent fetches.
+        verbose (bool): Print progress and throughput.
+
+    Returns:
+        CrawlReport: Counts of fetched, skipped and failed pages. When the
+        upstream circuit opened, `stopped` is set and the pages not
+        fetched yet are counted as failed.
+    """
+    backend = (make_cache_backend(cache_dir=cache_dir) if cache_dir
+               else get_cache_backend())
+    tasks = build_tasks(start_year, end_year, datasets)
+    report = CrawlReport(total=len(tasks))
+
+    # Resume: pages already cached are not fetched again
+    cached = set(backend.keys())
+    pending = []
+    for task in tasks:
+        if task.cache_filename in cached:
+            report.skipped += 1
+        else:
+            pending.append(task)
+
+    if verbose:
+        print(f"[CRAWL] {report.total} pages, {report.skipped} already "
+              f"cached, {len(pending)} to fetch with {workers} workers")
+
+    lock = threading.Lock()
+    stop = threading.Event()
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fetch_page, task, backend, stop): task
+            for task in pending
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            task = futures[future]
+            try:
+                if not future.result():
+                    # Not attempted: the crawl had stopped
+                    with lock:
+                        report.failed.append(task)
+                    continue
+                status = "ok"
+                with lock:
+                    report.fetched += 1
+            except RuntimeError as e:
+                status = "FAILED"
+                with lock:
+                    report.failed.append(task)
+                if isinstance(e, CircuitOpenError) and not report.stopped:
+                    # Embrapa keeps failing: back off instead of sending
+                    # the rest of the crawl at it
+                    report.stopped = True
+                    if verbose:
+                        print(f"[CRAWL] Stopping: {e}. Run again later to "
+                              "resume.")
+
+            report.elapsed_seconds = time.monotonic() - started
+            if verbose:
+                print(f"[CRAWL] {done}/{len(pending)} {task.dataset} "
+                      f"{task.category or '-'} {task.year} {status} "
+                      f"({report.pages_per_second:.1f} pages/s)")
+
+    report.elapsed_seconds = time.monotonic() - started
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Warm the Embrapa page cache for a range of years."
+    )
+    parser.add_argument("--start-year", type=int, default=1970)
+    parser.add_argument("--end-year", type=int,
+                        default=datetime.date.today().year)
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS),
+                        help="Datasets to crawl (default: all).")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Cache directory (default: CACHE_DIR).")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    report = crawl(args.start_year, args.end_year, args.datasets,
+                   args.cache_dir, args.workers)
+
+    print(f"[CRAWL] Done in {report.elapsed_seconds:.1f}s: "
+          f"{report.fetched} fetched, {report.skipped} skipped, "
+          f"{len(report.failed)} failed "
+          f"({report.pages_per_second:.1f} pages/s)")
+    for task in report.failed:
+        print(f"[CRAWL] Failed: {task.url}")
+
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+"""
+Bulk export of every dataset, category and year as NDJSON or CSV.
+
+Pages are loaded a few at a time (from the caches, the Parquet store or
+Embrapa), flattened into rows and encoded as they arrive, so memory stays
+bounded by the pages in flight whatever the year range. Served by
+`GET /export` and the `export` command.
+
+Usage:
+    poetry run export --format csv --start-year 1970 --end-year 2023 \\
+        --output vitibrasil.csv
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import datetime
+import io
+import json
+import sys
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from fastapi import HTTPException
+
+from .config import settings
+from .crawler import CrawlTask, build_tasks
+from .scraper import DATASETS, close_async_client
+from .utils.typed_page import QUANTITY_FIELDS, parse_quantity
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+# One row per product, subproduct, country or total, for every dataset
+COLUMNS = ("dataset", "category", "year", "kind", "name", "parent",
+           "quantity", "unit", "value_usd")
+
+
+@dataclass
+class ExportReport:
+    """
+    Pages exported so far, and those skipped because they have no data
+    (404) or could not be loaded.
+    """
+    exported: int = 0
+    rows: int = 0
+    missing: int = 0
+    failed: int = 0
+
+
+def page_rows(dataset: str, category: Optional[str], year: int,
+              data: list[dict]) -> Iterator[dict]:
+    """
+    Flattens a parsed page into export rows.
+
+    Product datasets yield "item", "subitem" and "total" rows with integer
+    quantities (None for "-"); importação and exportação yield one
+    "country" row per country plus their "total" row.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        category (Optional[str]): Category, for datasets that have one.
+        year (int): Year of the page.
+        data (list[dict]): Output of the dataset's parser.
+
+    Yields:
+        dict: One row with the keys in `COLUMNS`.
+    """
+    def row(kind, name, parent, quantity, unit, value_usd=None) -> dict:
+        return {"dataset": dataset, "category": category, "year": year,
+                "kind": kind, "name": name, "parent": parent,
+                "quantity": quantity, "unit": unit, "value_usd": value_usd}
+
+    if dataset not in QUANTITY_FIELDS:
+        for item in data:
+            kind = "total" if item["country"] == "Total" else "country"
+            yield row(kind, item["country"], None, item["quantity_kg"], "kg",
+                      item["value_usd"])
+        return
+
+    field = QUANTITY_FIELDS[dataset]
+    unit = field.removeprefix("quantity_")
+    for item in data:
+        if "total_overall" in item:
+            yield row("total", None, None,
+                      parse_quantity(item["total_overall"]), unit)
+            continue
+        yield row("item", item["product"], None,
+                  parse_quantity(item[field]), unit)
+        for sub in item["subproducts"]:
+            yield row("subitem", sub["product"], item["product"],
+                      parse_quantity(sub[field]), unit)
+
+
+def encode_ndjson(rows: Iterable[dict]) -> bytes:
+    """
+    Encodes rows as newline-delimited JSON.
+    """
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n"
+                   for row in rows).encode("utf-8")
+
+
+def encode_csv(rows: Iterable[dict], header: bool = False) -> bytes:
+    """
+    Encodes rows as CSV lines, with None as an empty field.
+
+    Args:
+        rows (Iterable[dict]): Rows with the keys in `COLUMNS`.
+        header (bool): Start with the header line.
+
+    Returns:
+        bytes: The UTF-8 encoded lines.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def _load(task: CrawlTask) -> list[dict]:
+    spec = DATASETS[task.dataset]
+    return await spec.get_data_async(*spec.args(task.year, task.category))
+
+
+async def stream_export(start_year: int, end_year: int,
+                        datasets: Optional[Iterable[str]] = None,
+                        format: str = "ndjson",
+                        report: Optional[ExportReport] = None,
+                        window: Optional[int] = None,
+                        verbose: bool = True) -> AsyncIterator[bytes]:
+    """
+    Streams every page in the range as encoded rows, one chunk per page,
+    in dataset, category and year order.
+
+    Up to `window` pages are loaded concurrently ahead of the one being
+    sent. Pages without data (404) and pages that could not be loaded are
+    skipped and counted in `report`.
+
+    Args:
+        start_year (int): First year, inclusive.
+        end_year (int): Last year, inclusive.
+        datasets (Optional[Iterable[str]]): Dataset names to export.
+            Defaults to all of them.
+        format (str): "ndjson" or "csv".
+        report (Optional[ExportReport]): Updated as pages are exported.
+        window (Optional[int]): Pages loaded ahead. Defaults to
+            `settings.multi_year_concurrency`.
+        verbose (bool): Print skipped pages.
+
+    Yields:
+        bytes: The encoded rows of one page (the CSV header first).
+    """
+    report = report if report is not None else ExportReport()
+    window = window or settings.multi_year_concurrency
+    tasks = iter(build_tasks(start_year, end_year, datasets))
+    pending: deque = deque()
+
+    def schedule() -> None:
+        for task in tasks:
+            pending.append((task, asyncio.ensure_future(_load(task))))
+            if len(pending) >= window:
+                return
+
+    if format == "csv":
+        yield encode_csv((), header=True)
+
+    try:
+        schedule()
+        while pending:
+            task, future = pending.popleft()
+            schedule()
+            try:
+                data = await future
+            except HTTPException as e:
+                if e.status_code == 404:
+                    report.missing += 1
+                else:
+                    report.failed += 1
+                if verbose:
+                    print(f"[EXPORT] {task.dataset} {task.category or '-'} "
+                          f"{task.year} skipped ({e.status_code})")
+                continue
+
+            rows = list(page_rows(task.dataset, task.category, task.year,
+                                  data))
+            report.exported += 1
+            report.rows += len(rows)
+            yield (encode_csv(rows) if format == "csv"
+                   else encode_ndjson(rows))
+    finally:
+        # The client went away: stop loading pages nobody will read
+        for _, future in pending:
+            future.cancel()
+
+
+async def _export_to(output, args: argparse.Namespace,
+                     report: ExportReport) -> None:
+    try:
+        async for chunk in stream_export(args.start_year, args.end_year,
+                                         args.datasets, args.format, report,
+                                         args.window):
+            output.write(chunk)
+    finally:
+        await close_async_client()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Export every Embrapa page in a range as NDJSON or CSV."
+    )
+    parser.add_argument("--format", choices=list(FORMATS), default="ndjson")
+    parser.add_argument("--start-year", type=int, default=1970)
+    parser.add_argument("--end-year", type=int,
+                        default=datetime.date.today().year)
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS),
+                        help="Datasets to export (default: all).")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Pages loaded concurrently ahead of the output.")
+    parser.add_argument("--output", default="-",
+                        help="Output file (default: standard output).")
+    args = parser.parse_args(argv)
+
+    report = ExportReport()
+    # Progress and fetch messages go to stderr, so stdout carries data only
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.output == "-":
+            asyncio.run(_export_to(sys.__stdout__.buffer, args, report))
+        else:
+            with open(args.output, "wb") as f:
+                asyncio.run(_export_to(f, args, report))
+
+        print(f"[EXPORT] Done: {report.exported} pages, {report.rows} rows, "
+              f"{report.missing} without data, {report.failed} failed")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
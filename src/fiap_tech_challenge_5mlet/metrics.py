@@ -0,0 +1,263 @@
+"""
+Process-wide metrics in the Prometheus text exposition format.
+
+Request latency per route, the latency of each pipeline stage (cache lookup,
+upstream fetch, HTML parse, response validation and JSON serialization),
+cache hit/miss/stale counters per dataset and upstream errors. Served at
+`/metrics`.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+# Request and stage latencies span from cached lookups (tens of
+# microseconds) to upstream fetches (seconds)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...],
+                   extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"'
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return (str(value).replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with labels.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increments the counter of a label combination.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """
+        Returns the current value of a label combination.
+        """
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, labels)} "
+                f"{_format_value(value)}" for labels, value in items]
+
+
+class Histogram:
+    """
+    Histogram with labels and fixed cumulative buckets.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # Per label combination: bucket counts (+Inf last), sum, count
+        self._values: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Records an observation for a label combination.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[labels] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        """
+        Returns the number of observations of a label combination.
+        """
+        with self._lock:
+            series = self._values.get(labels)
+            return series[2] if series is not None else 0
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted((labels, (list(series[0]), series[1], series[2]))
+                           for labels, series in self._values.items())
+
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),),
+                                           counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket"
+                             f"{_format_labels(self.labels, labels, le)} "
+                             f"{cumulative}")
+            label_text = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {total!r}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    Gauge read from a callback at collection time, e.g. the size of a
+    cache. The callback returns a mapping of label values to numbers.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: tuple[str, ...],
+                 callback: Callable[[], dict[tuple[str, ...], float]]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+
+    def collect(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labels, labels)} "
+                f"{_format_value(value)}"
+                for labels, value in sorted(self.callback().items())]
+
+
+class Registry:
+    """
+    Set of metrics rendered together.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Adds a metric, replacing any metric with the same name.
+
+        Returns:
+            The metric, for assignment at module level.
+        """
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Renders every metric in the Prometheus text format (version 0.0.4).
+
+        Returns:
+            str: The exposition text.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests by route template.",
+    ("method", "route", "status")
+))
+STAGE_LATENCY = registry.register(Histogram(
+    "pipeline_stage_duration_seconds",
+    "Latency of each request pipeline stage "
+    "(cache_lookup, fetch, parse, validation, serialization).",
+    ("stage", "dataset")
+))
+CACHE_EVENTS = registry.register(Counter(
+    "cache_events_total",
+    "Cache lookups by tier (result, shared, page, negative) and outcome "
+    "(hit, miss, stale).",
+    ("dataset", "tier", "outcome")
+))
+UPSTREAM_REQUESTS = registry.register(Counter(
+    "upstream_requests_total",
+    "Requests to Embrapa by outcome (ok, not_modified, error, hedged, "
+    "circuit_open).",
+    ("dataset", "outcome")
+))
+UPSTREAM_ERRORS = registry.register(Counter(
+    "upstream_errors_total",
+    "Failed requests to Embrapa by error type.",
+    ("dataset", "error")
+))
+
+
+def dataset_of(cache_filename: str) -> str:
+    """
+    Returns the dataset label of a page from its cache filename
+    (e.g. "exportacao_espumantes_2019.html" -> "exportacao").
+
+    Args:
+        cache_filename (str): The cache key of the page.
+
+    Returns:
+        str: The dataset name.
+    """
+    return cache_filename.split("_", 1)[0]
+
+
+def observe_stage(stage: str, dataset: str, started: float) -> None:
+    """
+    Records the latency of a stage that started at `started`
+    (a `time.perf_counter()` value).
+    """
+    STAGE_LATENCY.observe(time.perf_counter() - started, stage, dataset)
+
+
+@contextmanager
+def stage_timer(stage: str, dataset: Optional[str]) -> Iterator[None]:
+    """
+    Times a pipeline stage, including when it raises.
+
+    Args:
+        stage (str): Stage name (cache_lookup, fetch, parse, validation,
+            serialization).
+        dataset (Optional[str]): Dataset label.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, dataset or "unknown", started)
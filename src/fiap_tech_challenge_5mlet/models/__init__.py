@@ -1,8 +1,24 @@
-from .comercializacao import ComercializacaoResponse
-from .producao import ProducaoResponse
-from .processamento import ProcessamentoResponse
-from .exportacao import ExportacaoResponse
-from .importacao import ImportacaoResponse
+from .comercializacao import (
+    ComercializacaoResponse,
+    ComercializacaoMultiYearResponse,
+    ComercializacaoNumericResponse,
+    ComercializacaoNumericMultiYearResponse
+)
+from .producao import (
+    ProducaoResponse,
+    ProducaoMultiYearResponse,
+    ProducaoNumericResponse,
+    ProducaoNumericMultiYearResponse
+)
+from .processamento import (
+    ProcessamentoResponse,
+    ProcessamentoMultiYearResponse,
+    ProcessamentoNumericResponse,
+    ProcessamentoNumericMultiYearResponse
+)
+from .exportacao import ExportacaoResponse, ExportacaoMultiYearResponse
+from .importacao import ImportacaoResponse, ImportacaoMultiYearResponse
+from .analytics import TotalsResponse, RankingResponse, GrowthResponse
 
 
 __all__ = [
@@ -10,6 +26,20 @@ __all__ = [
     "ProducaoResponse",
     "ProcessamentoResponse",
     "ExportacaoResponse",
-    "ImportacaoResponse"
+    "ImportacaoResponse",
+    "ComercializacaoMultiYearResponse",
+    "ProducaoMultiYearResponse",
+    "ProcessamentoMultiYearResponse",
+    "ExportacaoMultiYearResponse",
+    "ImportacaoMultiYearResponse",
+    "ComercializacaoNumericResponse",
+    "ProducaoNumericResponse",
+    "ProcessamentoNumericResponse",
+    "ComercializacaoNumericMultiYearResponse",
+    "ProducaoNumericMultiYearResponse",
+    "ProcessamentoNumericMultiYearResponse",
+    "TotalsResponse",
+    "RankingResponse",
+    "GrowthResponse"
 ]
 
@@ -0,0 +1,27 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class EntityTotal(BaseModel):
+    entity: str
+    value: Optional[float]
+    years: int
+
+
+class EntityRank(BaseModel):
+    rank: int
+    entity: str
+    value: float
+
+
+class EntityGrowth(BaseModel):
+    entity: str
+    year: int
+    value: Optional[float]
+    delta: Optional[float]
+    growth_pct: Optional[float]
+
+
+TotalsResponse = List[EntityTotal]
+RankingResponse = List[EntityRank]
+GrowthResponse = List[EntityGrowth]
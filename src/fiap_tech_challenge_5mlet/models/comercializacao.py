@@ -1,5 +1,6 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import BaseModel
+from .multi_year import MultiYearResponse
 
 
 class Subproduct(BaseModel):
@@ -24,3 +25,36 @@ ComercializacaoResponse = List[
         ComercializacaoTotal
     ]
 ]
+
+
+# Response when several years are requested at once
+ComercializacaoMultiYearResponse = MultiYearResponse[ComercializacaoResponse]
+
+
+# Same shapes with integer quantities (None for "-"), returned with
+# numeric=true
+class ComercializacaoSubproductNumeric(BaseModel):
+    product: str
+    quantity_liters: Optional[int]
+
+
+class ComercializacaoItemNumeric(BaseModel):
+    product: str
+    quantity_liters: Optional[int]
+    subproducts: List[ComercializacaoSubproductNumeric]
+
+
+class ComercializacaoTotalNumeric(BaseModel):
+    total_overall: Optional[int]
+
+
+ComercializacaoNumericResponse = List[
+    Union[
+        ComercializacaoItemNumeric,
+        ComercializacaoTotalNumeric
+    ]
+]
+
+ComercializacaoNumericMultiYearResponse = MultiYearResponse[
+    ComercializacaoNumericResponse
+]
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel
+from .multi_year import MultiYearResponse
 
 
 class ExportacaoSubproduct(BaseModel):
@@ -14,3 +15,7 @@ class ExportacaoItem(BaseModel):
 
 
 ExportacaoResponse = List[ExportacaoItem]
+
+
+# Response when several years are requested at once
+ExportacaoMultiYearResponse = MultiYearResponse[ExportacaoResponse]
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel
+from .multi_year import MultiYearResponse
 
 
 class ImportacaoItem(BaseModel):
@@ -9,3 +10,7 @@ class ImportacaoItem(BaseModel):
 
 
 ImportacaoResponse = List[ImportacaoItem]
+
+
+# Response when several years are requested at once
+ImportacaoMultiYearResponse = MultiYearResponse[ImportacaoResponse]
@@ -0,0 +1,21 @@
+from typing import Generic, List, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class YearData(BaseModel, Generic[T]):
+    year: int
+    data: T
+
+
+class YearError(BaseModel):
+    year: int
+    status_code: int
+    detail: str
+
+
+# Response of a data endpoint queried with start_year/end_year or years
+class MultiYearResponse(BaseModel, Generic[T]):
+    years: List[YearData[T]]
+    errors: List[YearError]
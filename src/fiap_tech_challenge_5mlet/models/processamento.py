@@ -1,5 +1,6 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import BaseModel
+from .multi_year import MultiYearResponse
 
 
 class ProcessamentoSubproduct(BaseModel):
@@ -24,3 +25,36 @@ ProcessamentoResponse = List[
         ProcessamentoTotal
     ]
 ]
+
+
+# Response when several years are requested at once
+ProcessamentoMultiYearResponse = MultiYearResponse[ProcessamentoResponse]
+
+
+# Same shapes with integer quantities (None for "-"), returned with
+# numeric=true
+class ProcessamentoSubproductNumeric(BaseModel):
+    product: str
+    quantity_kg: Optional[int]
+
+
+class ProcessamentoItemNumeric(BaseModel):
+    product: str
+    quantity_kg: Optional[int]
+    subproducts: List[ProcessamentoSubproductNumeric]
+
+
+class ProcessamentoTotalNumeric(BaseModel):
+    total_overall: Optional[int]
+
+
+ProcessamentoNumericResponse = List[
+    Union[
+        ProcessamentoItemNumeric,
+        ProcessamentoTotalNumeric
+    ]
+]
+
+ProcessamentoNumericMultiYearResponse = MultiYearResponse[
+    ProcessamentoNumericResponse
+]
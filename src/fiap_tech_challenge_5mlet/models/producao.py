@@ -1,5 +1,6 @@
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic import BaseModel
+from .multi_year import MultiYearResponse
 
 
 class ProducaoSubproduct(BaseModel):
@@ -24,3 +25,36 @@ ProducaoResponse = List[
         ProducaoTotal
     ]
 ]
+
+
+# Response when several years are requested at once
+ProducaoMultiYearResponse = MultiYearResponse[ProducaoResponse]
+
+
+# Same shapes with integer quantities (None for "-"), returned with
+# numeric=true
+class ProducaoSubproductNumeric(BaseModel):
+    product: str
+    quantity_liters: Optional[int]
+
+
+class ProducaoItemNumeric(BaseModel):
+    product: str
+    quantity_liters: Optional[int]
+    subproducts: List[ProducaoSubproductNumeric]
+
+
+class ProducaoTotalNumeric(BaseModel):
+    total_overall: Optional[int]
+
+
+ProducaoNumericResponse = List[
+    Union[
+        ProducaoItemNumeric,
+        ProducaoTotalNumeric
+    ]
+]
+
+ProducaoNumericMultiYearResponse = MultiYearResponse[
+    ProducaoNumericResponse
+]
@@ -1,16 +1,102 @@
-from .html_fetcher import fetch_or_cache
-from .comercializacao_service import get_comercializacao_data
-from .processamento_service import get_processamento_data
-from .producao_service import get_producao_data
-from .exportacao_service import get_exportacao_data
-from .importacao_service import get_importacao_data
+from .html_fetcher import (
+    fetch_or_cache,
+    fetch_or_cache_async,
+    close_async_client,
+    fetch_flight,
+    revalidate,
+    upstream_breaker
+)
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .deadline import (
+    DeadlineExceeded,
+    remaining_time,
+    route_deadline_seconds,
+    start_deadline
+)
+from .cache_backend import (
+    CacheBackend,
+    FileCacheBackend,
+    SqliteCacheBackend,
+    get_cache_backend,
+    make_cache_backend,
+    set_cache_backend
+)
+from .result_cache import result_cache, negative_cache, load_flight
+from .shared_cache import SharedCache, shared_cache
+from .resp_server import LocalRespServer
+from .comercializacao_service import (
+    get_comercializacao_data,
+    get_comercializacao_data_async
+)
+from .processamento_service import (
+    get_processamento_data,
+    get_processamento_data_async
+)
+from .producao_service import get_producao_data, get_producao_data_async
+from .exportacao_service import (
+    get_exportacao_data,
+    get_exportacao_data_async
+)
+from .importacao_service import (
+    get_importacao_data,
+    get_importacao_data_async
+)
+from .datasets import Dataset, DATASETS
+from .year_catalog import (
+    YearCatalog,
+    known_year,
+    load_year_catalog,
+    year_catalog
+)
+from .csv_source import fetch_csv_pages, parse_csv
+from .upstream_server import LocalUpstreamServer
+from .multi_year import get_multi_year_data
+from .validators import page_validators
 
 __all__ = [
     "fetch_or_cache",
+    "fetch_or_cache_async",
+    "close_async_client",
+    "fetch_flight",
+    "revalidate",
+    "upstream_breaker",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceeded",
+    "remaining_time",
+    "route_deadline_seconds",
+    "start_deadline",
+    "CacheBackend",
+    "FileCacheBackend",
+    "SqliteCacheBackend",
+    "get_cache_backend",
+    "make_cache_backend",
+    "set_cache_backend",
+    "result_cache",
+    "negative_cache",
+    "load_flight",
+    "SharedCache",
+    "shared_cache",
+    "LocalRespServer",
+    "LocalUpstreamServer",
     "get_comercializacao_data",
+    "get_comercializacao_data_async",
     "get_processamento_data",
+    "get_processamento_data_async",
     "get_producao_data",
+    "get_producao_data_async",
     "get_exportacao_data",
-    "get_importacao_data"
+    "get_exportacao_data_async",
+    "get_importacao_data",
+    "get_importacao_data_async",
+    "Dataset",
+    "DATASETS",
+    "YearCatalog",
+    "known_year",
+    "load_year_catalog",
+    "year_catalog",
+    "fetch_csv_pages",
+    "parse_csv",
+    "get_multi_year_data",
+    "page_validators"
     ]
-
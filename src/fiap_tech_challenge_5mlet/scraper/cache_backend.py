@@ -0,0 +1,377 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from ..config import settings
+from ..metrics import CACHE_EVENTS, dataset_of, stage_timer
+from ..utils.parse_pool import run_parse
+from .deadline import remaining_time
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """
+    A cached upstream page with its fetch metadata.
+    """
+    key: str
+    html: str
+    fetched_at: float
+    content_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def content_hash(html: str) -> str:
+    """
+    Returns the hash used to tie parsed payloads to the page they came from.
+    """
+    return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheBackend(ABC):
+    """
+    Storage for upstream pages, keyed by their cache filename
+    (e.g. "producao_2023.html").
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Returns the cached page, or None."""
+
+    @abstractmethod
+    def put(self, key: str, html: str, url: Optional[str] = None,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CacheEntry:
+        """Stores a freshly fetched page, replacing any previous version."""
+
+    @abstractmethod
+    def fetched_at(self, key: str) -> Optional[float]:
+        """Returns when the page was fetched, or None if not cached."""
+
+    @abstractmethod
+    def touch(self, key: str) -> None:
+        """Marks a cached page as just fetched (upstream said 304)."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Removes a page. Returns whether it was cached."""
+
+    def evict(self, key: str) -> bool:
+        """
+        Removes a page from the backend's own storage, keeping the loose
+        HTML files it was imported from. Returns whether it was removed.
+        Backends that store pages as those files keep them.
+        """
+        return False
+
+    @abstractmethod
+    def keys(self, prefix: str = "") -> list[str]:
+        """Lists cached page keys starting with `prefix`."""
+
+    def get_parsed(self, key: str, digest: str) -> Optional[list[dict]]:
+        """
+        Returns the parsed payload stored for the page version with the
+        given content hash, or None.
+        """
+        return None
+
+    def put_parsed(self, key: str, digest: str, data: list[dict]) -> None:
+        """Stores the parsed payload of a page version."""
+
+
+class FileCacheBackend(CacheBackend):
+    """
+    One HTML file per page in a directory; the file's modification time is
+    its fetch time. Parsed payloads and upstream validators are not kept.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = f.read()
+            fetched_at = os.path.getmtime(path)
+        except FileNotFoundError:
+            return None
+        return CacheEntry(key, html, fetched_at, content_hash(html))
+
+    def put(self, key: str, html: str, url: Optional[str] = None,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CacheEntry:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+
+        # Write to a temporary file first so readers never see a partial page
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+        return CacheEntry(key, html, time.time(), content_hash(html))
+
+    def fetched_at(self, key: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(self._path(key))
+        except OSError:
+            return None
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def keys(self, prefix: str = "") -> list[str]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return sorted(name for name in os.listdir(self.cache_dir)
+                      if name.startswith(prefix) and name.endswith(".html"))
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    body BLOB NOT NULL,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at);
+CREATE TABLE IF NOT EXISTS parsed (
+    key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+
+class SqliteCacheBackend(CacheBackend):
+    """
+    Pages, fetch metadata and parsed payloads in a SQLite database.
+
+    Every lookup is a single primary-key query. The database runs in WAL
+    mode, so several uvicorn workers can read and write it concurrently.
+    Pages missing from the database are imported from the loose HTML files
+    of `legacy_dir`, if any.
+    """
+
+    def __init__(self, db_path: str, legacy_dir: Optional[str] = None):
+        self.db_path = db_path
+        self.legacy = FileCacheBackend(legacy_dir) if legacy_dir else None
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        row = self._connect().execute(
+            "SELECT body, fetched_at, content_hash, etag, last_modified "
+            "FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            body, fetched_at, digest, etag, last_modified = row
+            return CacheEntry(key, body.decode("utf-8"), fetched_at, digest,
+                              etag, last_modified)
+
+        if self.legacy is not None:
+            entry = self.legacy.get(key)
+            if entry is not None:
+                self._insert(key, None, entry.html, entry.fetched_at)
+                return entry
+        return None
+
+    def _insert(self, key: str, url: Optional[str], html: str,
+                fetched_at: float, etag: Optional[str] = None,
+                last_modified: Optional[str] = None) -> CacheEntry:
+        digest = content_hash(html)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, body, content_hash,"
+                " fetched_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, html.encode("utf-8"), digest, fetched_at, etag,
+                 last_modified)
+            )
+        return CacheEntry(key, html, fetched_at, digest, etag, last_modified)
+
+    def put(self, key: str, html: str, url: Optional[str] = None,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CacheEntry:
+        return self._insert(key, url, html, time.time(), etag, last_modified)
+
+    def fetched_at(self, key: str) -> Optional[float]:
+        row = self._connect().execute(
+            "SELECT fetched_at FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        return self.legacy.fetched_at(key) if self.legacy else None
+
+    def touch(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE pages SET fetched_at = ? WHERE key = ?",
+                         (time.time(), key))
+
+    def delete(self, key: str) -> bool:
+        deleted = self.evict(key)
+        if self.legacy is not None:
+            deleted = self.legacy.delete(key) or deleted
+        return deleted
+
+    def evict(self, key: str) -> bool:
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM pages WHERE key = ?",
+                                   (key,)).rowcount
+            conn.execute("DELETE FROM parsed WHERE key = ?", (key,))
+        return bool(deleted)
+
+    def keys(self, prefix: str = "") -> list[str]:
+        # Range scan on the primary key index
+        rows = self._connect().execute(
+            "SELECT key FROM pages WHERE key >= ? AND key < ? ORDER BY key",
+            (prefix, prefix + "\U0010ffff")
+        ).fetchall()
+        keys = {row[0] for row in rows}
+        if self.legacy is not None:
+            keys.update(self.legacy.keys(prefix))
+        return sorted(keys)
+
+    def get_parsed(self, key: str, digest: str) -> Optional[list[dict]]:
+        row = self._connect().execute(
+            "SELECT payload FROM parsed WHERE key = ? AND content_hash = ?",
+            (key, digest)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put_parsed(self, key: str, digest: str, data: list[dict]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO parsed (key, content_hash, payload) "
+                "VALUES (?, ?, ?)",
+                (key, digest, json.dumps(data, ensure_ascii=False))
+            )
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def make_cache_backend(kind: Optional[str] = None,
+                       cache_dir: Optional[str] = None,
+                       db_path: Optional[str] = None) -> CacheBackend:
+    """
+    Builds a cache backend.
+
+    Args:
+        kind (Optional[str]): "sqlite" or "files". Defaults to
+            `settings.cache_backend`.
+        cache_dir (Optional[str]): Directory of the HTML files (imported
+            into the database by the SQLite backend). Defaults to
+            `settings.cache_dir`.
+        db_path (Optional[str]): SQLite database path. Defaults to
+            `settings.cache_db_path`, or cache.db inside `cache_dir`.
+
+    Returns:
+        CacheBackend: The new backend.
+
+    Raises:
+        ValueError: If the backend kind is unknown.
+    """
+    kind = kind or settings.cache_backend
+    cache_dir = cache_dir or settings.cache_dir
+
+    if kind == "files":
+        return FileCacheBackend(cache_dir)
+    if kind == "sqlite":
+        db_path = db_path or settings.cache_db_path or os.path.join(
+            cache_dir, "cache.db")
+        return SqliteCacheBackend(db_path, legacy_dir=cache_dir)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+def get_cache_backend() -> CacheBackend:
+    """
+    Returns the configured cache backend, creating it on first use.
+
+    Returns:
+        CacheBackend: The shared backend.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = make_cache_backend()
+        return _backend
+
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """
+    Replaces the shared cache backend, e.g. to point the app at a scratch
+    cache. None restores the configured backend on next use.
+
+    Args:
+        backend (Optional[CacheBackend]): The new backend.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def parse_with_cache(key: str, html: str,
+                     parse: Callable[[str], list[dict]]) -> list[dict]:
+    """
+    Parses a page, reusing the payload stored by the cache backend for the
+    same page content (possibly by another worker process).
+
+    Args:
+        key (str): Cache key of the page.
+        html (str): The page HTML.
+        parse (Callable[[str], list[dict]]): The dataset parser.
+
+    Returns:
+        list[dict]: The parsed payload.
+    """
+    backend = get_cache_backend()
+    dataset = dataset_of(key)
+    digest = content_hash(html)
+
+    data = backend.get_parsed(key, digest)
+    if data is not None:
+        CACHE_EVENTS.inc(dataset, "parsed", "hit")
+        return data
+
+    CACHE_EVENTS.inc(dataset, "parsed", "miss")
+    with stage_timer("parse", dataset):
+        data = run_parse(parse, html, max_wait=remaining_time())
+    backend.put_parsed(key, digest, data)
+    return data
@@ -0,0 +1,67 @@
+import datetime
+from typing import Optional
+
+from ..config import settings
+from .result_cache import invalidate_page, make_key
+
+
+def page_ttl(dataset: str, year: int) -> float:
+    """
+    Returns how long a cached page stays fresh.
+
+    Embrapa revises the most recent years, so those get a short TTL
+    (overridable per dataset) while historical years get a long one.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        year (int): Year of the page.
+
+    Returns:
+        float: Freshness lifetime in seconds.
+    """
+    current_year = datetime.date.today().year
+    if year > current_year - settings.cache_recent_years:
+        return settings.cache_ttl_recent_by_dataset.get(
+            dataset, settings.cache_ttl_recent_seconds
+        )
+    return settings.cache_ttl_historical_seconds
+
+
+def negative_ttl(dataset: str, year: int) -> float:
+    """
+    Returns how long a page found without data is answered with a 404
+    from memory.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        year (int): Year of the page.
+
+    Returns:
+        float: Lifetime of the negative entry in seconds.
+    """
+    current_year = datetime.date.today().year
+    if year > current_year - settings.cache_recent_years:
+        return settings.negative_cache_ttl_recent_seconds
+    return settings.negative_cache_ttl_historical_seconds
+
+
+def cache_options(dataset: str, year: int,
+                  category: Optional[str] = None) -> dict:
+    """
+    Builds the `fetch_or_cache` freshness arguments for a dataset page: its
+    TTL and a hook dropping the parsed result and its ETag once a stale
+    page has been refreshed.
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        dict: Keyword arguments `max_age` and `on_refresh`.
+    """
+    key = make_key(dataset, year, category)
+    return {
+        "max_age": page_ttl(dataset, year),
+        "on_refresh": lambda: invalidate_page(key)
+    }
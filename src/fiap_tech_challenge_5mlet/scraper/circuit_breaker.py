@@ -0,0 +1,147 @@
+import threading
+import time
+from typing import Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling the upstream while the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+
+    The circuit starts closed. After `failure_threshold` consecutive
+    failures it opens, and every call fails immediately with
+    `CircuitOpenError` for `reset_seconds`. It then turns half-open: up to
+    `half_open_probes` calls go through as probes, and the first result
+    closes the circuit again (success) or re-opens it (failure). A probe
+    that ends without a result (cancelled, or failed with an unexpected
+    error) gives its slot back with `release`; one that is never released
+    loses its slot after `reset_seconds`, so a lost probe cannot keep the
+    circuit half-open forever.
+
+    A `failure_threshold` of 0 disables the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int,
+                 reset_seconds: float, half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        # time.monotonic() of each probe in flight while half-open
+        self._probes: list[float] = []
+        self.opened = 0
+        self.rejected = 0
+
+    def _open(self) -> None:
+        # Called with the lock held
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probes = []
+        self.opened += 1
+        print(f"[CIRCUIT] {self.name} open after {self._failures} "
+              f"failures, failing fast for {self.reset_seconds:g} sec")
+
+    def check(self) -> bool:
+        """
+        Lets a call through, or rejects it while the circuit is open.
+
+        Returns:
+            bool: True if the call is a half-open probe. It must then end
+            with `success`, `failure` or `release`.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with
+                every probe already in flight.
+        """
+        if self.failure_threshold <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if (self._state == self.OPEN
+                    and now - self._opened_at >= self.reset_seconds):
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                self._probes = [granted for granted in self._probes
+                                if now - granted < self.reset_seconds]
+                if len(self._probes) < self.half_open_probes:
+                    self._probes.append(now)
+                    return True
+            if self._state == self.CLOSED:
+                return False
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_seconds - (now - min(
+                self._probes, default=self._opened_at
+            )))
+        raise CircuitOpenError(f"{self.name} circuit is open, "
+                               f"retrying in {retry_in:.0f} sec")
+
+    def success(self) -> None:
+        """
+        Records a call that reached the upstream and got an answer.
+        """
+        with self._lock:
+            if self._state != self.CLOSED:
+                print(f"[CIRCUIT] {self.name} closed, upstream is back")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = []
+
+    def release(self) -> None:
+        """
+        Gives back the slot of a half-open probe that ended without a
+        result.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes:
+                self._probes.pop(0)
+
+    def failure(self) -> None:
+        """
+        Records a call that failed (connection error, timeout or 5xx).
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED
+                    and self._failures >= self.failure_threshold):
+                self._open()
+
+    def stats(self) -> dict:
+        """
+        Returns the breaker state and counters.
+
+        Returns:
+            dict: The state (closed, open or half_open), consecutive
+            failures, times opened and calls rejected.
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected
+            }
+
+
+def is_upstream_failure(status_code: Optional[int]) -> bool:
+    """
+    Whether a failed request should count against the circuit: network
+    errors and timeouts (no status) and 5xx answers do, client errors
+    (4xx) do not.
+    """
+    return status_code is None or status_code >= 500
@@ -1,45 +1,107 @@
 from fastapi import HTTPException
-from ..scraper import fetch_or_cache
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from ..scraper import fetch_or_cache, fetch_or_cache_async
+from .cache_backend import parse_with_cache
+from .result_cache import cached_result
+from .cache_policy import cache_options
+from .year_catalog import known_year
+from ..store import served_from_store
 from ..utils import (
     parse_comercializacao
     )
 
 
-def get_comercializacao_data(year: int) -> list[dict]:
+def build_comercializacao_request(year: int) -> tuple[str, str]:
     """
-    Retrieves and parses the 'Comercialização' data for a given year
-    from Embrapa's website or from the local cache.
+    Builds the Embrapa URL and cache filename for a 'Comercialização' page.
 
     Args:
         year (int): Year of the data to retrieve.
 
     Returns:
-        list[dict]: A list of parsed comercialização data records.
-
-    Raises:
-        HTTPException: If the data is not found or cannot be fetched.
+        tuple[str, str]: The page URL and its cache filename.
     """
     # Construct the URL for the given year
     url = (
-        "http://vitibrasil.cnpuv.embrapa.br/index.php"
+        f"{settings.embrapa_base_url}"
         f"?ano={year}&opcao=opt_04"
     )
 
     # Define the cache filename based on the year
     cache_filename = f"comercializacao_{year}.html"
+    return url, cache_filename
 
-    try:
-        # Attempt to fetch the HTML or load it from cache
-        html = fetch_or_cache(url, cache_filename)
-    except RuntimeError:
-        raise HTTPException(status_code=503,
-                            detail="Unable to access Embrapa or cache.")
 
+def _unavailable() -> HTTPException:
+    return HTTPException(status_code=503,
+                         detail="Unable to access Embrapa or cache.")
+
+
+def _parse(cache_filename: str, html: str, year: int) -> list[dict]:
     # Parse the HTML to extract structured data
-    data = parse_comercializacao(html)
+    data = parse_with_cache(cache_filename, html, parse_comercializacao)
 
     if not data:
         raise HTTPException(status_code=404,
                             detail=f"No data found for year {year}.")
 
     return data
+
+
+@known_year("comercializacao")
+@cached_result("comercializacao")
+@served_from_store("comercializacao")
+def get_comercializacao_data(year: int) -> list[dict]:
+    """
+    Retrieves and parses the 'Comercialização' data for a given year
+    from Embrapa's website or from the local cache.
+
+    Args:
+        year (int): Year of the data to retrieve.
+
+    Returns:
+        list[dict]: A list of parsed comercialização data records.
+
+    Raises:
+        HTTPException: If the data is not found or cannot be fetched.
+    """
+    url, cache_filename = build_comercializacao_request(year)
+
+    try:
+        # Attempt to fetch the HTML or load it from cache
+        html = fetch_or_cache(url, cache_filename,
+                              **cache_options("comercializacao", year))
+    except RuntimeError:
+        raise _unavailable()
+
+    return _parse(cache_filename, html, year)
+
+
+@known_year("comercializacao")
+@cached_result("comercializacao")
+@served_from_store("comercializacao")
+async def get_comercializacao_data_async(year: int) -> list[dict]:
+    """
+    Async version of `get_comercializacao_data`. Fetches through the pooled
+    async client and parses in the threadpool.
+
+    Args:
+        year (int): Year of the data to retrieve.
+
+    Returns:
+        list[dict]: A list of parsed comercialização data records.
+
+    Raises:
+        HTTPException: If the data is not found or cannot be fetched.
+    """
+    url, cache_filename = build_comercializacao_request(year)
+
+    try:
+        html = await fetch_or_cache_async(
+            url, cache_filename, **cache_options("comercializacao", year)
+        )
+    except RuntimeError:
+        raise _unavailable()
+
+    return await run_in_threadpool(_parse, cache_filename, html, year)
@@ -0,0 +1,406 @@
+"""
+Alternative ingest source: Embrapa's per-tab CSV downloads.
+
+Each tab (and sub-option) of the vitibrasil site is also published as one
+CSV file holding every year, e.g. `download/Producao.csv`. Downloading it
+replaces one HTML page fetch per year. Files are parsed line by line as
+they are downloaded, into the same records the `utils` HTML parsers
+return, so pages from either source can be stored and served alike.
+"""
+import csv
+import io
+import re
+from typing import Callable, Iterable, Iterator, Optional
+
+import requests
+from fastapi import HTTPException
+
+from ..config import settings
+from ..metrics import UPSTREAM_ERRORS, UPSTREAM_REQUESTS, stage_timer
+from ..utils import (
+    parse_comercializacao,
+    parse_exportacao,
+    parse_importacao,
+    parse_processamento,
+    parse_producao
+)
+from ..utils.typed_page import QUANTITY_FIELDS, parse_quantity
+from .datasets import DATASETS
+from .html_fetcher import fetch_or_cache
+
+# Download file of every (dataset, category)
+CSV_FILES: dict[tuple[str, Optional[str]], str] = {
+    ("producao", None): "Producao.csv",
+    ("processamento", "viniferas"): "ProcessaViniferas.csv",
+    ("processamento", "americanas_hibridas"): "ProcessaAmericanas.csv",
+    ("processamento", "uvas_de_mesa"): "ProcessaMesa.csv",
+    ("processamento", "sem_classificacao"): "ProcessaSemclass.csv",
+    ("comercializacao", None): "Comercio.csv",
+    ("importacao", "vinhos_de_mesa"): "ImpVinhos.csv",
+    ("importacao", "espumantes"): "ImpEspumantes.csv",
+    ("importacao", "uvas_frescas"): "ImpFrescas.csv",
+    ("importacao", "uvas_passas"): "ImpPassas.csv",
+    ("importacao", "suco_de_uva"): "ImpSuco.csv",
+    ("exportacao", "vinhos_de_mesa"): "ExpVinho.csv",
+    ("exportacao", "espumantes"): "ExpEspumantes.csv",
+    ("exportacao", "uvas_frescas"): "ExpUva.csv",
+    ("exportacao", "suco_de_uva"): "ExpSuco.csv"
+}
+
+HTML_PARSERS: dict[str, Callable[[str], list[dict]]] = {
+    "producao": parse_producao,
+    "processamento": parse_processamento,
+    "comercializacao": parse_comercializacao,
+    "importacao": parse_importacao,
+    "exportacao": parse_exportacao
+}
+
+# Subproduct rows carry a lowercase prefix in the control column, e.g.
+# "vm_Tinto" under "VINHO DE MESA"
+_SUBITEM_CONTROL = re.compile(r"^[a-z]+_")
+
+
+def csv_url(dataset: str, category: Optional[str] = None) -> str:
+    """
+    Returns the download URL of a tab's CSV file.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        str: The URL.
+
+    Raises:
+        ValueError: If the dataset or category has no download.
+    """
+    filename = CSV_FILES.get((dataset, category))
+    if filename is None:
+        raise ValueError(f"No CSV download for {dataset} "
+                         f"{category or '-'}.")
+    return f"{settings.embrapa_download_url.rstrip('/')}/{filename}"
+
+
+def _number(text: str) -> Optional[float]:
+    """
+    Reads a CSV value. Missing values ("", "nd", "*") are None.
+    """
+    text = text.strip().replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _format_quantity(value: Optional[float]) -> str:
+    """
+    Formats a quantity as the HTML page shows it: "1.234.567", or "-" for
+    zero and missing values.
+    """
+    if not value:
+        return "-"
+    return f"{round(value):,}".replace(",", ".")
+
+
+def _reader(lines: Iterable[str]) -> Iterator[list[str]]:
+    """
+    Reads the rows of a download. Most files are separated by ";", some by
+    tabs.
+    """
+    lines = iter(lines)
+    header = next(lines, "").lstrip("\ufeff")
+    delimiter = "\t" if header.count("\t") > header.count(";") else ";"
+    yield next(csv.reader([header], delimiter=delimiter))
+    yield from csv.reader(lines, delimiter=delimiter)
+
+
+def _year_columns(header: list[str]) -> list[tuple[int, int]]:
+    return [(i, int(name)) for i, name in enumerate(header)
+            if name.strip().isdigit()]
+
+
+def _parse_products(dataset: str, rows: Iterator[list[str]],
+                    header: list[str]) -> dict[int, list[dict]]:
+    field = QUANTITY_FIELDS[dataset]
+    years = _year_columns(header)
+    name_column = years[0][0] - 1
+    columns = [name.strip().lower() for name in header]
+    control_column = (columns.index("control") if "control" in columns
+                      else None)
+
+    pages: dict[int, list[dict]] = {year: [] for _, year in years}
+    for row in rows:
+        if len(row) <= name_column:
+            continue
+        name = row[name_column].strip()
+        control = (row[control_column].strip()
+                   if control_column is not None else None)
+        subitem = (bool(_SUBITEM_CONTROL.match(control)) if control
+                   else name != name.upper())
+
+        for column, year in years:
+            value = row[column] if column < len(row) else ""
+            quantity = _format_quantity(_number(value))
+            items = pages[year]
+            if subitem:
+                if items:
+                    items[-1]["subproducts"].append(
+                        {"product": name, field: quantity})
+            else:
+                items.append({"product": name, field: quantity,
+                              "subproducts": []})
+
+    result = {}
+    for year, items in pages.items():
+        # Like the HTML parsers, a year whose values are all empty has no
+        # page
+        if all(item[field] == "-"
+               and all(sub[field] == "-" for sub in item["subproducts"])
+               for item in items):
+            continue
+        total = sum(parse_quantity(item[field]) or 0 for item in items)
+        result[year] = items + [{"total_overall": _format_quantity(total)}]
+    return result
+
+
+def _parse_trade(rows: Iterator[list[str]],
+                 header: list[str]) -> dict[int, list[dict]]:
+    # Every year has two columns: quantity (kg), then value (US$)
+    quantity_columns, value_columns = {}, {}
+    for column, year in _year_columns(header):
+        target = value_columns if year in quantity_columns \
+            else quantity_columns
+        target[year] = column
+    name_column = min(quantity_columns.values()) - 1
+
+    pages: dict[int, list[dict]] = {year: [] for year in quantity_columns}
+    for row in rows:
+        if len(row) <= name_column:
+            continue
+        country = row[name_column].strip()
+        for year, column in quantity_columns.items():
+            quantity = _number(row[column]) if column < len(row) else None
+            value_column = value_columns.get(year, len(row))
+            value = (_number(row[value_column])
+                     if value_column < len(row) else None)
+            # The HTML page shows zeros as "-" and leaves out countries
+            # without quantity and value
+            quantity, value = quantity or None, value or None
+            if quantity is None and value is None:
+                continue
+            pages[year].append({"country": country, "quantity_kg": quantity,
+                                "value_usd": value, "subproducts": []})
+
+    result = {}
+    for year, countries in pages.items():
+        if not countries:
+            continue
+        countries.append({
+            "country": "Total",
+            "quantity_kg": float(sum(c["quantity_kg"] or 0
+                                     for c in countries)),
+            "value_usd": float(sum(c["value_usd"] or 0 for c in countries)),
+            "subproducts": []
+        })
+        result[year] = countries
+    return result
+
+
+def parse_csv(dataset: str, lines: Iterable[str]) -> dict[int, list[dict]]:
+    """
+    Parses a tab's CSV download into one page per year, in the shape the
+    dataset's HTML parser returns (quantities as pt-BR strings for product
+    datasets, floats for importação and exportação, and a total entry).
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        lines (Iterable[str]): Lines of the file, read lazily.
+
+    Returns:
+        dict[int, list[dict]]: Parsed page per year. Years without data
+        are left out.
+    """
+    rows = _reader(lines)
+    header = next(rows, None)
+    if not header or not _year_columns(header):
+        return {}
+    if dataset in QUANTITY_FIELDS:
+        return _parse_products(dataset, rows, header)
+    return _parse_trade(rows, header)
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("latin-1")
+
+
+def fetch_csv_pages(dataset: str, category: Optional[str] = None
+                    ) -> dict[int, list[dict]]:
+    """
+    Downloads a tab's CSV file and parses it as it streams in.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        dict[int, list[dict]]: Parsed page per year.
+
+    Raises:
+        RuntimeError: If the file cannot be downloaded.
+    """
+    url = csv_url(dataset, category)
+    try:
+        with stage_timer("fetch", dataset), \
+                requests.get(url, stream=True,
+                             timeout=settings.upstream_timeout_seconds) \
+                as response:
+            response.raise_for_status()
+            pages = parse_csv(dataset, (_decode(line) for line
+                                        in response.iter_lines()))
+    except requests.RequestException as e:
+        UPSTREAM_REQUESTS.inc(dataset, "error")
+        UPSTREAM_ERRORS.inc(dataset, type(e).__name__)
+        raise RuntimeError(f"Failed to fetch {url}: {str(e)}")
+
+    UPSTREAM_REQUESTS.inc(dataset, "ok")
+    return pages
+
+
+def _merge_order(order: list, keys: Iterable) -> None:
+    """
+    Adds the keys of one page to an ordering of all pages' keys, each new
+    key right after the one it follows on the page.
+    """
+    previous = None
+    for key in keys:
+        if key not in order:
+            order.insert(order.index(previous) + 1 if previous is not None
+                         else 0, key)
+        previous = key
+
+
+def render_csv(dataset: str, pages: dict[int, list[dict]]) -> str:
+    """
+    Writes parsed pages back as a CSV download, in Embrapa's layout. Used
+    by the local stand-in server.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        pages (dict[int, list[dict]]): Parsed page per year.
+
+    Returns:
+        str: The file content.
+    """
+    years = sorted(pages)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
+
+    def number(value) -> str:
+        if value is None or value == "-":
+            return "0"
+        if isinstance(value, str):
+            return str(parse_quantity(value) or 0)
+        return str(int(value)) if value == int(value) else repr(value)
+
+    if dataset not in QUANTITY_FIELDS:
+        writer.writerow(["Id", "País"]
+                        + [str(year) for year in years for _ in range(2)])
+        order, values = [], {}
+        for year in years:
+            rows = [row for row in pages[year] if row["country"] != "Total"]
+            _merge_order(order, [row["country"] for row in rows])
+            for row in rows:
+                values[row["country"], year] = (row["quantity_kg"],
+                                                row["value_usd"])
+        for i, country in enumerate(order, start=1):
+            cells = []
+            for year in years:
+                quantity, value = values.get((country, year), (None, None))
+                cells += [number(quantity), number(value)]
+            writer.writerow([i, country] + cells)
+        return buffer.getvalue()
+
+    field = QUANTITY_FIELDS[dataset]
+    writer.writerow(["id", "control", "produto"] + [str(y) for y in years])
+    # Rows keyed by (parent, product), in page order
+    order, values = [], {}
+    for year in years:
+        keys = []
+        for item in pages[year]:
+            if "total_overall" in item:
+                continue
+            keys.append((None, item["product"]))
+            values[keys[-1], year] = item[field]
+            for sub in item["subproducts"]:
+                keys.append((item["product"], sub["product"]))
+                values[keys[-1], year] = sub[field]
+        _merge_order(order, keys)
+    for i, (parent, product) in enumerate(order, start=1):
+        prefix = "".join(word[0] for word in (parent or "").split()
+                         if word[0].isascii() and word[0].isalpha()).lower()
+        control = f"{prefix or 'x'}_{product}" if parent else product
+        writer.writerow([i, control, product]
+                        + [number(values.get(((parent, product), year)))
+                           for year in years])
+    return buffer.getvalue()
+
+
+def html_page(dataset: str, year: int,
+              category: Optional[str] = None) -> list[dict]:
+    """
+    Fetches (or reads from the page cache) and parses the HTML page of a
+    year, bypassing the result caches and the Parquet store.
+
+    Raises:
+        HTTPException: If the page has no data (404).
+        RuntimeError: If the page cannot be fetched.
+    """
+    spec = DATASETS[dataset]
+    url, cache_filename = spec.build_request(*spec.args(year, category))
+    return HTML_PARSERS[dataset](fetch_or_cache(url, cache_filename))
+
+
+def check_parity(dataset: str, category: Optional[str],
+                 pages: dict[int, list[dict]],
+                 years: Iterable[int]) -> list[str]:
+    """
+    Compares pages parsed from a CSV download with the HTML parsers'
+    output for the same years.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        category (Optional[str]): Category, for datasets that have one.
+        pages (dict[int, list[dict]]): Pages parsed from the CSV file.
+        years (Iterable[int]): Years to compare.
+
+    Returns:
+        list[str]: One line per year where the sources disagree (empty when
+        they match). Years whose HTML page cannot be fetched are skipped.
+    """
+    mismatches = []
+    for year in years:
+        try:
+            expected = html_page(dataset, year, category)
+        except HTTPException:
+            expected = None
+        except RuntimeError:
+            continue
+
+        actual = pages.get(year)
+        if actual == expected:
+            continue
+        if expected is None or actual is None:
+            mismatches.append(
+                f"{dataset} {category or '-'} {year}: only in "
+                f"{'CSV' if expected is None else 'HTML'}")
+            continue
+        differences = [f"{a} != {e}" for a, e in zip(actual, expected)
+                       if a != e]
+        if len(actual) != len(expected):
+            differences.append(f"{len(actual)} rows != {len(expected)}")
+        mismatches.append(f"{dataset} {category or '-'} {year}: "
+                          + "; ".join(differences[:3]))
+    return mismatches
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .comercializacao_service import (
+    build_comercializacao_request,
+    get_comercializacao_data,
+    get_comercializacao_data_async
+)
+from .exportacao_service import (
+    CATEGORIES_EXPORTACAO,
+    build_exportacao_request,
+    get_exportacao_data,
+    get_exportacao_data_async
+)
+from .importacao_service import (
+    CATEGORIES_IMPORTACAO,
+    build_importacao_request,
+    get_importacao_data,
+    get_importacao_data_async
+)
+from .processamento_service import (
+    CATEGORIES,
+    build_processamento_request,
+    get_processamento_data,
+    get_processamento_data_async
+)
+from .producao_service import (
+    build_producao_request,
+    get_producao_data,
+    get_producao_data_async
+)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    Describes one Embrapa tab and the service functions that serve it.
+
+    `categories` is None for tabs without sub-options. The request builder
+    and getters take `(year)` for those tabs and `(year, category)` for the
+    others.
+    """
+    name: str
+    categories: Optional[dict[str, str]]
+    build_request: Callable[..., tuple[str, str]]
+    get_data: Callable[..., list[dict]]
+    get_data_async: Callable[..., object]
+
+    def category_keys(self) -> list[Optional[str]]:
+        """
+        Returns the categories to iterate over, or [None] for tabs without
+        sub-options.
+        """
+        return list(self.categories) if self.categories else [None]
+
+    def args(self, year: int, category: Optional[str]) -> tuple:
+        """
+        Returns the positional arguments for this dataset's service
+        functions.
+        """
+        return (year,) if self.categories is None else (year, category)
+
+
+DATASETS: dict[str, Dataset] = {
+    "producao": Dataset(
+        "producao", None, build_producao_request,
+        get_producao_data, get_producao_data_async
+    ),
+    "processamento": Dataset(
+        "processamento", CATEGORIES, build_processamento_request,
+        get_processamento_data, get_processamento_data_async
+    ),
+    "comercializacao": Dataset(
+        "comercializacao", None, build_comercializacao_request,
+        get_comercializacao_data, get_comercializacao_data_async
+    ),
+    "importacao": Dataset(
+        "importacao", CATEGORIES_IMPORTACAO, build_importacao_request,
+        get_importacao_data, get_importacao_data_async
+    ),
+    "exportacao": Dataset(
+        "exportacao", CATEGORIES_EXPORTACAO, build_exportacao_request,
+        get_exportacao_data, get_exportacao_data_async
+    )
+}
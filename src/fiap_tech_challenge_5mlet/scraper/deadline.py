@@ -0,0 +1,79 @@
+"""
+Per-request time budgets.
+
+A route starts a deadline with `start_deadline` when the request comes in.
+It is kept in a context variable, so it follows the request through the
+services, the threadpool and the tasks of a multi-year query down to the
+fetcher, which sizes its timeouts and retries to the time left. Work
+without a deadline (background refreshes, the crawler, ingest and export
+commands) keeps the plain `settings.upstream_timeout_seconds`.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from ..config import settings
+
+# time.monotonic() value by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(RuntimeError):
+    """
+    Raised instead of calling the upstream when the request has no time
+    left.
+    """
+
+
+def route_deadline_seconds(route: str) -> float:
+    """
+    Returns the time budget of a route.
+
+    Args:
+        route (str): Route name (e.g. "producao").
+
+    Returns:
+        float: Budget in seconds, 0 for no deadline.
+    """
+    return settings.request_deadline_by_route.get(
+        route, settings.request_deadline_seconds
+    )
+
+
+def start_deadline(seconds: float) -> None:
+    """
+    Sets the deadline of the current request, `seconds` from now. 0 or less
+    clears it.
+    """
+    _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Returns the seconds left before the current deadline.
+
+    Returns:
+        Optional[float]: Time left (0 or less once it has passed), or None
+        without a deadline.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def attempt_timeout() -> float:
+    """
+    Returns the timeout for the next upstream request: the configured one,
+    cut down to the time left.
+
+    Returns:
+        float: Timeout in seconds.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return settings.upstream_timeout_seconds
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(settings.upstream_timeout_seconds, remaining)
@@ -1,5 +1,12 @@
 from fastapi import HTTPException
-from ..scraper import fetch_or_cache
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from ..scraper import fetch_or_cache, fetch_or_cache_async
+from .cache_backend import parse_with_cache
+from .result_cache import cached_result
+from .cache_policy import cache_options
+from .year_catalog import known_year
+from ..store import served_from_store
 from ..utils import (
     parse_exportacao
     )
@@ -12,20 +19,20 @@ CATEGORIES_EXPORTACAO = {
 }
 
 
-def get_exportacao_data(year: int, category: str) -> list[dict]:
+def build_exportacao_request(year: int, category: str) -> tuple[str, str]:
     """
-    Retrieves and parses 'Processamento' data for a given year and category
-    from Embrapa, using a cached version when available.
+    Validates the category and builds the Embrapa URL and cache filename
+    for an 'Exportação' page.
 
     Args:
         year (int): Year to retrieve data for.
-        category (str): One of the valid processing categories.
+        category (str): One of the valid export categories.
 
     Returns:
-        list[dict]: Parsed processing data for the selected category and year.
+        tuple[str, str]: The page URL and its cache filename.
 
     Raises:
-        HTTPException: If the category is invalid or data is unavailable.
+        HTTPException: If the category is invalid.
     """
     if category not in CATEGORIES_EXPORTACAO:
         raise HTTPException(
@@ -38,21 +45,24 @@ def get_exportacao_data(year: int, category: str) -> list[dict]:
 
     suboption = CATEGORIES_EXPORTACAO[category]
     url = (
-        f"http://vitibrasil.cnpuv.embrapa.br/index.php"
+        f"{settings.embrapa_base_url}"
         f"?ano={year}&opcao=opt_06&subopcao={suboption}"
     )
 
     cache_filename = f"exportacao_{category}_{year}.html"
+    return url, cache_filename
 
-    try:
-        html = fetch_or_cache(url, cache_filename)
-    except RuntimeError:
-        raise HTTPException(status_code=503,
-                            detail=(
-                                "Unable to access Embrapa website "
-                                "or cache for exportação data."))
 
-    data = parse_exportacao(html)
+def _unavailable() -> HTTPException:
+    return HTTPException(status_code=503,
+                         detail=(
+                             "Unable to access Embrapa website "
+                             "or cache for exportação data."))
+
+
+def _parse(cache_filename: str, html: str, year: int,
+           category: str) -> list[dict]:
+    data = parse_with_cache(cache_filename, html, parse_exportacao)
 
     if not data:
         raise HTTPException(status_code=404,
@@ -60,3 +70,63 @@ def get_exportacao_data(year: int, category: str) -> list[dict]:
                                     f"'{category}' in year {year}."))
 
     return data
+
+
+@known_year("exportacao")
+@cached_result("exportacao")
+@served_from_store("exportacao")
+def get_exportacao_data(year: int, category: str) -> list[dict]:
+    """
+    Retrieves and parses 'Processamento' data for a given year and category
+    from Embrapa, using a cached version when available.
+
+    Args:
+        year (int): Year to retrieve data for.
+        category (str): One of the valid processing categories.
+
+    Returns:
+        list[dict]: Parsed processing data for the selected category and year.
+
+    Raises:
+        HTTPException: If the category is invalid or data is unavailable.
+    """
+    url, cache_filename = build_exportacao_request(year, category)
+
+    try:
+        html = fetch_or_cache(url, cache_filename,
+                              **cache_options("exportacao", year, category))
+    except RuntimeError:
+        raise _unavailable()
+
+    return _parse(cache_filename, html, year, category)
+
+
+@known_year("exportacao")
+@cached_result("exportacao")
+@served_from_store("exportacao")
+async def get_exportacao_data_async(year: int, category: str) -> list[dict]:
+    """
+    Async version of `get_exportacao_data`. Fetches through the pooled async
+    client and parses in the threadpool.
+
+    Args:
+        year (int): Year to retrieve data for.
+        category (str): One of the valid export categories.
+
+    Returns:
+        list[dict]: Parsed export data for the selected category and year.
+
+    Raises:
+        HTTPException: If the category is invalid or data is unavailable.
+    """
+    url, cache_filename = build_exportacao_request(year, category)
+
+    try:
+        html = await fetch_or_cache_async(
+            url, cache_filename, **cache_options("exportacao", year, category)
+        )
+    except RuntimeError:
+        raise _unavailable()
+
+    return await run_in_threadpool(_parse, cache_filename, html, year,
+                                   category)
@@ -1,39 +1,584 @@
-import os
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import httpx
 import requests
+from fastapi.concurrency import run_in_threadpool
+from requests.adapters import HTTPAdapter
+
+from ..config import settings
+from ..metrics import (
+    CACHE_EVENTS,
+    UPSTREAM_ERRORS,
+    UPSTREAM_REQUESTS,
+    dataset_of,
+    stage_timer
+)
+from .cache_backend import CacheBackend, CacheEntry, get_cache_backend
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    is_upstream_failure
+)
+from .deadline import DeadlineExceeded, attempt_timeout, remaining_time
+from .single_flight import SingleFlight
+from .year_catalog import year_catalog
+
+# Shared keep-alive session for the blocking fetch path
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(
+    pool_connections=settings.upstream_max_keepalive_connections,
+    pool_maxsize=settings.upstream_max_connections
+))
+_session.mount("https://", HTTPAdapter(
+    pool_connections=settings.upstream_max_keepalive_connections,
+    pool_maxsize=settings.upstream_max_connections
+))
+
+# Shared pooled client for the async fetch path, created on first use
+_async_client: Optional[httpx.AsyncClient] = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+# Coalesces concurrent cache misses for the same page
+fetch_flight = SingleFlight()
+
+# Fails cache misses fast while Embrapa is down instead of waiting for the
+# full timeout on every one of them
+upstream_breaker = CircuitBreaker(
+    "embrapa",
+    failure_threshold=settings.circuit_failure_threshold,
+    reset_seconds=settings.circuit_reset_seconds,
+    half_open_probes=settings.circuit_half_open_probes
+)
+
+# Background refreshes of stale cache entries (one at a time per page)
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=settings.cache_refresh_workers,
+    thread_name_prefix="cache-refresh"
+)
+_refreshing: set[str] = set()
+_refresh_failed_at: dict[str, float] = {}
+_refresh_lock = threading.Lock()
+
+
+def _read_cache(backend: CacheBackend, key: str) -> Optional[CacheEntry]:
+    """
+    Reads a cached page if it exists.
+
+    Args:
+        backend (CacheBackend): The page cache.
+        key (str): Cache key of the page.
+
+    Returns:
+        Optional[CacheEntry]: The cached page, or None if it is not cached.
+    """
+    with stage_timer("cache_lookup", dataset_of(key)):
+        return backend.get(key)
+
+
+def _conditional_headers(entry: Optional[CacheEntry]) -> dict[str, str]:
+    """
+    Builds the revalidation headers for a page already in the cache, so an
+    unchanged page costs the upstream a 304 instead of a full body.
+    """
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _refresh(url: str, backend: CacheBackend, entry: CacheEntry,
+             on_refresh: Optional[Callable[[], None]]) -> None:
+    """
+    Re-fetches a stale page in the background. On failure the stale page is
+    kept and no new attempt is made for a while
+    (`settings.cache_refresh_retry_seconds`).
+    """
+    key = entry.key
+    try:
+        html = fetch_flight.do(key, lambda: _fetch(url, backend, key, entry))
+    except RuntimeError as e:
+        with _refresh_lock:
+            _refresh_failed_at[key] = time.monotonic()
+        print(f"[STALE] Refresh failed, serving stale {key}: {e}")
+    else:
+        with _refresh_lock:
+            _refresh_failed_at.pop(key, None)
+        if on_refresh is not None and html != entry.html:
+            on_refresh()
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(url: str, backend: CacheBackend, entry: CacheEntry,
+                      on_refresh: Optional[Callable[[], None]]) -> None:
+    """
+    Starts a background refresh of a stale page unless one is already
+    running or the last attempt failed recently.
+    """
+    with _refresh_lock:
+        if entry.key in _refreshing:
+            return
+        failed_at = _refresh_failed_at.get(entry.key)
+        if (failed_at is not None and time.monotonic() - failed_at
+                < settings.cache_refresh_retry_seconds):
+            return
+        _refreshing.add(entry.key)
+
+    _refresh_executor.submit(_refresh, url, backend, entry, on_refresh)
+
+
+def _serve_cached(url: str, backend: CacheBackend, key: str,
+                  max_age: Optional[float],
+                  on_refresh: Optional[Callable[[], None]]) -> Optional[str]:
+    """
+    Returns the cached page, if any. A page older than `max_age` is still
+    returned (stale-while-revalidate) and refreshed in the background.
+
+    Args:
+        url (str): The URL of the page, used for the refresh.
+        backend (CacheBackend): The page cache.
+        key (str): Cache key of the page.
+        max_age (Optional[float]): Freshness lifetime in seconds. None means
+            the cached page never goes stale.
+        on_refresh (Optional[Callable[[], None]]): Called after a background
+            refresh changed the page, e.g. to drop derived caches.
+
+    Returns:
+        Optional[str]: The cached HTML, or None if the page is not cached.
+    """
+    dataset = dataset_of(key)
+    entry = _read_cache(backend, key)
+    if entry is None:
+        CACHE_EVENTS.inc(dataset, "page", "miss")
+        return None
+
+    if max_age is not None and time.time() - entry.fetched_at > max_age:
+        CACHE_EVENTS.inc(dataset, "page", "stale")
+        _schedule_refresh(url, backend, entry, on_refresh)
+    else:
+        CACHE_EVENTS.inc(dataset, "page", "hit")
+
+    return entry.html
+
+
+def _write_cache(backend: CacheBackend, key: str, url: str, html: str,
+                 etag: Optional[str], last_modified: Optional[str]) -> None:
+    """
+    Stores a freshly fetched page with its upstream validators, and
+    updates the year catalog from it.
+
+    Args:
+        backend (CacheBackend): The page cache.
+        key (str): Cache key of the page.
+        url (str): The URL the page was fetched from.
+        html (str): HTML content to store.
+        etag (Optional[str]): Upstream ETag header, if any.
+        last_modified (Optional[str]): Upstream Last-Modified header, if any.
+    """
+    backend.put(key, html, url=url, etag=etag, last_modified=last_modified)
+    year_catalog.observe(key, html)
 
 
 def fetch_or_cache(url: str, cache_filename: str,
-                   cache_dir: str = "cache") -> str:
+                   backend: Optional[CacheBackend] = None,
+                   max_age: Optional[float] = None,
+                   on_refresh: Optional[Callable[[], None]] = None) -> str:
     """
-    Fetches HTML from a URL and caches it locally.
-    If the cache file exists, it loads from the cache instead.
+    Fetches HTML from a URL and caches it.
+    If the page is cached, it loads from the cache instead. When the cached
+    page is older than `max_age`, it is still served and refreshed in the
+    background (stale-while-revalidate).
 
     Args:
         url (str): The URL to fetch.
-        cache_filename (str): The filename to use for the cached HTML.
-        cache_dir (str): The directory to store cache files. Defaults to
-                         "cache".
+        cache_filename (str): The cache key of the page.
+        backend (Optional[CacheBackend]): The page cache. Defaults to the
+                                   configured backend.
+        max_age (Optional[float]): Freshness lifetime of the cached page in
+                                   seconds. None means it never goes stale.
+        on_refresh (Optional[Callable[[], None]]): Called after a background
+                                   refresh changed the page.
 
     Returns:
         str: HTML content from the cache or freshly fetched.
     """
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, cache_filename)
+    backend = backend or get_cache_backend()
 
-    if os.path.exists(cache_path):
-        with open(cache_path, "r", encoding="utf-8") as f:
-            print(f"[CACHE] Loaded: {cache_filename}")
-            return f.read()
+    html = _serve_cached(url, backend, cache_filename, max_age, on_refresh)
+    if html is not None:
+        return html
 
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        html = response.text
+        return fetch_flight.do(
+            cache_filename, lambda: _fetch(url, backend, cache_filename),
+            timeout=remaining_time()
+        )
+    except TimeoutError:
+        raise DeadlineExceeded(
+            f"Request deadline exceeded waiting for {url}")
+
+
+def revalidate(url: str, cache_filename: str,
+               backend: Optional[CacheBackend] = None) -> str:
+    """
+    Fetches a page from Embrapa even if it is cached (conditionally, so an
+    unchanged page costs a 304) and updates the cache.
+
+    Args:
+        url (str): The URL to fetch.
+        cache_filename (str): The cache key of the page.
+        backend (Optional[CacheBackend]): The page cache. Defaults to the
+                                   configured backend.
+
+    Returns:
+        str: The current HTML of the page.
+
+    Raises:
+        RuntimeError: If the page could not be fetched.
+    """
+    backend = backend or get_cache_backend()
+    entry = backend.get(cache_filename)
+    return fetch_flight.do(
+        cache_filename, lambda: _fetch(url, backend, cache_filename, entry)
+    )
+
+
+def _check_circuit(dataset: str) -> bool:
+    """
+    Fails immediately, without a request, while the upstream circuit is
+    open.
+
+    Returns:
+        bool: True if the request is a half-open probe, whose slot must be
+        released if it ends without a result.
+
+    Raises:
+        CircuitOpenError: If the circuit is open.
+    """
+    try:
+        return upstream_breaker.check()
+    except CircuitOpenError:
+        UPSTREAM_REQUESTS.inc(dataset, "circuit_open")
+        raise
+
+
+def _record_error(dataset: str, e: Exception) -> None:
+    """
+    Counts a failed upstream request and reports it to the circuit breaker.
+    """
+    UPSTREAM_REQUESTS.inc(dataset, "error")
+    UPSTREAM_ERRORS.inc(dataset, type(e).__name__)
+    if is_upstream_failure(_status_of(e)):
+        upstream_breaker.failure()
+    else:
+        upstream_breaker.success()
+
+
+def _status_of(e: Exception) -> Optional[int]:
+    """
+    Returns the HTTP status of a failed request, or None if the upstream
+    never answered.
+    """
+    return getattr(getattr(e, "response", None), "status_code", None)
+
+
+def _retry_delay(attempt: int, e: Exception) -> Optional[float]:
+    """
+    Decides whether a failed attempt is retried.
 
-        with open(cache_path, "w", encoding="utf-8") as f:
-            f.write(html)
-            print(f"[FETCHED] Cached: {cache_filename}")
+    Only network errors, timeouts and 5xx answers are retried, at most
+    `settings.upstream_max_attempts` times in all, after an exponential
+    backoff with full jitter. No retry is made when the wait would use up
+    the request's remaining time.
 
+    Args:
+        attempt (int): Number of the attempt that failed, from 1.
+        e (Exception): Its error.
+
+    Returns:
+        Optional[float]: Seconds to wait before the next attempt, or None
+        to give up.
+    """
+    if (attempt >= settings.upstream_max_attempts
+            or not is_upstream_failure(_status_of(e))):
+        return None
+    delay = random.uniform(0, min(
+        settings.upstream_backoff_max_seconds,
+        settings.upstream_backoff_base_seconds * 2 ** (attempt - 1)
+    ))
+    remaining = remaining_time()
+    if remaining is not None and remaining <= delay:
+        return None
+    return delay
+
+
+def _fetch(url: str, backend: CacheBackend, key: str,
+           entry: Optional[CacheEntry] = None) -> str:
+    """
+    Downloads a page with the shared session and stores it in the cache,
+    retrying failures while the request has time left (see
+    `_retry_delay`). When `entry` is given the request is conditional, and
+    a 304 only renews the cached page.
+
+    Args:
+        url (str): The URL to fetch.
+        backend (CacheBackend): The page cache.
+        key (str): Cache key of the page.
+        entry (Optional[CacheEntry]): The stale cached page, if any.
+
+    Returns:
+        str: The freshly fetched (or revalidated) HTML.
+
+    Raises:
+        RuntimeError: If the page could not be fetched after the allowed
+            attempts, `CircuitOpenError` without a request while the
+            circuit is open, or `DeadlineExceeded` once the request's time
+            is up.
+    """
+    dataset = dataset_of(key)
+    attempt = 1
+    while True:
+        # Before the circuit check, so a request out of time never takes
+        # a half-open probe slot
+        timeout = attempt_timeout()
+        probe = _check_circuit(dataset)
+        try:
+            with stage_timer("fetch", dataset):
+                response = _session.get(
+                    url, headers=_conditional_headers(entry),
+                    timeout=timeout
+                )
+                if entry is not None and response.status_code == 304:
+                    upstream_breaker.success()
+                    UPSTREAM_REQUESTS.inc(dataset, "not_modified")
+                    backend.touch(key)
+                    return entry.html
+                response.raise_for_status()
+                html = response.text
+            break
+        except requests.RequestException as e:
+            _record_error(dataset, e)
+            delay = _retry_delay(attempt, e)
+            if delay is None:
+                raise RuntimeError(f"Failed to fetch {url}: {str(e)}")
+        except BaseException:
+            if probe:
+                upstream_breaker.release()
+            raise
+        time.sleep(delay)
+        attempt += 1
+
+    upstream_breaker.success()
+    UPSTREAM_REQUESTS.inc(dataset, "ok")
+
+    _write_cache(backend, key, url, html, response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"))
+    return html
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the shared pooled keep-alive client used for async fetches,
+    creating it on first use.
+
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=settings.upstream_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=settings.upstream_max_connections,
+                max_keepalive_connections=(
+                    settings.upstream_max_keepalive_connections),
+                keepalive_expiry=settings.upstream_keepalive_expiry_seconds
+            )
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """
+    Closes the shared async client. Called on application shutdown.
+    """
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    _host_semaphores.clear()
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    """
+    Returns the semaphore capping concurrent requests to the URL's host.
+
+    Args:
+        url (str): The URL about to be fetched.
+
+    Returns:
+        asyncio.Semaphore: Per-host concurrency limiter.
+    """
+    host = urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(
+            settings.upstream_max_concurrency_per_host
+        )
+    return _host_semaphores[host]
+
+
+async def fetch_or_cache_async(
+        url: str, cache_filename: str,
+        backend: Optional[CacheBackend] = None,
+        max_age: Optional[float] = None,
+        on_refresh: Optional[Callable[[], None]] = None) -> str:
+    """
+    Async counterpart of `fetch_or_cache`. Uses the shared pooled client so
+    a slow upstream does not hold a threadpool worker while waiting.
+
+    Args:
+        url (str): The URL to fetch.
+        cache_filename (str): The cache key of the page.
+        backend (Optional[CacheBackend]): The page cache. Defaults to the
+                                   configured backend.
+        max_age (Optional[float]): Freshness lifetime of the cached page in
+                                   seconds. None means it never goes stale.
+        on_refresh (Optional[Callable[[], None]]): Called after a background
+                                   refresh changed the page.
+
+    Returns:
+        str: HTML content from the cache or freshly fetched.
+    """
+    backend = backend or get_cache_backend()
+
+    html = await run_in_threadpool(_serve_cached, url, backend,
+                                   cache_filename, max_age, on_refresh)
+    if html is not None:
         return html
-    except requests.RequestException as e:
-        raise RuntimeError(f"Failed to fetch {url}: {str(e)}")
+
+    try:
+        return await fetch_flight.do_async(
+            cache_filename,
+            lambda: _fetch_async(url, backend, cache_filename),
+            timeout=remaining_time()
+        )
+    except TimeoutError:
+        raise DeadlineExceeded(
+            f"Request deadline exceeded waiting for {url}")
+
+
+async def _get(url: str, timeout: float) -> httpx.Response:
+    """
+    Sends one GET through the per-host limiter and fails on error statuses.
+    """
+    async with _host_semaphore(url):
+        response = await get_async_client().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+async def _get_hedged(url: str, timeout: float,
+                      dataset: str) -> httpx.Response:
+    """
+    Sends a GET and, if it has not answered after
+    `settings.upstream_hedge_after_seconds`, a second identical one. The
+    first success wins and the other request is cancelled.
+
+    Args:
+        url (str): The URL to fetch.
+        timeout (float): Timeout of each request, in seconds.
+        dataset (str): Dataset label for the metrics.
+
+    Returns:
+        httpx.Response: The first successful response.
+
+    Raises:
+        httpx.HTTPError: If every request sent failed.
+    """
+    hedge_after = settings.upstream_hedge_after_seconds
+    pending = {asyncio.ensure_future(_get(url, timeout))}
+    try:
+        if 0 < hedge_after < timeout:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                UPSTREAM_REQUESTS.inc(dataset, "hedged")
+                pending.add(asyncio.ensure_future(
+                    _get(url, timeout - hedge_after)
+                ))
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _fetch_async(url: str, backend: CacheBackend, key: str) -> str:
+    """
+    Downloads a page with the shared async client and stores it in the
+    cache, retrying like `_fetch` and hedging slow requests when
+    `settings.upstream_hedge_after_seconds` is set.
+
+    Args:
+        url (str): The URL to fetch.
+        backend (CacheBackend): The page cache.
+        key (str): Cache key of the page.
+
+    Returns:
+        str: The freshly fetched HTML.
+
+    Raises:
+        RuntimeError: If the page could not be fetched after the allowed
+            attempts, `CircuitOpenError` without a request while the
+            circuit is open, or `DeadlineExceeded` once the request's time
+            is up.
+    """
+    dataset = dataset_of(key)
+    attempt = 1
+    while True:
+        # Before the circuit check, so a request out of time never takes
+        # a half-open probe slot
+        timeout = attempt_timeout()
+        probe = _check_circuit(dataset)
+        try:
+            with stage_timer("fetch", dataset):
+                response = await _get_hedged(url, timeout, dataset)
+                html = response.text
+            break
+        except httpx.HTTPError as e:
+            _record_error(dataset, e)
+            delay = _retry_delay(attempt, e)
+            if delay is None:
+                raise RuntimeError(f"Failed to fetch {url}: {str(e)}")
+        except BaseException:
+            # Cancelled (client gone) or an unexpected error: the request
+            # has no result to report
+            if probe:
+                upstream_breaker.release()
+            raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+    upstream_breaker.success()
+    UPSTREAM_REQUESTS.inc(dataset, "ok")
+
+    await run_in_threadpool(_write_cache, backend, key, url, html,
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"))
+    return html
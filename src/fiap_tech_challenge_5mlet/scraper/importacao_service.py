@@ -1,5 +1,12 @@
 from fastapi import HTTPException
-from ..scraper import fetch_or_cache
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from ..scraper import fetch_or_cache, fetch_or_cache_async
+from .cache_backend import parse_with_cache
+from .result_cache import cached_result
+from .cache_policy import cache_options
+from .year_catalog import known_year
+from ..store import served_from_store
 from ..utils import (
     parse_importacao
     )
@@ -13,21 +20,21 @@ CATEGORIES_IMPORTACAO = {
 }
 
 
-def get_importacao_data(year: int, category: str) -> list[dict]:
+def build_importacao_request(year: int, category: str) -> tuple[str, str]:
     """
-    Retrieves and parses the 'Comercialização' data for a given year
-    from Embrapa's website or from the local cache.
+    Validates the category and builds the Embrapa URL and cache filename
+    for an 'Importação' page.
 
     Args:
-        year (int): Year of the data to retrieve.
+        year (int): Year to retrieve data for.
+        category (str): One of the valid import categories.
 
     Returns:
-        list[dict]: A list of parsed comercialização data records.
+        tuple[str, str]: The page URL and its cache filename.
 
     Raises:
-        HTTPException: If the data is not found or cannot be fetched.
+        HTTPException: If the category is invalid.
     """
-    # Construct the URL for the given year
     if category not in CATEGORIES_IMPORTACAO:
         raise HTTPException(
             status_code=400,
@@ -37,25 +44,27 @@ def get_importacao_data(year: int, category: str) -> list[dict]:
                 )
         )
 
+    # Construct the URL for the given year
     suboption = CATEGORIES_IMPORTACAO[category]
     url = (
-        f"http://vitibrasil.cnpuv.embrapa.br/index.php"
+        f"{settings.embrapa_base_url}"
         f"?ano={year}&opcao=opt_05&subopcao={suboption}"
     )
 
-    print(f"Fetching URL: {url}")
-
     cache_filename = f"importacao_{category}_{year}.html"
+    return url, cache_filename
+
+
+def _unavailable() -> HTTPException:
+    return HTTPException(status_code=503,
+                         detail=(
+                             "Unable to access Embrapa website "
+                             "or cache for importação data."))
 
-    try:
-        html = fetch_or_cache(url, cache_filename)
-    except RuntimeError:
-        raise HTTPException(status_code=503,
-                            detail=(
-                                "Unable to access Embrapa website "
-                                "or cache for importação data."))
 
-    data = parse_importacao(html)
+def _parse(cache_filename: str, html: str, year: int,
+           category: str) -> list[dict]:
+    data = parse_with_cache(cache_filename, html, parse_importacao)
 
     if not data:
         raise HTTPException(status_code=404,
@@ -63,3 +72,62 @@ def get_importacao_data(year: int, category: str) -> list[dict]:
                                     f"'{category}' in year {year}."))
 
     return data
+
+
+@known_year("importacao")
+@cached_result("importacao")
+@served_from_store("importacao")
+def get_importacao_data(year: int, category: str) -> list[dict]:
+    """
+    Retrieves and parses the 'Comercialização' data for a given year
+    from Embrapa's website or from the local cache.
+
+    Args:
+        year (int): Year of the data to retrieve.
+
+    Returns:
+        list[dict]: A list of parsed comercialização data records.
+
+    Raises:
+        HTTPException: If the data is not found or cannot be fetched.
+    """
+    url, cache_filename = build_importacao_request(year, category)
+
+    try:
+        html = fetch_or_cache(url, cache_filename,
+                              **cache_options("importacao", year, category))
+    except RuntimeError:
+        raise _unavailable()
+
+    return _parse(cache_filename, html, year, category)
+
+
+@known_year("importacao")
+@cached_result("importacao")
+@served_from_store("importacao")
+async def get_importacao_data_async(year: int, category: str) -> list[dict]:
+    """
+    Async version of `get_importacao_data`. Fetches through the pooled async
+    client and parses in the threadpool.
+
+    Args:
+        year (int): Year of the data to retrieve.
+        category (str): One of the valid import categories.
+
+    Returns:
+        list[dict]: Parsed import data for the selected category and year.
+
+    Raises:
+        HTTPException: If the category is invalid or data is unavailable.
+    """
+    url, cache_filename = build_importacao_request(year, category)
+
+    try:
+        html = await fetch_or_cache_async(
+            url, cache_filename, **cache_options("importacao", year, category)
+        )
+    except RuntimeError:
+        raise _unavailable()
+
+    return await run_in_threadpool(_parse, cache_filename, html, year,
+                                   category)
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from .datasets import DATASETS
+
+
+async def get_multi_year_data(dataset: str, years: list[int],
+                              category: Optional[str] = None) -> dict:
+    """
+    Fetches and parses several years of a dataset concurrently and merges
+    the results in year order.
+
+    Years that fail (e.g. no data or upstream unavailable) are reported in
+    `errors` instead of failing the whole request.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        years (list[int]): Years to retrieve.
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        dict: `{"years": [{"year", "data"}], "errors": [{"year",
+        "status_code", "detail"}]}`, both sorted by year.
+    """
+    spec = DATASETS[dataset]
+    semaphore = asyncio.Semaphore(settings.multi_year_concurrency)
+
+    async def load(year: int) -> tuple[int, Optional[list[dict]],
+                                       Optional[HTTPException]]:
+        async with semaphore:
+            try:
+                data = await spec.get_data_async(*spec.args(year, category))
+                return year, data, None
+            except HTTPException as e:
+                return year, None, e
+
+    results = await asyncio.gather(*(load(year)
+                                     for year in sorted(set(years))))
+
+    merged = {"years": [], "errors": []}
+    for year, data, error in results:
+        if error is None:
+            merged["years"].append({"year": year, "data": data})
+        else:
+            merged["errors"].append({
+                "year": year,
+                "status_code": error.status_code,
+                "detail": str(error.detail)
+            })
+    return merged
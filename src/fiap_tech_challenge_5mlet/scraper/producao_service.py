@@ -1,42 +1,104 @@
 from fastapi import HTTPException
-from ..scraper import fetch_or_cache
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from ..scraper import fetch_or_cache, fetch_or_cache_async
+from .cache_backend import parse_with_cache
+from .result_cache import cached_result
+from .cache_policy import cache_options
+from .year_catalog import known_year
+from ..store import served_from_store
 from ..utils import parse_producao
 
 
-def get_producao_data(year: int) -> list[dict]:
+def build_producao_request(year: int) -> tuple[str, str]:
     """
-    Retrieves and parses 'Produção' data for a given year from Embrapa,
-    using a cached version when available.
+    Builds the Embrapa URL and cache filename for a 'Produção' page.
 
     Args:
         year (int): Year to retrieve production data for.
 
     Returns:
-        list[dict]: Parsed production data for the given year.
-
-    Raises:
-        HTTPException: If data cannot be fetched or is not available.
+        tuple[str, str]: The page URL and its cache filename.
     """
     # Construct the URL for the Produção tab (option 02)
     url = (
-        f"http://vitibrasil.cnpuv.embrapa.br/index.php"
+        f"{settings.embrapa_base_url}"
         f"?ano={year}&opcao=opt_02"
         )
     cache_filename = f"producao_{year}.html"
+    return url, cache_filename
 
-    try:
-        html = fetch_or_cache(url, cache_filename)
-    except RuntimeError:
-        raise HTTPException(status_code=503,
-                            detail=(
-                                "Unable to access Embrapa "
-                                "or cache for produção."
-                                ))
 
-    data = parse_producao(html)
+def _unavailable() -> HTTPException:
+    return HTTPException(status_code=503,
+                         detail=(
+                             "Unable to access Embrapa "
+                             "or cache for produção."
+                             ))
+
+
+def _parse(cache_filename: str, html: str, year: int) -> list[dict]:
+    data = parse_with_cache(cache_filename, html, parse_producao)
 
     if not data:
         raise HTTPException(status_code=404,
                             detail=f"No produção data found for year {year}.")
 
     return data
+
+
+@known_year("producao")
+@cached_result("producao")
+@served_from_store("producao")
+def get_producao_data(year: int) -> list[dict]:
+    """
+    Retrieves and parses 'Produção' data for a given year from Embrapa,
+    using a cached version when available.
+
+    Args:
+        year (int): Year to retrieve production data for.
+
+    Returns:
+        list[dict]: Parsed production data for the given year.
+
+    Raises:
+        HTTPException: If data cannot be fetched or is not available.
+    """
+    url, cache_filename = build_producao_request(year)
+
+    try:
+        html = fetch_or_cache(url, cache_filename,
+                              **cache_options("producao", year))
+    except RuntimeError:
+        raise _unavailable()
+
+    return _parse(cache_filename, html, year)
+
+
+@known_year("producao")
+@cached_result("producao")
+@served_from_store("producao")
+async def get_producao_data_async(year: int) -> list[dict]:
+    """
+    Async version of `get_producao_data`. Fetches through the pooled async
+    client and parses in the threadpool.
+
+    Args:
+        year (int): Year to retrieve production data for.
+
+    Returns:
+        list[dict]: Parsed production data for the given year.
+
+    Raises:
+        HTTPException: If data cannot be fetched or is not available.
+    """
+    url, cache_filename = build_producao_request(year)
+
+    try:
+        html = await fetch_or_cache_async(
+            url, cache_filename, **cache_options("producao", year)
+        )
+    except RuntimeError:
+        raise _unavailable()
+
+    return await run_in_threadpool(_parse, cache_filename, html, year)
@@ -0,0 +1,187 @@
+"""
+In-process stand-in for a Redis server, covering the commands used by the
+shared cache (PING, GET, SET with EX/PX/NX, DEL, EXISTS, TTL, DBSIZE,
+FLUSHDB, AUTH, SELECT). Meant for local development and for exercising the
+shared cache without a real Redis.
+
+Usage:
+    python -m fiap_tech_challenge_5mlet.scraper.resp_server --port 6379
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Any, Optional
+
+from .shared_cache import read_reply
+
+
+def _encode_reply(value: Any) -> bytes:
+    """
+    Encodes a reply in RESP2.
+    """
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, Exception):
+        return f"-ERR {value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+class _Store:
+    """
+    Thread-safe key-value store with per-key expiry.
+    """
+
+    def __init__(self):
+        self._data: dict[bytes, tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: bytes) -> Optional[tuple[bytes, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None \
+                and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def execute(self, command: list[bytes]) -> Any:
+        name, args = command[0].upper(), command[1:]
+        with self._lock:
+            if name == b"PING":
+                return "PONG"
+            if name in (b"AUTH", b"SELECT"):
+                return "OK"
+            if name == b"GET":
+                entry = self._get(args[0])
+                return entry[0] if entry is not None else None
+            if name == b"SET":
+                return self._set(args)
+            if name == b"DEL":
+                return sum(self._data.pop(key, None) is not None
+                           for key in args)
+            if name == b"EXISTS":
+                return sum(self._get(key) is not None for key in args)
+            if name == b"TTL":
+                entry = self._get(args[0])
+                if entry is None:
+                    return -2
+                if entry[1] is None:
+                    return -1
+                return int(entry[1] - time.monotonic())
+            if name == b"DBSIZE":
+                return len(self._data)
+            if name == b"FLUSHDB":
+                self._data.clear()
+                return "OK"
+        return ValueError(f"unknown command '{name.decode()}'")
+
+    def _set(self, args: list[bytes]) -> Any:
+        key, value, options = args[0], args[1], args[2:]
+        expires_at = None
+        i = 0
+        while i < len(options):
+            option = options[i].upper()
+            if option == b"EX":
+                expires_at = time.monotonic() + int(options[i + 1])
+                i += 2
+            elif option == b"PX":
+                expires_at = time.monotonic() + int(options[i + 1]) / 1000
+                i += 2
+            elif option == b"NX":
+                if self._get(key) is not None:
+                    return None
+                i += 1
+            else:
+                return ValueError("syntax error")
+        self._data[key] = (value, expires_at)
+        return "OK"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            self.wfile.write(_encode_reply(self.server.store.execute(command)))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalRespServer:
+    """
+    Redis-protocol server running in a background thread.
+
+    Example:
+        with LocalRespServer() as server:
+            cache = SharedCache(server.url, ttl_seconds=60, prefix="test")
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = _Server((host, port), _Handler)
+        self._server.store = _Store()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The redis:// URL of the server.
+        """
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "LocalRespServer":
+        """
+        Starts serving in a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and closes its socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalRespServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a local Redis-protocol stand-in server."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(argv)
+
+    server = LocalRespServer(args.host, args.port)
+    print(f"[RESP] Serving on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+import functools
+import hashlib
+import inspect
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..metrics import CACHE_EVENTS, stage_timer
+from .shared_cache import shared_cache
+from .single_flight import SingleFlight
+
+CacheKey = tuple[str, Optional[str], int]
+
+
+def _estimate_size(obj: Any) -> int:
+    """
+    Roughly estimates the memory footprint of a parsed result.
+
+    Args:
+        obj (Any): A parsed payload (nested lists, dicts, strings, numbers).
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _estimate_size(key) + _estimate_size(value)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            size += _estimate_size(item)
+    return size
+
+
+class ResultCache:
+    """
+    Bounded in-memory LRU cache with TTL for parsed scraper results.
+
+    Entries are evicted in least-recently-used order when either the entry
+    limit or the memory budget is exceeded. Expired entries are dropped on
+    access.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float,
+                 max_bytes: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value for a key, or None on a miss.
+
+        Args:
+            key (Hashable): Cache key, usually (dataset, category, year).
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any,
+            ttl_seconds: Optional[float] = None) -> None:
+        """
+        Stores a value, evicting older entries if the cache is over budget.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Parsed result to store.
+            ttl_seconds (Optional[float]): Lifetime of this entry. Defaults
+                to the cache's TTL.
+        """
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return  # Never cache a single entry larger than the budget
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            expires_at = time.monotonic() + (
+                self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            )
+            self._entries[key] = (value, expires_at, size)
+            self.current_bytes += size
+
+            while (len(self._entries) > self.max_entries
+                   or self.current_bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes a single entry from the cache if present.
+
+        Args:
+            key (Hashable): Cache key to drop.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """
+        Drops every entry and resets the memory accounting.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Entries, bytes used, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+result_cache = ResultCache(
+    max_entries=settings.result_cache_max_entries,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_bytes=settings.result_cache_max_bytes
+)
+
+# Strong ETags of the parsed results, kept after the results themselves are
+# evicted so conditional requests can be answered without parsing
+etag_cache = ResultCache(
+    max_entries=settings.result_cache_max_entries * 8,
+    ttl_seconds=settings.cache_ttl_historical_seconds,
+    max_bytes=settings.result_cache_max_bytes
+)
+
+# Encoded JSON response bodies, so repeat requests skip response validation
+# and serialization
+response_cache = ResultCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_bytes=settings.response_cache_max_bytes
+)
+
+# Per-page query indexes (filters, sorting, pagination) over validated rows
+index_cache = ResultCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_bytes=settings.response_cache_max_bytes
+)
+
+# Compact typed copies of product pages, behind the numeric responses
+typed_cache = ResultCache(
+    max_entries=settings.response_cache_max_entries,
+    ttl_seconds=settings.result_cache_ttl_seconds,
+    max_bytes=settings.response_cache_max_bytes
+)
+
+# Pages without data (the 404 detail per key), so repeat requests for them
+# skip disk and parsing. Each entry gets its own TTL (see `negative_ttl`)
+negative_cache = ResultCache(
+    max_entries=settings.negative_cache_max_entries,
+    ttl_seconds=settings.negative_cache_ttl_historical_seconds,
+    max_bytes=settings.negative_cache_max_entries * 1024
+)
+
+# Coalesces concurrent loads (fetch + parse) of the same dataset page
+load_flight = SingleFlight()
+
+
+def compute_etag(data: list[dict]) -> str:
+    """
+    Computes a strong ETag from the content of a parsed result.
+
+    Args:
+        data (list[dict]): Parsed result.
+
+    Returns:
+        str: Quoted hex digest of the canonical JSON encoding.
+    """
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False,
+                         separators=(",", ":")).encode("utf-8")
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def invalidate_page(key: CacheKey) -> None:
+    """
+    Drops the parsed result, the typed copy, the encoded responses, the
+    query indexes, the ETag and any "no data" entry of a page, e.g. after
+    its HTML was refreshed. The shared cache entry is dropped too, so other
+    nodes pick up the new version.
+
+    Args:
+        key (CacheKey): The (dataset, category, year) key.
+    """
+    result_cache.invalidate(key)
+    for cache in (response_cache, index_cache):
+        cache.invalidate(key)
+        cache.invalidate(numeric_key(key))
+    typed_cache.invalidate(key)
+    etag_cache.invalidate(key)
+    negative_cache.invalidate(key)
+    if shared_cache is not None:
+        shared_cache.invalidate(key)
+
+
+def clear_caches() -> None:
+    """
+    Drops every in-process parsed result, typed page, encoded response,
+    query index, ETag and "no data" entry.
+    """
+    result_cache.clear()
+    response_cache.clear()
+    index_cache.clear()
+    typed_cache.clear()
+    etag_cache.clear()
+    negative_cache.clear()
+
+
+def _store_result(key: CacheKey, data: list[dict]) -> None:
+    """
+    Keeps a parsed result in the in-process caches.
+    """
+    result_cache.set(key, data)
+    etag_cache.set(key, compute_etag(data))
+
+
+def make_key(dataset: str, year: int,
+             category: Optional[str] = None) -> CacheKey:
+    """
+    Builds the cache key for a dataset page.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        CacheKey: The (dataset, category, year) tuple.
+    """
+    return (dataset, category, year)
+
+
+def numeric_key(key: CacheKey) -> tuple:
+    """
+    Returns the key of the numeric representation of a page in the
+    response and index caches.
+
+    Args:
+        key (CacheKey): The (dataset, category, year) key.
+
+    Returns:
+        tuple: The key, tagged as numeric.
+    """
+    return key + ("numeric",)
+
+
+def _lookup(dataset: str, key: CacheKey) -> Optional[list[dict]]:
+    """
+    Looks a page up in the in-process result cache, recording the outcome.
+    """
+    with stage_timer("cache_lookup", dataset):
+        cached = result_cache.get(key)
+    CACHE_EVENTS.inc(dataset, "result", "miss" if cached is None else "hit")
+    return cached
+
+
+def _lookup_shared(dataset: str, key: CacheKey) -> Optional[list[dict]]:
+    """
+    Looks a page up in the shared cache, recording the outcome.
+    """
+    with stage_timer("cache_lookup", dataset):
+        data = shared_cache.get(key)
+    CACHE_EVENTS.inc(dataset, "shared", "miss" if data is None else "hit")
+    return data
+
+
+def cached_result(dataset: str) -> Callable:
+    """
+    Decorator that serves a `get_*_data(year[, category])` function, sync or
+    async, from the in-process result cache, so repeat queries skip disk and
+    parsing. When a shared cache is configured, it is checked on a local
+    miss and filled after every load, so a page is parsed once across all
+    workers and instances.
+
+    Concurrent misses for the same key are coalesced so the page is fetched
+    and parsed only once. Errors raised by the wrapped function are not
+    cached.
+
+    Args:
+        dataset (str): Dataset name used as the first element of the key.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(year: int, *args) -> list[dict]:
+                key = make_key(dataset, year, args[0] if args else None)
+
+                cached = _lookup(dataset, key)
+                if cached is not None:
+                    return cached
+
+                async def load() -> list[dict]:
+                    if shared_cache is not None:
+                        data = await run_in_threadpool(_lookup_shared,
+                                                       dataset, key)
+                        if data is not None:
+                            _store_result(key, data)
+                            return data
+
+                    data = await func(year, *args)
+                    _store_result(key, data)
+                    if shared_cache is not None:
+                        await run_in_threadpool(shared_cache.set, key, data)
+                    return data
+
+                return await load_flight.do_async(key, load)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(year: int, *args) -> list[dict]:
+            key = make_key(dataset, year, args[0] if args else None)
+
+            cached = _lookup(dataset, key)
+            if cached is not None:
+                return cached
+
+            def load() -> list[dict]:
+                if shared_cache is not None:
+                    data = _lookup_shared(dataset, key)
+                    if data is not None:
+                        _store_result(key, data)
+                        return data
+
+                data = func(year, *args)
+                _store_result(key, data)
+                if shared_cache is not None:
+                    shared_cache.set(key, data)
+                return data
+
+            return load_flight.do(key, load)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,287 @@
+import json
+import socket
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+try:
+    import msgpack
+except ImportError:  # installed with the shared-cache extra; JSON otherwise
+    msgpack = None
+
+from ..config import settings
+
+# First byte of every stored value, so nodes with and without msgpack can
+# read each other's entries
+_JSON = b"j"
+_MSGPACK = b"m"
+
+
+class RespError(Exception):
+    """
+    Error reply from a Redis-protocol server.
+    """
+
+
+def _encode_command(*args: Any) -> bytes:
+    """
+    Encodes a command as a RESP array of bulk strings.
+    """
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        parts.append(f"${len(arg)}\r\n".encode() + arg + b"\r\n")
+    return b"".join(parts)
+
+
+def read_reply(stream) -> Any:
+    """
+    Reads one RESP reply from a buffered socket stream.
+
+    Raises:
+        RespError: If the server replied with an error.
+        ConnectionError: If the connection was closed.
+    """
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed by the cache server")
+
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from the cache server: {line!r}")
+
+
+class RespClient:
+    """
+    Minimal blocking client for the Redis protocol (RESP2), with one
+    connection per thread.
+    """
+
+    def __init__(self, url: str, timeout: float):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        stream = getattr(self._local, "stream", None)
+        if stream is None:
+            sock = socket.create_connection((self.host, self.port),
+                                            timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            stream = sock.makefile("rwb")
+            self._local.sock, self._local.stream = sock, stream
+            if self.password:
+                self._send(stream, "AUTH", self.password)
+            if self.db:
+                self._send(stream, "SELECT", self.db)
+        return stream
+
+    @staticmethod
+    def _send(stream, *args: Any) -> Any:
+        stream.write(_encode_command(*args))
+        stream.flush()
+        return read_reply(stream)
+
+    def execute(self, *args: Any) -> Any:
+        """
+        Sends a command and returns its reply.
+
+        Raises:
+            RespError: If the server replied with an error.
+            OSError: If the server cannot be reached. The connection is
+                dropped and reopened by the next command.
+        """
+        try:
+            return self._send(self._connection(), *args)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """
+        Closes the calling thread's connection.
+        """
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = self._local.stream = None
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Encodes a parsed result with msgpack when available, compact JSON
+    otherwise.
+    """
+    if msgpack is not None:
+        return _MSGPACK + msgpack.packb(value, use_bin_type=True)
+    return _JSON + json.dumps(value, ensure_ascii=False,
+                              separators=(",", ":")).encode("utf-8")
+
+
+def decode_value(payload: bytes) -> Any:
+    """
+    Decodes a value stored by `encode_value`.
+
+    Raises:
+        ValueError: If the payload uses an unknown or unavailable encoding.
+    """
+    kind, body = payload[:1], payload[1:]
+    if kind == _JSON:
+        return json.loads(body)
+    if kind == _MSGPACK and msgpack is not None:
+        return msgpack.unpackb(body, raw=False)
+    raise ValueError("Unsupported shared cache encoding")
+
+
+class SharedCache:
+    """
+    Second-tier cache of parsed results in a Redis-protocol server, shared
+    by every worker and instance.
+
+    The cache fails open: when the server is unreachable, lookups miss and
+    writes are dropped, and the server is not contacted again for
+    `retry_seconds`.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str,
+                 timeout: float = 0.5, retry_seconds: float = 30):
+        self.client = RespClient(url, timeout)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.retry_seconds = retry_seconds
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: tuple) -> str:
+        dataset, category, year = key
+        return f"{self.prefix}:{dataset}:{category or '-'}:{year}"
+
+    def _call(self, *args: Any) -> Any:
+        if time.monotonic() < self._down_until:
+            raise ConnectionError("Shared cache marked down")
+        try:
+            return self.client.execute(*args)
+        except (OSError, RespError) as e:
+            with self._lock:
+                self.errors += 1
+                self._down_until = time.monotonic() + self.retry_seconds
+            print(f"[SHARED CACHE] {args[0]} failed: {e}")
+            raise ConnectionError(str(e))
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """
+        Returns the parsed result stored for a page, or None.
+
+        Args:
+            key (tuple): The (dataset, category, year) key.
+
+        Returns:
+            Optional[Any]: The cached value, or None on a miss or error.
+        """
+        try:
+            payload = self._call("GET", self._key(key))
+            value = decode_value(payload) if payload is not None else None
+        except (ConnectionError, ValueError):
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: tuple, value: Any,
+            ttl_seconds: Optional[int] = None) -> None:
+        """
+        Stores a parsed result with a TTL.
+
+        Args:
+            key (tuple): The (dataset, category, year) key.
+            value (Any): Parsed result.
+            ttl_seconds (Optional[int]): Lifetime of the entry. Defaults to
+                the cache TTL.
+        """
+        try:
+            self._call("SET", self._key(key), encode_value(value), "EX",
+                       int(ttl_seconds or self.ttl_seconds))
+        except ConnectionError:
+            pass
+
+    def invalidate(self, key: tuple) -> None:
+        """
+        Removes the entry of a page, on every node.
+
+        Args:
+            key (tuple): The (dataset, category, year) key.
+        """
+        try:
+            self._call("DEL", self._key(key))
+        except ConnectionError:
+            pass
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Hits, misses, errors and whether the server is marked down.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "down": time.monotonic() < self._down_until,
+                "encoding": "msgpack" if msgpack is not None else "json"
+            }
+
+
+def make_shared_cache() -> Optional[SharedCache]:
+    """
+    Builds the shared cache from the settings.
+
+    Returns:
+        Optional[SharedCache]: The cache, or None when
+            `settings.shared_cache_url` is not set.
+    """
+    if not settings.shared_cache_url:
+        return None
+    return SharedCache(
+        settings.shared_cache_url,
+        ttl_seconds=settings.shared_cache_ttl_seconds,
+        prefix=settings.shared_cache_prefix,
+        timeout=settings.shared_cache_timeout_seconds,
+        retry_seconds=settings.shared_cache_retry_seconds
+    )
+
+
+shared_cache = make_shared_cache()
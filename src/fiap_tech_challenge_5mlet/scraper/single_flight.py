@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class _LeaderGone(Exception):
+    """
+    Set on a call's future when its leader was cancelled (or interrupted)
+    before finishing, so that a waiter takes over instead.
+    """
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key so that only one of them
+    (the leader) does the work while the others wait for its result.
+
+    Both blocking callers (threads) and async callers (coroutines) share the
+    same in-flight table, so a thread can wait on work started by a
+    coroutine and vice versa. A leader that is cancelled does not pass its
+    cancellation on: the key is dropped and the waiters retry, one of them
+    becoming the new leader.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        """
+        Returns the in-flight future for a key, registering a new one if
+        there is none.
+
+        Args:
+            key (Hashable): Key identifying the work.
+
+        Returns:
+            tuple[Future, bool]: The shared future and whether the caller is
+            the leader.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def _abandon(self, key: Hashable, future: Future) -> None:
+        """
+        Drops a call whose leader was cancelled and wakes its waiters to
+        retry.
+        """
+        self._finish(key, future)
+        future.set_exception(_LeaderGone())
+
+    @staticmethod
+    def _time_left(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(
+            0.0, deadline - time.monotonic())
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: Optional[float] = None) -> Any:
+        """
+        Runs `fn` once for all concurrent blocking callers of the same key.
+
+        Args:
+            key (Hashable): Key identifying the work.
+            fn (Callable[[], Any]): The work to run if no call is in flight.
+            timeout (Optional[float]): How long a waiter waits for the
+                leader's result. None waits for as long as it takes.
+
+        Returns:
+            Any: The shared result. Exceptions are re-raised to every caller,
+            except the leader's cancellation, after which a waiter runs
+            `fn` again.
+
+        Raises:
+            TimeoutError: If a waiter's timeout expires first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result(self._time_left(deadline))
+            except _LeaderGone:
+                continue
+
+        try:
+            result = fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    async def do_async(self, key: Hashable,
+                       fn: Callable[[], Awaitable[Any]],
+                       timeout: Optional[float] = None) -> Any:
+        """
+        Async counterpart of `do`: awaits `fn()` once for all concurrent
+        callers of the same key.
+
+        Args:
+            key (Hashable): Key identifying the work.
+            fn (Callable[[], Awaitable[Any]]): Coroutine factory to run if no
+                call is in flight.
+            timeout (Optional[float]): How long a waiter waits for the
+                leader's result. None waits for as long as it takes.
+
+        Returns:
+            Any: The shared result. Exceptions are re-raised to every caller,
+            except the leader's cancellation, after which a waiter runs
+            `fn` again.
+
+        Raises:
+            TimeoutError: If a waiter's timeout expires first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded so a waiter giving up does not cancel the shared
+                # call
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)),
+                    self._time_left(deadline)
+                )
+            except _LeaderGone:
+                continue
+
+        try:
+            result = await fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # Cancelled (client gone, losing hedge, export stopped): the
+            # waiters did not ask for that, so one of them takes over
+            self._abandon(key, future)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._finish(key, future)
+
+    def stats(self) -> dict:
+        """
+        Returns the coalescing counters.
+
+        Returns:
+            dict: Leader calls, coalesced waiters and calls in flight.
+        """
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls)
+            }
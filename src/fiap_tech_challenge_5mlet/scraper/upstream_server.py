@@ -0,0 +1,213 @@
+"""
+In-process stand-in for the Embrapa site, serving saved pages (e.g. the
+files in `cache/`) at the same URLs as `index.php`, and the CSV downloads
+built from them at `download/<file>.csv`. Meant for benchmarks, parity
+checks and local development without network access.
+
+Usage:
+    python -m fiap_tech_challenge_5mlet.scraper.upstream_server --port 8080
+"""
+import argparse
+import hashlib
+import http.server
+import os
+import threading
+import time
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .csv_source import CSV_FILES, HTML_PARSERS, render_csv
+from .datasets import DATASETS
+
+
+def _route_table() -> dict[tuple[str, Optional[str]], tuple]:
+    """
+    Maps the (opcao, subopcao) query of every Embrapa tab to its dataset
+    and category.
+    """
+    routes = {}
+    for name, dataset in DATASETS.items():
+        for category in dataset.category_keys():
+            url, _ = dataset.build_request(*dataset.args(2000, category))
+            query = parse_qs(urlsplit(url).query)
+            routes[(query["opcao"][0], query.get("subopcao", [None])[0])] = (
+                name, category)
+    return routes
+
+
+def _csv_download(fixtures_dir: str, filename: str) -> Optional[bytes]:
+    """
+    Builds a tab's CSV download from its saved pages, one column per year.
+    """
+    found = [key for key, name in CSV_FILES.items() if name == filename]
+    if not found:
+        return None
+    name, category = found[0]
+    prefix = f"{name}_{category}_" if category else f"{name}_"
+
+    pages = {}
+    for saved in os.listdir(fixtures_dir):
+        year = saved.removeprefix(prefix).removesuffix(".html")
+        if not saved.startswith(prefix) or not year.isdigit():
+            continue
+        with open(os.path.join(fixtures_dir, saved), encoding="utf-8") as f:
+            try:
+                pages[int(year)] = HTML_PARSERS[name](f.read())
+            except Exception:
+                continue  # Empty tab
+    return render_csv(name, pages).encode("utf-8")
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.delay_seconds:
+            time.sleep(server.delay_seconds)
+
+        path = urlsplit(self.path).path
+        if path.startswith("/download/"):
+            body = _csv_download(server.fixtures_dir,
+                                 path.removeprefix("/download/"))
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        route = server.routes.get((query.get("opcao", [None])[0],
+                                   query.get("subopcao", [None])[0]))
+        try:
+            year = int(query["ano"][0])
+        except (KeyError, ValueError):
+            route = None
+
+        body = None
+        if route is not None:
+            name, category = route
+            dataset = DATASETS[name]
+            _, filename = dataset.build_request(*dataset.args(year,
+                                                              category))
+            path = os.path.join(server.fixtures_dir, filename)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    body = f.read()
+
+        if body is None:
+            self.send_error(404)
+            return
+
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class LocalUpstreamServer:
+    """
+    Embrapa stand-in running in a background thread.
+
+    Example:
+        with LocalUpstreamServer("cache") as upstream:
+            settings.embrapa_base_url = upstream.base_url
+    """
+
+    def __init__(self, fixtures_dir: str, host: str = "127.0.0.1",
+                 port: int = 0, delay_seconds: float = 0.0):
+        self._server = http.server.ThreadingHTTPServer((host, port),
+                                                       _Handler)
+        self._server.daemon_threads = True
+        self._server.fixtures_dir = fixtures_dir
+        self._server.delay_seconds = delay_seconds
+        self._server.routes = _route_table()
+        self._server.requests = 0
+        self._server.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """
+        The URL to use as `settings.embrapa_base_url`.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/index.php"
+
+    @property
+    def download_url(self) -> str:
+        """
+        The URL to use as `settings.embrapa_download_url`.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/download"
+
+    @property
+    def requests(self) -> int:
+        """
+        Number of requests served so far.
+        """
+        return self._server.requests
+
+    def start(self) -> "LocalUpstreamServer":
+        """
+        Starts serving in a daemon thread.
+        """
+        threading.Thread(target=self._server.serve_forever,
+                         daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and closes its socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalUpstreamServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve saved Embrapa pages at their upstream URLs."
+    )
+    parser.add_argument("--fixtures-dir", default="cache")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="Artificial latency per request in seconds.")
+    args = parser.parse_args(argv)
+
+    server = LocalUpstreamServer(args.fixtures_dir, args.host, args.port,
+                                 args.delay)
+    print(f"[UPSTREAM] Serving {args.fixtures_dir} at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+from email.utils import formatdate
+from typing import Optional
+
+from ..config import settings
+from ..store.parquet_store import page_path
+from .cache_backend import get_cache_backend
+from .datasets import DATASETS
+from .result_cache import etag_cache, make_key
+
+
+def page_modified_at(dataset: str, year: int,
+                     category: Optional[str] = None) -> Optional[float]:
+    """
+    Returns when the page backing a response was fetched, according to the
+    page cache (or the modification time of its Parquet file when serving
+    from the store).
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        Optional[float]: POSIX timestamp, or None if the page is not cached.
+    """
+    if settings.data_source == "parquet":
+        try:
+            return os.path.getmtime(page_path(dataset, year, category))
+        except OSError:
+            pass
+
+    spec = DATASETS[dataset]
+    _, cache_filename = spec.build_request(*spec.args(year, category))
+    return get_cache_backend().fetched_at(cache_filename)
+
+
+def page_validators(dataset: str, year: int,
+                    category: Optional[str] = None) -> dict[str, str]:
+    """
+    Returns the `ETag` and `Last-Modified` headers known for a page without
+    loading or parsing it.
+
+    The ETag is only known once the page has been parsed; Last-Modified
+    only once it has been cached.
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+
+    Returns:
+        dict[str, str]: Zero, one or both headers.
+    """
+    headers = {}
+
+    etag = etag_cache.get(make_key(dataset, year, category))
+    if etag is not None:
+        headers["ETag"] = etag
+
+    modified_at = page_modified_at(dataset, year, category)
+    if modified_at is not None:
+        headers["Last-Modified"] = formatdate(modified_at, usegmt=True)
+
+    return headers
@@ -0,0 +1,294 @@
+"""
+Catalog of the years Embrapa has data for.
+
+Every Embrapa page carries its tab's year range in the year picker
+(`<input name='ano' min='1970' max='2023'>`), so the catalog learns it from
+the pages already cached at startup and from every page fetched after
+that. Requests for years outside the range are answered with a 404 by
+`known_year` before any cache lookup or fetch, as are pages already found
+to have no data while their negative cache entry lasts. Each range is
+re-checked against Embrapa in the background every
+`settings.year_catalog_refresh_seconds`.
+"""
+import datetime
+import functools
+import inspect
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..metrics import CACHE_EVENTS, dataset_of
+from .cache_backend import CacheBackend, get_cache_backend
+from .cache_policy import negative_ttl
+from .result_cache import make_key, negative_cache
+
+# First year of every Embrapa series, used until a tab's range is known
+FIRST_YEAR = 1970
+
+_YEAR_INPUT = re.compile(r"<input[^>]*name=['\"]ano['\"][^>]*>")
+_BOUND = re.compile(r"\b(min|max)=['\"](\d{4})['\"]")
+
+
+def year_range(html: str) -> Optional[tuple[int, int]]:
+    """
+    Reads the year range from the year picker of an Embrapa page.
+
+    Args:
+        html (str): The page HTML.
+
+    Returns:
+        Optional[tuple[int, int]]: First and last year, or None if the page
+        has no year picker.
+    """
+    match = _YEAR_INPUT.search(html)
+    if match is None:
+        return None
+    bounds = dict(_BOUND.findall(match.group(0)))
+    if "min" not in bounds or "max" not in bounds:
+        return None
+    return int(bounds["min"]), int(bounds["max"])
+
+
+def year_of(cache_filename: str) -> Optional[int]:
+    """
+    Returns the year of a page from its cache filename
+    (e.g. "producao_2023.html" -> 2023), or None if it has none.
+    """
+    suffix = cache_filename.rsplit("_", 1)[-1].removesuffix(".html")
+    return int(suffix) if suffix.isdigit() else None
+
+
+class YearCatalog:
+    """
+    Year range of each dataset (Embrapa tab). Lookups are dictionary reads.
+    """
+
+    def __init__(self):
+        self._ranges: dict[str, tuple[int, int]] = {}
+        self._checked_at: dict[str, float] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="year-catalog"
+        )
+        self.rejected = 0
+
+    def years(self, dataset: str) -> tuple[int, int]:
+        """
+        Returns the first and last year of a dataset: the discovered range,
+        or 1970 to the current year until it is known.
+        """
+        return self._ranges.get(
+            dataset, (FIRST_YEAR, datetime.date.today().year)
+        )
+
+    def observe(self, cache_filename: str, html: str,
+                seen_at: Optional[float] = None) -> None:
+        """
+        Learns a dataset's year range from one of its pages.
+
+        Args:
+            cache_filename (str): The cache key of the page.
+            html (str): The page HTML.
+            seen_at (Optional[float]): When the page was fetched (POSIX
+                timestamp). Defaults to now.
+        """
+        bounds = year_range(html)
+        if bounds is None:
+            return
+        dataset = dataset_of(cache_filename)
+        with self._lock:
+            changed = self._ranges.get(dataset) != bounds
+            self._ranges[dataset] = bounds
+            self._checked_at[dataset] = max(
+                self._checked_at.get(dataset, 0.0),
+                time.time() if seen_at is None else seen_at
+            )
+        if changed:
+            print(f"[CATALOG] {dataset} years {bounds[0]}-{bounds[1]}")
+
+    def check(self, dataset: str, year: int) -> None:
+        """
+        Rejects years outside the dataset's range, and starts a background
+        refresh of the range when it is due.
+
+        Args:
+            dataset (str): Dataset name.
+            year (int): Requested year.
+
+        Raises:
+            HTTPException: 404 if the year is outside the range.
+        """
+        checked_at = self._checked_at.get(dataset)
+        if (checked_at is None or time.time() - checked_at
+                > settings.year_catalog_refresh_seconds):
+            self._schedule_refresh(dataset)
+
+        first, last = self.years(dataset)
+        if not first <= year <= last:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=404,
+                detail=(f"No {dataset} data for year {year}. Available "
+                        f"years: {first}-{last}.")
+            )
+
+    def _schedule_refresh(self, dataset: str) -> None:
+        with self._lock:
+            if dataset in self._refreshing:
+                return
+            self._refreshing.add(dataset)
+        self._executor.submit(self._refresh, dataset)
+
+    def _refresh(self, dataset: str) -> None:
+        """
+        Re-reads a dataset's range from Embrapa, using the page of its last
+        known year (a conditional request when that page is cached) or of
+        1970 while the range is unknown. A failed refresh is retried after
+        `settings.cache_refresh_retry_seconds`.
+        """
+        # Imported here: the services and the fetcher use this module
+        from .datasets import DATASETS
+        from .html_fetcher import revalidate
+
+        spec = DATASETS[dataset]
+        year = self._ranges.get(dataset, (FIRST_YEAR, FIRST_YEAR))[1]
+        args = spec.args(year, spec.category_keys()[0])
+        url, cache_filename = spec.build_request(*args)
+        try:
+            html = revalidate(url, cache_filename)
+        except RuntimeError as e:
+            with self._lock:
+                self._checked_at[dataset] = (
+                    time.time() - settings.year_catalog_refresh_seconds
+                    + settings.cache_refresh_retry_seconds
+                )
+            print(f"[CATALOG] Refresh of {dataset} failed: {e}")
+        else:
+            self.observe(cache_filename, html)
+        finally:
+            with self._lock:
+                self._refreshing.discard(dataset)
+
+    def stats(self) -> dict:
+        """
+        Returns the known ranges and counters.
+
+        Returns:
+            dict: Range per dataset and requests rejected.
+        """
+        with self._lock:
+            return {
+                "ranges": dict(self._ranges),
+                "rejected": self.rejected
+            }
+
+
+year_catalog = YearCatalog()
+
+
+def load_year_catalog(backend: Optional[CacheBackend] = None) -> None:
+    """
+    Learns the year ranges from the page cache, reading the most recent
+    cached page of each dataset, and purges cached pages for years outside
+    them (left by requests for impossible years). Only the cache's own
+    copies are purged; the loose HTML files in `cache/` are kept.
+
+    Args:
+        backend (Optional[CacheBackend]): The page cache. Defaults to the
+            configured backend.
+    """
+    backend = backend or get_cache_backend()
+    keys = [key for key in backend.keys() if year_of(key) is not None]
+
+    latest: dict[str, str] = {}
+    for key in keys:
+        dataset = dataset_of(key)
+        if dataset not in latest or year_of(key) > year_of(latest[dataset]):
+            latest[dataset] = key
+
+    for key in latest.values():
+        entry = backend.get(key)
+        if entry is not None:
+            year_catalog.observe(key, entry.html, entry.fetched_at)
+
+    known = year_catalog.stats()["ranges"]
+    for key in keys:
+        bounds = known.get(dataset_of(key))
+        if (bounds is not None
+                and not bounds[0] <= year_of(key) <= bounds[1]
+                and backend.evict(key)):
+            print(f"[CATALOG] Purged {key}: outside {bounds[0]}-{bounds[1]}")
+
+
+def _check(dataset: str, year: int, category: Optional[str]) -> None:
+    """
+    Rejects a page outside the dataset's years or with a live negative
+    cache entry.
+
+    Raises:
+        HTTPException: 404 if the page has no data.
+    """
+    year_catalog.check(dataset, year)
+    detail = negative_cache.get(make_key(dataset, year, category))
+    if detail is not None:
+        CACHE_EVENTS.inc(dataset, "negative", "hit")
+        raise HTTPException(status_code=404, detail=detail)
+
+
+def _remember(error: HTTPException, dataset: str, year: int,
+              category: Optional[str]) -> None:
+    """
+    Keeps a "no data" (404) outcome in the negative cache, for
+    `negative_ttl(dataset, year)` seconds.
+    """
+    if error.status_code == 404:
+        negative_cache.set(make_key(dataset, year, category), error.detail,
+                           ttl_seconds=negative_ttl(dataset, year))
+
+
+def known_year(dataset: str) -> Callable:
+    """
+    Decorator that answers a `get_*_data(year[, category])` function with a
+    404, before anything else runs, for years outside the catalog and for
+    pages in the negative cache. Pages that turn out to have no data (404)
+    are added to the negative cache.
+
+    Args:
+        dataset (str): Dataset name.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(year: int, *args) -> list[dict]:
+                category = args[0] if args else None
+                _check(dataset, year, category)
+                try:
+                    return await func(year, *args)
+                except HTTPException as e:
+                    _remember(e, dataset, year, category)
+                    raise
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(year: int, *args) -> list[dict]:
+            category = args[0] if args else None
+            _check(dataset, year, category)
+            try:
+                return func(year, *args)
+            except HTTPException as e:
+                _remember(e, dataset, year, category)
+                raise
+
+        return wrapper
+
+    return decorator
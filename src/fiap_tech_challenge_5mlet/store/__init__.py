@@ -0,0 +1,13 @@
+from .parquet_store import (
+    read_page,
+    write_page,
+    load_dataset,
+    served_from_store
+)
+
+__all__ = [
+    "read_page",
+    "write_page",
+    "load_dataset",
+    "served_from_store"
+]
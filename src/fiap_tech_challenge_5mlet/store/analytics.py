@@ -0,0 +1,216 @@
+from typing import Literal, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from ..config import settings
+from ..scraper.result_cache import ResultCache
+from .parquet_store import TRADE_DATASETS, load_dataset
+
+Level = Literal["item", "subitem"]
+Aggregation = Literal["sum", "mean"]
+
+# Year x entity matrices, rebuilt at most once per TTL
+_matrix_cache = ResultCache(
+    max_entries=64,
+    ttl_seconds=settings.analytics_cache_ttl_seconds,
+    max_bytes=settings.result_cache_max_bytes
+)
+
+
+def _metric_for(dataset: str, metric: Optional[str]) -> str:
+    """
+    Validates the metric requested for a dataset and applies its default.
+
+    Raises:
+        HTTPException: If the metric does not exist for the dataset.
+    """
+    allowed = (["value_usd", "quantity_kg"] if dataset in TRADE_DATASETS
+               else ["quantity"])
+    metric = metric or allowed[0]
+    if metric not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=(f"Invalid metric for {dataset}. Choose one of: "
+                    f"{', '.join(allowed)}.")
+        )
+    return metric
+
+
+def year_entity_matrix(dataset: str, category: Optional[str] = None,
+                       metric: Optional[str] = None,
+                       level: Level = "item") -> pd.DataFrame:
+    """
+    Returns the year x entity matrix of a metric, built from the Parquet
+    store and cached in memory.
+
+    Entities are countries for importação/exportação and products for the
+    other datasets (`level` picks main products or subproducts). The
+    "Total" rows are excluded.
+
+    Args:
+        dataset (str): Dataset name.
+        category (Optional[str]): Only use this category. All categories are
+            summed when None.
+        metric (Optional[str]): "value_usd" or "quantity_kg" for trade
+            datasets, "quantity" for the others.
+        level (Level): "item" or "subitem", for product datasets.
+
+    Returns:
+        pd.DataFrame: float64 matrix indexed by year, one column per entity,
+        NaN where there is no value.
+
+    Raises:
+        HTTPException: If the metric is invalid or nothing is stored.
+    """
+    metric = _metric_for(dataset, metric)
+    key = (dataset, category, metric, level)
+
+    matrix = _matrix_cache.get(key)
+    if matrix is not None:
+        return matrix
+
+    frame = load_dataset(dataset, category)
+    if frame.empty:
+        raise HTTPException(
+            status_code=404,
+            detail=(f"No stored {dataset} data. Build the Parquet store "
+                    "with 'build-store' first.")
+        )
+
+    if dataset in TRADE_DATASETS:
+        frame = frame[frame["country"] != "Total"]
+        entity = frame["country"]
+    else:
+        frame = frame[frame["kind"] == level]
+        entity = frame["product"]
+        if level == "subitem":
+            # Subproduct names repeat across products (e.g. "Tinto")
+            entity = frame["parent"] + " / " + frame["product"]
+
+    # min_count=1 keeps cells with only missing values ("-") as NaN
+    # instead of summing them to 0
+    values = pd.DataFrame({
+        "year": frame["year"],
+        "entity": entity.astype(str),
+        "value": frame[metric].astype("float64")
+    }).groupby(["year", "entity"])["value"].sum(min_count=1)
+    matrix = values.unstack("entity").reindex(
+        index=sorted(values.index.unique("year")),
+        columns=sorted(values.index.unique("entity"))
+    )
+
+    _matrix_cache.set(key, matrix)
+    return matrix
+
+
+def _slice_years(matrix: pd.DataFrame, start_year: Optional[int],
+                 end_year: Optional[int]) -> pd.DataFrame:
+    return matrix.loc[start_year:end_year]
+
+
+def _clean(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def totals(matrix: pd.DataFrame, start_year: Optional[int] = None,
+           end_year: Optional[int] = None,
+           agg: Aggregation = "sum") -> list[dict]:
+    """
+    Aggregates each entity over a year range.
+
+    Args:
+        matrix (pd.DataFrame): Output of `year_entity_matrix`.
+        start_year (Optional[int]): First year, inclusive.
+        end_year (Optional[int]): Last year, inclusive.
+        agg (Aggregation): "sum" or "mean" over the years with data.
+
+    Returns:
+        list[dict]: `{"entity", "value", "years"}` per entity, largest
+        value first.
+    """
+    window = _slice_years(matrix, start_year, end_year)
+    values = window.sum(min_count=1) if agg == "sum" else window.mean()
+    counts = window.count()
+
+    order = np.argsort(-values.fillna(-np.inf).to_numpy(), kind="stable")
+    return [
+        {
+            "entity": values.index[i],
+            "value": _clean(values.iloc[i]),
+            "years": int(counts.iloc[i])
+        }
+        for i in order
+    ]
+
+
+def ranking(matrix: pd.DataFrame, start_year: Optional[int] = None,
+            end_year: Optional[int] = None, agg: Aggregation = "sum",
+            top: int = 10) -> list[dict]:
+    """
+    Ranks entities by their aggregate over a year range.
+
+    Returns:
+        list[dict]: `{"rank", "entity", "value"}` for the top entities.
+    """
+    ranked = [row for row in totals(matrix, start_year, end_year, agg)
+              if row["value"] is not None][:top]
+    return [
+        {"rank": position, "entity": row["entity"], "value": row["value"]}
+        for position, row in enumerate(ranked, start=1)
+    ]
+
+
+def growth(matrix: pd.DataFrame, start_year: Optional[int] = None,
+           end_year: Optional[int] = None,
+           entities: Optional[list[str]] = None) -> list[dict]:
+    """
+    Computes the year-over-year change of each entity.
+
+    Args:
+        matrix (pd.DataFrame): Output of `year_entity_matrix`.
+        start_year (Optional[int]): First year, inclusive.
+        end_year (Optional[int]): Last year, inclusive.
+        entities (Optional[list[str]]): Only return these entities.
+
+    Returns:
+        list[dict]: `{"entity", "year", "value", "delta", "growth_pct"}`
+        per entity and year, ordered by entity then year. `delta` and
+        `growth_pct` are None for the first year or when a value is
+        missing.
+    """
+    if entities:
+        matrix = matrix.loc[:, matrix.columns.isin(entities)]
+
+    # Compute deltas over the full history so the first requested year
+    # still compares against the previous one
+    values = matrix.to_numpy()
+    previous = np.vstack([np.full((1, values.shape[1]), np.nan),
+                          values[:-1]])
+    # Years must be consecutive to be compared
+    years = matrix.index.to_numpy()
+    consecutive = np.concatenate([[False], np.diff(years) == 1])
+    previous[~consecutive] = np.nan
+
+    delta = values - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(previous != 0, delta / previous * 100, np.nan)
+
+    mask = np.ones(len(years), dtype=bool)
+    if start_year is not None:
+        mask &= years >= start_year
+    if end_year is not None:
+        mask &= years <= end_year
+
+    rows = []
+    for j, entity in enumerate(matrix.columns):
+        for i in np.flatnonzero(mask):
+            rows.append({
+                "entity": entity,
+                "year": int(years[i]),
+                "value": _clean(values[i, j]),
+                "delta": _clean(delta[i, j]),
+                "growth_pct": _clean(pct[i, j])
+            })
+    return rows
@@ -0,0 +1,171 @@
+"""
+Builds the Parquet store from the scraped pages.
+
+Every (dataset, category, year) page in the range is fetched (or loaded from
+the HTML cache), parsed and written as a typed Parquet table partitioned by
+category and year. With `--source csv`, each tab's CSV download is fetched
+once instead and split into the same per-year pages; `--check-parity`
+compares those pages with the HTML parsers' output.
+
+Usage:
+    poetry run build-store --start-year 1970 --end-year 2023
+    poetry run build-store --source csv --check-parity
+"""
+import argparse
+import datetime
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+from ..crawler import build_tasks
+from ..scraper import DATASETS
+from ..scraper.csv_source import check_parity, fetch_csv_pages
+from .parquet_store import write_page
+
+
+@dataclass
+class IngestReport:
+    written: int = 0
+    missing: int = 0
+    failed: int = 0
+    mismatches: list[str] = field(default_factory=list)
+
+
+def ingest(start_year: int, end_year: int,
+           datasets: Optional[Iterable[str]] = None,
+           root: Optional[str] = None,
+           verbose: bool = True) -> IngestReport:
+    """
+    Parses every page in the range and writes it to the Parquet store.
+
+    Args:
+        start_year (int): First year, inclusive.
+        end_year (int): Last year, inclusive.
+        datasets (Optional[Iterable[str]]): Dataset names to ingest.
+            Defaults to all of them.
+        root (Optional[str]): Store directory. Defaults to
+            `settings.parquet_store_dir`.
+        verbose (bool): Print one line per page.
+
+    Returns:
+        IngestReport: Counts of written, missing (no data) and failed pages.
+    """
+    report = IngestReport()
+
+    for task in build_tasks(start_year, end_year, datasets):
+        spec = DATASETS[task.dataset]
+        try:
+            data = spec.get_data(*spec.args(task.year, task.category))
+        except HTTPException as e:
+            if e.status_code == 404:
+                report.missing += 1
+            else:
+                report.failed += 1
+            if verbose:
+                print(f"[STORE] {task.dataset} {task.category or '-'} "
+                      f"{task.year} skipped ({e.status_code})")
+            continue
+
+        write_page(task.dataset, task.year, task.category, data, root)
+        report.written += 1
+        if verbose:
+            print(f"[STORE] {task.dataset} {task.category or '-'} "
+                  f"{task.year} written")
+
+    return report
+
+
+def ingest_csv(start_year: int, end_year: int,
+               datasets: Optional[Iterable[str]] = None,
+               root: Optional[str] = None, parity: bool = False,
+               verbose: bool = True) -> IngestReport:
+    """
+    Writes every page in the range to the Parquet store from the CSV
+    downloads: one request per dataset and category instead of one per
+    year.
+
+    Args:
+        start_year (int): First year, inclusive.
+        end_year (int): Last year, inclusive.
+        datasets (Optional[Iterable[str]]): Dataset names to ingest.
+            Defaults to all of them.
+        root (Optional[str]): Store directory. Defaults to
+            `settings.parquet_store_dir`.
+        parity (bool): Compare each page with the HTML parsers' output and
+            collect the differences in `IngestReport.mismatches`.
+        verbose (bool): Print one line per file.
+
+    Returns:
+        IngestReport: Counts of written, missing (no data) and failed pages.
+    """
+    report = IngestReport()
+    years = range(start_year, end_year + 1)
+
+    for name in datasets or DATASETS:
+        for category in DATASETS[name].category_keys():
+            try:
+                pages = fetch_csv_pages(name, category)
+            except RuntimeError as e:
+                report.failed += len(years)
+                if verbose:
+                    print(f"[STORE] {name} {category or '-'} failed: {e}")
+                continue
+
+            written = 0
+            for year in years:
+                if year not in pages:
+                    report.missing += 1
+                    continue
+                write_page(name, year, category, pages[year], root)
+                written += 1
+            report.written += written
+            if verbose:
+                print(f"[STORE] {name} {category or '-'} {written} years "
+                      f"written from CSV")
+
+            if parity:
+                report.mismatches += check_parity(name, category, pages,
+                                                  years)
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Command-line entry point.
+    """
+    parser = argparse.ArgumentParser(
+        description="Build the Parquet store from the Embrapa pages."
+    )
+    parser.add_argument("--start-year", type=int, default=1970)
+    parser.add_argument("--end-year", type=int,
+                        default=datetime.date.today().year)
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS),
+                        help="Datasets to ingest (default: all).")
+    parser.add_argument("--store-dir", default=None,
+                        help="Store directory (default: PARQUET_STORE_DIR).")
+    parser.add_argument("--source", choices=["html", "csv"], default="html",
+                        help="Per-year HTML pages or per-tab CSV downloads.")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="With --source csv, compare every page with "
+                             "the HTML parsers' output.")
+    args = parser.parse_args(argv)
+
+    if args.source == "csv":
+        report = ingest_csv(args.start_year, args.end_year, args.datasets,
+                            args.store_dir, args.check_parity)
+    else:
+        report = ingest(args.start_year, args.end_year, args.datasets,
+                        args.store_dir)
+
+    print(f"[STORE] Done: {report.written} written, {report.missing} "
+          f"without data, {report.failed} failed")
+    if args.check_parity:
+        for mismatch in report.mismatches:
+            print(f"[STORE] Parity: {mismatch}")
+        print(f"[STORE] Parity: {len(report.mismatches)} mismatching pages")
+    return 1 if report.failed or report.mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,294 @@
+import functools
+import inspect
+import os
+from typing import Callable, Optional
+
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..utils.typed_page import QUANTITY_FIELDS, parse_quantity
+
+# Datasets whose pages are a flat list of countries
+TRADE_DATASETS = {"importacao", "exportacao"}
+
+
+def page_to_frame(dataset: str, data: list[dict]) -> pd.DataFrame:
+    """
+    Flattens a parsed page into a typed table with one row per product,
+    subproduct, country or total.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        data (list[dict]): Output of the dataset's parser.
+
+    Returns:
+        pd.DataFrame: The typed table, in page order.
+    """
+    if dataset in TRADE_DATASETS:
+        frame = pd.DataFrame({
+            "country": pd.Series([row["country"] for row in data],
+                                 dtype="string"),
+            "quantity_kg": pd.Series([row["quantity_kg"] for row in data],
+                                     dtype="Float64"),
+            "value_usd": pd.Series([row["value_usd"] for row in data],
+                                   dtype="Float64")
+        })
+        frame.insert(0, "position",
+                     pd.Series(range(len(frame)), dtype="int32"))
+        return frame
+
+    field = QUANTITY_FIELDS[dataset]
+    kinds, products, parents, texts = [], [], [], []
+    for item in data:
+        if "total_overall" in item:
+            kinds.append("total")
+            products.append(None)
+            parents.append(None)
+            texts.append(item["total_overall"])
+            continue
+
+        kinds.append("item")
+        products.append(item["product"])
+        parents.append(None)
+        texts.append(item[field])
+        for sub in item["subproducts"]:
+            kinds.append("subitem")
+            products.append(sub["product"])
+            parents.append(item["product"])
+            texts.append(sub[field])
+
+    return pd.DataFrame({
+        "position": pd.Series(range(len(kinds)), dtype="int32"),
+        "kind": pd.Series(kinds, dtype="category"),
+        "product": pd.Series(products, dtype="string"),
+        "parent": pd.Series(parents, dtype="string"),
+        "quantity": pd.Series([parse_quantity(t) for t in texts],
+                              dtype="Int64"),
+        "quantity_text": pd.Series(texts, dtype="string")
+    })
+
+
+def _optional(value):
+    return None if pd.isna(value) else value
+
+
+def frame_to_page(dataset: str, frame: pd.DataFrame) -> list[dict]:
+    """
+    Rebuilds the parser output of a page from its stored table.
+
+    Args:
+        dataset (str): Dataset name (e.g. "producao").
+        frame (pd.DataFrame): Table produced by `page_to_frame`.
+
+    Returns:
+        list[dict]: The same structure the dataset's parser returns.
+    """
+    frame = frame.sort_values("position")
+
+    if dataset in TRADE_DATASETS:
+        return [
+            {
+                "country": country,
+                "quantity_kg": _optional(quantity),
+                "value_usd": _optional(value),
+                "subproducts": []
+            }
+            for country, quantity, value in zip(
+                frame["country"], frame["quantity_kg"], frame["value_usd"]
+            )
+        ]
+
+    field = QUANTITY_FIELDS[dataset]
+    data = []
+    current_product = None
+    for kind, product, text in zip(frame["kind"], frame["product"],
+                                   frame["quantity_text"]):
+        if kind == "total":
+            data.append({"total_overall": text})
+        elif kind == "item":
+            current_product = {"product": product, field: text,
+                               "subproducts": []}
+            data.append(current_product)
+        else:
+            current_product["subproducts"].append({
+                "product": product,
+                field: text
+            })
+    return data
+
+
+def page_path(dataset: str, year: int, category: Optional[str] = None,
+              root: Optional[str] = None) -> str:
+    """
+    Returns the Parquet file of a page. Pages are partitioned by category
+    (for datasets that have one) and year.
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        root (Optional[str]): Store directory. Defaults to
+            `settings.parquet_store_dir`.
+
+    Returns:
+        str: Path of the page's Parquet file.
+    """
+    parts = [root or settings.parquet_store_dir, dataset]
+    if category is not None:
+        parts.append(f"category={category}")
+    parts.append(f"year={year}")
+    return os.path.join(*parts, "part-0.parquet")
+
+
+def write_page(dataset: str, year: int, category: Optional[str],
+               data: list[dict], root: Optional[str] = None) -> str:
+    """
+    Stores a parsed page, replacing any previous version of it.
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        data (list[dict]): Output of the dataset's parser.
+        root (Optional[str]): Store directory.
+
+    Returns:
+        str: Path of the written file.
+    """
+    path = page_path(dataset, year, category, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    page_to_frame(dataset, data).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_page(dataset: str, year: int, category: Optional[str] = None,
+              root: Optional[str] = None) -> Optional[list[dict]]:
+    """
+    Loads a page from the store.
+
+    Args:
+        dataset (str): Dataset name.
+        year (int): Year of the page.
+        category (Optional[str]): Category, for datasets that have one.
+        root (Optional[str]): Store directory.
+
+    Returns:
+        Optional[list[dict]]: The parser output, or None if the page is not
+        in the store.
+    """
+    path = page_path(dataset, year, category, root)
+    if not os.path.exists(path):
+        return None
+    return frame_to_page(dataset, pd.read_parquet(path))
+
+
+def load_dataset(dataset: str, category: Optional[str] = None,
+                 years: Optional[list[int]] = None,
+                 root: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reads every stored page of a dataset as one table, with `year` (and
+    `category`, where applicable) as columns. Filters are pushed down to
+    the partition directories, so only the matching files are read.
+
+    Args:
+        dataset (str): Dataset name.
+        category (Optional[str]): Only read this category.
+        years (Optional[list[int]]): Only read these years.
+        root (Optional[str]): Store directory.
+
+    Returns:
+        pd.DataFrame: The concatenated pages (empty if nothing is stored).
+    """
+    path = os.path.join(root or settings.parquet_store_dir, dataset)
+    if not os.path.isdir(path):
+        return pd.DataFrame()
+
+    filters = []
+    if category is not None:
+        filters.append(("category", "=", category))
+    if years is not None:
+        filters.append(("year", "in", list(years)))
+
+    frame = pd.read_parquet(path, filters=filters or None)
+    # Partition values come back as categoricals; years are plain ints
+    frame["year"] = frame["year"].astype("int32")
+    return frame
+
+
+def _stored_fallback(error: HTTPException, dataset: str, year: int,
+                     category: Optional[str]) -> list[dict]:
+    """
+    Answers from the store when the scraper could not get the page from
+    Embrapa (503: upstream down, circuit open or request deadline spent).
+
+    Raises:
+        HTTPException: The original error, if it is not a 503 or the page
+            is not in the store.
+    """
+    if error.status_code != 503:
+        raise error
+    data = read_page(dataset, year, category)
+    if data is None:
+        raise error
+    print(f"[STALE] {dataset} {category or '-'} {year} unavailable, "
+          "serving the stored copy")
+    return data
+
+
+def served_from_store(dataset: str) -> Callable:
+    """
+    Decorator that answers a `get_*_data(year[, category])` function, sync
+    or async, from the Parquet store when `settings.data_source` is
+    "parquet". Pages missing from the store fall through to the scraper.
+
+    With the scraper as the data source, the store is the fallback: a page
+    Embrapa could not serve (503) is answered from its stored copy, if any.
+
+    Args:
+        dataset (str): Dataset name.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(year: int, *args) -> list[dict]:
+                category = args[0] if args else None
+                if settings.data_source == "parquet":
+                    data = await run_in_threadpool(
+                        read_page, dataset, year, category
+                    )
+                    if data is not None:
+                        return data
+                    return await func(year, *args)
+                try:
+                    return await func(year, *args)
+                except HTTPException as e:
+                    return await run_in_threadpool(
+                        _stored_fallback, e, dataset, year, category
+                    )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(year: int, *args) -> list[dict]:
+            category = args[0] if args else None
+            if settings.data_source == "parquet":
+                data = read_page(dataset, year, category)
+                if data is not None:
+                    return data
+                return func(year, *args)
+            try:
+                return func(year, *args)
+            except HTTPException as e:
+                return _stored_fallback(e, dataset, year, category)
+
+        return wrapper
+
+    return decorator
@@ -3,9 +3,13 @@ from .processamento_parser import parse_processamento
 from .producao_parser import parse_producao
 from .exportacao_parser import parse_exportacao
 from .importacao_parser import parse_importacao
+from .typed_page import ProductRecord, TypedPage, parse_quantity
 
 __all__ = ["parse_comercializacao",
            "parse_processamento",
            "parse_producao",
            "parse_exportacao",
-           "parse_importacao"]
\ No newline at end of file
+           "parse_importacao",
+           "ProductRecord",
+           "TypedPage",
+           "parse_quantity"]
\ No newline at end of file
@@ -1,5 +1,5 @@
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
+from .table_extractor import extract_table
 
 
 def parse_exportacao(html: str) -> list[dict]:
@@ -17,25 +17,22 @@ def parse_exportacao(html: str) -> list[dict]:
         HTTPException: If the data table is not found or
         contains only empty values.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    table = soup.find("table", class_="tb_base tb_dados")
-    if not table:
+    table = extract_table(html)
+    if table is None:
         raise HTTPException(status_code=404,
                             detail="Exportação table not found.")
 
     results = []
 
-    for row in table.find_all("tr"):
-        cols = row.find_all("td")
-        if len(cols) != 3:
+    for row in table.rows:
+        if len(row.cells) != 3:
             continue
 
-        country = cols[0].get_text(strip=True)
-        quantity = cols[1].get_text(strip=True) \
+        country = row.cells[0]
+        quantity = row.cells[1] \
             .replace(".", "") \
             .replace(",", ".")
-        value = cols[2].get_text(strip=True) \
+        value = row.cells[2] \
             .replace(".", "") \
             .replace(",", ".")
 
@@ -49,15 +46,12 @@ def parse_exportacao(html: str) -> list[dict]:
             "subproducts": []
         })
 
-    tfoot = table.find("tfoot", class_="tb_total")
-    if tfoot:
-        total_row = tfoot.find("tr")
-        total_cols = total_row.find_all("td")
-        if len(total_cols) == 3:
-            total_quantity = total_cols[1].get_text(strip=True) \
+    if table.footer and "tb_total" in table.footer_classes:
+        if len(table.footer) == 3:
+            total_quantity = table.footer[1] \
                 .replace(".", "") \
                 .replace(",", ".")
-            total_value = total_cols[2].get_text(strip=True) \
+            total_value = table.footer[2] \
                 .replace(".", "") \
                 .replace(",", ".")
 
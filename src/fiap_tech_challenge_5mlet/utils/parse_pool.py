@@ -0,0 +1,188 @@
+"""
+Optional process pool for the parse stage.
+
+Parsing is CPU-bound Python, so on the request threadpool one worker
+process parses on one core at a time. With `settings.parse_workers` set,
+pages are sent as UTF-8 bytes to a pool of warm worker processes and their
+parsed rows come back pickled. At most `parse_workers + parse_queue_size`
+pages are in the pool at once; further callers wait for a slot (up to
+`parse_queue_timeout_seconds`) and are then turned away with a 503, so a
+burst of cold pages cannot queue unbounded work.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from .table_extractor import extract_table
+
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_lock = threading.Lock()
+_stats = {"submitted": 0, "rejected": 0, "in_flight": 0, "capacity": 0}
+
+
+def _init_worker(backend: str) -> None:
+    """
+    Worker initializer: uses the parent's extraction backend and loads it
+    before the first page arrives.
+    """
+    settings.html_parser_backend = backend
+    extract_table("<table></table>")
+
+
+def _ready() -> bool:
+    return True
+
+
+def _parse_bytes(parse: Callable[[str], list[dict]], html: bytes,
+                 backend: str
+                 ) -> tuple[Optional[list[dict]], Optional[tuple]]:
+    """
+    Worker entry point: parses one page.
+
+    `HTTPException` cannot be unpickled in the parent, so the parser's
+    HTTP errors (e.g. the 404 of a page without data) are returned as
+    `(status_code, detail, headers)` for `run_parse` to raise again.
+
+    Returns:
+        tuple: The parsed payload and None, or None and the HTTP error.
+    """
+    settings.html_parser_backend = backend
+    try:
+        return parse(html.decode("utf-8")), None
+    except HTTPException as e:
+        return None, (e.status_code, e.detail, e.headers)
+
+
+def start_parse_pool(workers: Optional[int] = None
+                     ) -> Optional[ProcessPoolExecutor]:
+    """
+    Starts the worker processes, if the pool is enabled and not running,
+    and waits until every worker is up.
+
+    Args:
+        workers (Optional[int]): Number of processes. Defaults to
+            `settings.parse_workers`; 0 leaves the pool disabled.
+
+    Returns:
+        Optional[ProcessPoolExecutor]: The pool, or None when disabled.
+    """
+    global _pool, _slots
+    workers = settings.parse_workers if workers is None else workers
+    with _lock:
+        if _pool is not None or workers <= 0:
+            return _pool
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(
+                settings.parse_start_method),
+            initializer=_init_worker,
+            initargs=(settings.html_parser_backend,)
+        )
+        capacity = workers + settings.parse_queue_size
+        _slots = threading.BoundedSemaphore(capacity)
+        _stats["capacity"] = capacity
+        pool = _pool
+
+    # Spawn every worker now rather than on the first cold pages
+    for future in [pool.submit(_ready) for _ in range(workers)]:
+        future.result()
+    return pool
+
+
+def shutdown_parse_pool() -> None:
+    """
+    Stops the worker processes. The pool starts again on the next parse.
+    """
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def parse_pool_stats() -> dict:
+    """
+    Returns the pool counters.
+
+    Returns:
+        dict: Pages submitted, pages turned away, pages in the pool and the
+        pool's capacity (workers plus queue).
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def _broken(pool: ProcessPoolExecutor) -> None:
+    """
+    Drops a pool whose worker died, so the next parse starts a new one.
+    """
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_parse(parse: Callable[[str], list[dict]], html: str,
+              max_wait: Optional[float] = None) -> list[dict]:
+    """
+    Runs a parser in the process pool when `settings.parse_workers` is set,
+    or in the calling thread otherwise. Blocks until the page is parsed.
+
+    Args:
+        parse (Callable[[str], list[dict]]): A module-level parser from
+            `utils`.
+        html (str): The page HTML.
+        max_wait (Optional[float]): Time left to the request's deadline,
+            if any; the wait for room in the pool never goes past it.
+
+    Returns:
+        list[dict]: The parsed payload.
+
+    Raises:
+        HTTPException: Whatever the parser raises, or 503 if the pool stays
+            full for `settings.parse_queue_timeout_seconds` (or
+            `max_wait`).
+    """
+    pool = _pool or start_parse_pool()
+    if pool is None:
+        return parse(html)
+
+    timeout = settings.parse_queue_timeout_seconds
+    if max_wait is not None:
+        timeout = max(0.0, min(timeout, max_wait))
+
+    slots = _slots
+    if not slots.acquire(timeout=timeout):
+        with _lock:
+            _stats["rejected"] += 1
+        raise HTTPException(status_code=503,
+                            detail="Too many pages are being parsed, "
+                                   "retry later.",
+                            headers={"Retry-After": "1"})
+    with _lock:
+        _stats["submitted"] += 1
+        _stats["in_flight"] += 1
+    try:
+        data, error = pool.submit(_parse_bytes, parse, html.encode("utf-8"),
+                                  settings.html_parser_backend).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): parse this page here
+        _broken(pool)
+        return parse(html)
+    finally:
+        with _lock:
+            _stats["in_flight"] -= 1
+        slots.release()
+
+    if error is not None:
+        status_code, detail, headers = error
+        raise HTTPException(status_code=status_code, detail=detail,
+                            headers=headers)
+    return data
@@ -1,5 +1,5 @@
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
+from .table_extractor import extract_table
 
 
 def parse_processamento(html: str) -> list[dict]:
@@ -18,12 +18,9 @@ def parse_processamento(html: str) -> list[dict]:
         HTTPException: If the main data table is not found or all values are
         empty.
     """
-    # Convert the HTML into a BeautifulSoup object
-    soup = BeautifulSoup(html, "html.parser")
-
     # Locate the data table
-    table = soup.find("table", class_="tb_base tb_dados")
-    if not table:
+    table = extract_table(html)
+    if table is None:
         raise HTTPException(status_code=404,
                             detail="Data table not found.")
 
@@ -33,14 +30,12 @@ def parse_processamento(html: str) -> list[dict]:
     subproducts = []
 
     # Iterate through each row in the table
-    for row in table.find_all("tr"):
-        cols = row.find_all("td")
-        if len(cols) != 2:
+    for row in table.rows:
+        if len(row.cells) != 2:
             continue  # Skip malformed rows
 
-        name = cols[0].get_text(strip=True)
-        quantity = cols[1].get_text(strip=True)
-        cell_classes = cols[0].get("class", [])
+        name, quantity = row.cells
+        cell_classes = row.classes
 
         # Detect a main product row
         if "tb_item" in cell_classes:
@@ -86,12 +81,9 @@ def parse_processamento(html: str) -> list[dict]:
         )
 
     # Look for footer to obtain the total
-    tfoot = table.find("tfoot", class_="tb_total")
-    if tfoot:
-        total_row = tfoot.find("tr")
-        total_cols = total_row.find_all("td")
-        if len(total_cols) == 2:
-            total_value = total_cols[1].get_text(strip=True)
+    if table.footer and "tb_total" in table.footer_classes:
+        if len(table.footer) == 2:
+            total_value = table.footer[1]
             results.append({
                 "total_overall": total_value
             })
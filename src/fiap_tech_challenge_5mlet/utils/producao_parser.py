@@ -1,5 +1,5 @@
-from bs4 import BeautifulSoup
 from fastapi import HTTPException
+from .table_extractor import extract_table
 
 
 def parse_producao(html: str) -> list[dict]:
@@ -17,30 +17,24 @@ def parse_producao(html: str) -> list[dict]:
     Raises:
         HTTPException: If the data table is not found or all values are empty.
     """
-    # Convert HTML to BeautifulSoup object
-    soup = BeautifulSoup(html, "html.parser")
-
     # Locate the main data table
-    table = soup.find("table", class_="tb_base tb_dados")
-    if not table:
+    table = extract_table(html)
+    if table is None:
         raise HTTPException(status_code=404,
                             detail="Produção table not found.")
 
-    rows = table.find_all("tr")
     data = []
     current_product = None
 
     # Iterate through table rows
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) != 2:
+    for row in table.rows:
+        if len(row.cells) != 2:
             continue  # Skip malformed rows
 
-        name = cols[0].get_text(strip=True)
-        quantity = cols[1].get_text(strip=True)
+        name, quantity = row.cells
 
         # Identify main products
-        if 'tb_item' in cols[0].get('class', []):
+        if 'tb_item' in row.classes:
             current_product = {
                 "product": name,
                 "quantity_liters": quantity,
@@ -49,7 +43,7 @@ def parse_producao(html: str) -> list[dict]:
             data.append(current_product)
 
         # Identify subproducts linked to the current main product
-        elif 'tb_subitem' in cols[0].get('class', []) and current_product:
+        elif 'tb_subitem' in row.classes and current_product:
             current_product["subproducts"].append({
                 "product": name,
                 "quantity_liters": quantity
@@ -69,14 +63,10 @@ def parse_producao(html: str) -> list[dict]:
         )
 
     # Look for the total value in the footer
-    tfoot = table.find("tfoot")
-    if tfoot:
-        total_row = tfoot.find("tr")
-        total_cols = total_row.find_all("td") if total_row else []
-        if len(total_cols) == 2:
-            total_value = total_cols[1].get_text(strip=True)
-            data.append({
-                "total_overall": total_value
-            })
+    if table.footer and len(table.footer) == 2:
+        total_value = table.footer[1]
+        data.append({
+            "total_overall": total_value
+        })
 
     return data
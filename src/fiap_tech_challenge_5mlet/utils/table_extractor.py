@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import lxml.html
+from bs4 import BeautifulSoup
+
+from ..config import settings
+
+# Class attribute of the data table on every Embrapa tab
+DATA_TABLE_CLASS = "tb_base tb_dados"
+
+
+@dataclass
+class TableRow:
+    """
+    A row of the data table: the classes of its first cell and the stripped
+    text of every cell.
+    """
+    classes: list[str]
+    cells: list[str]
+
+
+@dataclass
+class TableData:
+    """
+    The parts of an Embrapa data table the parsers need: every row and the
+    first row of the footer, if any.
+    """
+    rows: list[TableRow] = field(default_factory=list)
+    footer_classes: Optional[list[str]] = None
+    footer: Optional[list[str]] = None
+
+
+def _extract_bs4(html: str) -> Optional[TableData]:
+    """
+    Extracts the data table with BeautifulSoup and the pure-Python
+    `html.parser`. Slow, but always available.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    table = soup.find("table", class_=DATA_TABLE_CLASS)
+    if not table:
+        return None
+
+    data = TableData()
+    for row in table.find_all("tr"):
+        cols = row.find_all("td")
+        data.rows.append(TableRow(
+            classes=cols[0].get("class", []) if cols else [],
+            cells=[col.get_text(strip=True) for col in cols]
+        ))
+
+    tfoot = table.find("tfoot")
+    if tfoot:
+        data.footer_classes = tfoot.get("class", [])
+        total_row = tfoot.find("tr")
+        data.footer = ([col.get_text(strip=True)
+                        for col in total_row.find_all("td")]
+                       if total_row else [])
+
+    return data
+
+
+def _lxml_text(element) -> str:
+    # Same as BeautifulSoup's get_text(strip=True)
+    return "".join(text.strip() for text in element.itertext())
+
+
+def _lxml_classes(element) -> list[str]:
+    return element.get("class", "").split()
+
+
+def _extract_lxml(html: str) -> Optional[TableData]:
+    """
+    Extracts the data table with lxml's C HTML parser.
+    """
+    document = lxml.html.fromstring(html)
+
+    tables = document.xpath(f"//table[@class='{DATA_TABLE_CLASS}']")
+    if not tables:
+        return None
+    table = tables[0]
+
+    data = TableData()
+    for row in table.iter("tr"):
+        cols = list(row.iter("td"))
+        data.rows.append(TableRow(
+            classes=_lxml_classes(cols[0]) if cols else [],
+            cells=[_lxml_text(col) for col in cols]
+        ))
+
+    tfoot = next(table.iter("tfoot"), None)
+    if tfoot is not None:
+        data.footer_classes = _lxml_classes(tfoot)
+        total_row = next(tfoot.iter("tr"), None)
+        data.footer = ([_lxml_text(col) for col in total_row.iter("td")]
+                       if total_row is not None else [])
+
+    return data
+
+
+BACKENDS: dict[str, Callable[[str], Optional[TableData]]] = {
+    "lxml": _extract_lxml,
+    "bs4": _extract_bs4
+}
+
+
+def extract_table(html: str,
+                  backend: Optional[str] = None) -> Optional[TableData]:
+    """
+    Extracts the rows and footer of the `table.tb_base.tb_dados` data table
+    from an Embrapa page.
+
+    Uses lxml unless BeautifulSoup is picked explicitly. Documents lxml
+    cannot handle are extracted with BeautifulSoup instead.
+
+    Args:
+        html (str): Raw HTML string from the Embrapa page.
+        backend (Optional[str]): "lxml", "bs4" or None to use the configured
+            default (`settings.html_parser_backend`). "auto" means lxml.
+
+    Returns:
+        Optional[TableData]: The extracted table, or None if the page has no
+        data table.
+    """
+    backend = backend or settings.html_parser_backend
+    extract = BACKENDS.get(backend, _extract_lxml)
+    try:
+        return extract(html)
+    except ValueError:
+        # e.g. lxml refuses str input with an XML encoding declaration
+        return _extract_bs4(html)
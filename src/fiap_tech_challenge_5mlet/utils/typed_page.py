@@ -0,0 +1,165 @@
+import sys
+from array import array
+from typing import Iterator, Optional
+
+# Datasets whose pages are a product/subproduct tree, and the name of their
+# quantity field in the parsed output
+QUANTITY_FIELDS = {
+    "producao": "quantity_liters",
+    "processamento": "quantity_kg",
+    "comercializacao": "quantity_liters"
+}
+
+# Stored in the quantity column for "-" (no value)
+_MISSING = -(2 ** 63)
+
+# Parent of main products in the parent column
+_NO_PARENT = -1
+
+
+def parse_quantity(text: str) -> Optional[int]:
+    """
+    Converts a pt-BR formatted integer ("1.234.567") to an int.
+
+    Args:
+        text (str): Quantity as shown on the Embrapa page.
+
+    Returns:
+        Optional[int]: The number, or None for "-" and unparseable values.
+    """
+    try:
+        return int(text.replace(".", ""))
+    except ValueError:
+        return None
+
+
+def _stored(text: str) -> int:
+    quantity = parse_quantity(text)
+    return _MISSING if quantity is None else quantity
+
+
+def _loaded(value: int) -> Optional[int]:
+    return None if value == _MISSING else value
+
+
+class ProductRecord:
+    """
+    One row of a typed page: a main product or one of its subproducts.
+    """
+    __slots__ = ("product", "quantity", "parent")
+
+    def __init__(self, product: str, quantity: Optional[int],
+                 parent: Optional[str]):
+        self.product = product
+        self.quantity = quantity
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return (f"ProductRecord({self.product!r}, {self.quantity!r}, "
+                f"{self.parent!r})")
+
+
+class TypedPage:
+    """
+    Compact, typed copy of a product page (produção, processamento or
+    comercialização).
+
+    Rows are stored column-wise, in page order: interned product names, a
+    64-bit integer array of quantities and an array with the position of
+    each subproduct's main product. The parsed page needs one dict per
+    product and subproduct plus their pt-BR strings; this needs a few
+    arrays per page.
+
+    `total` is None when the page has no total block.
+    """
+    __slots__ = ("dataset", "names", "quantities", "parents", "total")
+
+    def __init__(self, dataset: str, names: tuple[str, ...],
+                 quantities: array, parents: array, total: Optional[int]):
+        self.dataset = dataset
+        self.names = names
+        self.quantities = quantities
+        self.parents = parents
+        self.total = total
+
+    @classmethod
+    def from_rows(cls, dataset: str, data: list[dict]) -> "TypedPage":
+        """
+        Builds a typed page from the output of the dataset's parser.
+
+        Args:
+            dataset (str): Dataset name (e.g. "producao").
+            data (list[dict]): Parsed page, with pt-BR quantity strings.
+
+        Returns:
+            TypedPage: The typed page.
+        """
+        field = QUANTITY_FIELDS[dataset]
+        names, quantities, parents = [], array("q"), array("i")
+        total = None
+
+        def add(name: str, text: str, parent: int) -> None:
+            names.append(sys.intern(name))
+            quantities.append(_stored(text))
+            parents.append(parent)
+
+        for item in data:
+            if "total_overall" in item:
+                total = _stored(item["total_overall"])
+                continue
+            position = len(names)
+            add(item["product"], item[field], _NO_PARENT)
+            for sub in item.get("subproducts", ()):
+                add(sub["product"], sub[field], position)
+
+        return cls(dataset, tuple(names), quantities, parents, total)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __sizeof__(self) -> int:
+        # Names are interned, so only the tuple holding them is counted
+        return (object.__sizeof__(self) + sys.getsizeof(self.names)
+                + sys.getsizeof(self.quantities)
+                + sys.getsizeof(self.parents))
+
+    def quantity(self, position: int) -> Optional[int]:
+        """
+        Returns the quantity of a row, or None for "-".
+        """
+        return _loaded(self.quantities[position])
+
+    def records(self) -> Iterator[ProductRecord]:
+        """
+        Yields the rows of the page in order.
+        """
+        for position, name in enumerate(self.names):
+            parent = self.parents[position]
+            yield ProductRecord(
+                name, self.quantity(position),
+                None if parent == _NO_PARENT else self.names[parent]
+            )
+
+    def to_rows(self) -> list[dict]:
+        """
+        Returns the page in the parser's shape, with integer quantities
+        (None for "-") instead of pt-BR strings.
+
+        Returns:
+            list[dict]: Main products with their subproducts, followed by
+            the total block when the page has one.
+        """
+        field = QUANTITY_FIELDS[self.dataset]
+        rows, items = [], {}
+        for position, name in enumerate(self.names):
+            row = {"product": name, field: self.quantity(position)}
+            parent = self.parents[position]
+            if parent == _NO_PARENT:
+                row["subproducts"] = []
+                items[position] = row
+                rows.append(row)
+            else:
+                items[parent]["subproducts"].append(row)
+        if self.total is not None:
+            rows.append({"total_overall": _loaded(self.total)})
+        return rows
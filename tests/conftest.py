@@ -0,0 +1,79 @@
+import os
+import shutil
+import socket
+
+import pytest
+
+# Required settings, normally read from .env
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("TEST_USERNAME", "admin")
+os.environ.setdefault("TEST_PASSWORD", "secret")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(REPO_ROOT, "cache")
+
+
+@pytest.fixture
+def silent_upstream():
+    """
+    Yields the base URL of a server that accepts connections and never
+    answers, so every request to it hangs until its timeout.
+    """
+    sink = socket.socket()
+    sink.bind(("127.0.0.1", 0))
+    sink.listen(100)
+    try:
+        yield f"http://127.0.0.1:{sink.getsockname()[1]}/index.php"
+    finally:
+        sink.close()
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """
+    Serves a copy of the repo's cached pages as a local stand-in for
+    Embrapa, with an empty page cache in front of it.
+    """
+    from fiap_tech_challenge_5mlet.config import settings
+    from fiap_tech_challenge_5mlet.scraper import (
+        LocalUpstreamServer,
+        make_cache_backend,
+        set_cache_backend
+    )
+    from fiap_tech_challenge_5mlet.scraper.result_cache import clear_caches
+
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    for page in os.listdir(CACHE_DIR):
+        if page.endswith(".html"):
+            shutil.copy(os.path.join(CACHE_DIR, page), fixtures)
+
+    with LocalUpstreamServer(str(fixtures)) as server:
+        monkeypatch.setattr(settings, "embrapa_base_url", server.base_url)
+        monkeypatch.setattr(settings, "embrapa_download_url",
+                            server.download_url)
+        set_cache_backend(make_cache_backend(
+            "sqlite", cache_dir=str(tmp_path / "cache")
+        ))
+        clear_caches()
+        try:
+            yield server
+        finally:
+            set_cache_backend(None)
+            clear_caches()
+
+
+@pytest.fixture
+def client(upstream):
+    """
+    Yields an API test client and the headers of a logged-in user.
+    """
+    from fastapi.testclient import TestClient
+    from fiap_tech_challenge_5mlet.app import app
+
+    with TestClient(app) as test_client:
+        token = test_client.post("/login", json={
+            "username": os.environ["TEST_USERNAME"],
+            "password": os.environ["TEST_PASSWORD"]
+        }).json()["access_token"]
+        yield test_client, {"Authorization": f"Bearer {token}"}
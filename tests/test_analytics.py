@@ -0,0 +1,68 @@
+import math
+
+import pandas as pd
+import pytest
+
+from fiap_tech_challenge_5mlet.store import analytics
+
+
+def _rows(*rows):
+    return pd.DataFrame(rows, columns=["year", "category", "country",
+                                       "quantity_kg", "value_usd"])
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """
+    Serves a small importação table instead of the Parquet store. 2021 is
+    missing from Embrapa, and Chile's 2020 cell is "-" (stored as NaN).
+    """
+    frame = _rows(
+        (2019, "vinhos", "Chile", 10.0, 100.0),
+        (2019, "espumantes", "Chile", 5.0, 50.0),
+        (2019, "vinhos", "Italia", 4.0, 40.0),
+        (2020, "vinhos", "Chile", None, None),
+        (2020, "espumantes", "Chile", None, None),
+        (2020, "vinhos", "Italia", 6.0, 60.0),
+        (2022, "vinhos", "Chile", 20.0, 200.0),
+        (2022, "vinhos", "Italia", 3.0, 30.0),
+        (2022, "vinhos", "Total", 23.0, 230.0),
+    )
+    monkeypatch.setattr(analytics, "load_dataset",
+                        lambda dataset, category=None: frame)
+    analytics._matrix_cache.clear()
+    yield
+    analytics._matrix_cache.clear()
+
+
+def test_missing_cells_stay_nan(stored):
+    matrix = analytics.year_entity_matrix("importacao")
+
+    assert list(matrix.index) == [2019, 2020, 2022]
+    assert list(matrix.columns) == ["Chile", "Italia"]
+    assert matrix.loc[2019, "Chile"] == 150.0
+    assert math.isnan(matrix.loc[2020, "Chile"])
+
+
+def test_totals_skip_missing_years(stored):
+    matrix = analytics.year_entity_matrix("importacao")
+    totals = {row["entity"]: row
+              for row in analytics.totals(matrix, agg="mean")}
+
+    assert totals["Chile"] == {"entity": "Chile", "value": 175.0,
+                               "years": 2}
+    assert totals["Italia"]["years"] == 3
+
+
+def test_growth_is_not_computed_across_missing_years(stored):
+    matrix = analytics.year_entity_matrix("importacao")
+    rows = {(row["entity"], row["year"]): row
+            for row in analytics.growth(matrix)}
+
+    assert rows[("Italia", 2020)]["delta"] == 20.0
+    assert rows[("Italia", 2020)]["growth_pct"] == 50.0
+    # "-" in 2020: no value, and no change into or out of it
+    assert rows[("Chile", 2020)]["value"] is None
+    assert rows[("Chile", 2020)]["delta"] is None
+    # 2021 is not on Embrapa: 2022 has nothing to compare with
+    assert rows[("Italia", 2022)]["delta"] is None
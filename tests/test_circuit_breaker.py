@@ -0,0 +1,104 @@
+import asyncio
+import contextvars
+import time
+
+import pytest
+
+from fiap_tech_challenge_5mlet.scraper import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    close_async_client,
+    html_fetcher,
+    make_cache_backend,
+    start_deadline
+)
+
+
+def _half_open(reset_seconds: float) -> CircuitBreaker:
+    """
+    Returns a breaker that opened on its first failure and is now due to
+    turn half-open.
+    """
+    breaker = CircuitBreaker("test", failure_threshold=1,
+                             reset_seconds=reset_seconds)
+    breaker.failure()
+    time.sleep(reset_seconds)
+    return breaker
+
+
+def test_opens_after_threshold_and_closes_on_probe_success():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.1)
+    assert breaker.check() is False
+    breaker.failure()
+    breaker.failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    time.sleep(0.1)
+    assert breaker.check() is True
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
+    breaker.success()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+
+
+def test_one_probe_at_a_time_while_half_open():
+    breaker = _half_open(0.1)
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_released_probe_gives_its_slot_back():
+    breaker = _half_open(0.1)
+    breaker.check()
+    breaker.release()
+    assert breaker.check() is True
+
+
+def test_lost_probe_slot_expires_after_reset_seconds():
+    breaker = _half_open(0.1)
+    breaker.check()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    time.sleep(0.1)
+    assert breaker.check() is True
+
+
+def test_cancelled_probe_does_not_wedge_the_circuit(
+        silent_upstream, tmp_path, monkeypatch):
+    breaker = _half_open(0.5)
+    monkeypatch.setattr(html_fetcher, "upstream_breaker", breaker)
+    backend = make_cache_backend("files", cache_dir=str(tmp_path))
+
+    async def cancel_probe():
+        probe = asyncio.ensure_future(html_fetcher._fetch_async(
+            f"{silent_upstream}?opcao=opt_02&ano=2000", backend,
+            "producao_2000.html"
+        ))
+        await asyncio.sleep(0.1)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        await close_async_client()
+
+    asyncio.run(cancel_probe())
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
+    assert breaker.check() is True
+
+
+def test_deadline_exceeded_while_half_open_keeps_the_probe_slot(
+        silent_upstream, tmp_path, monkeypatch):
+    breaker = _half_open(0.5)
+    monkeypatch.setattr(html_fetcher, "upstream_breaker", breaker)
+    backend = make_cache_backend("files", cache_dir=str(tmp_path))
+
+    def fetch_out_of_time():
+        start_deadline(0.01)
+        time.sleep(0.02)
+        html_fetcher._fetch(f"{silent_upstream}?opcao=opt_02&ano=2000",
+                            backend, "producao_2000.html")
+
+    with pytest.raises(DeadlineExceeded):
+        contextvars.copy_context().run(fetch_out_of_time)
+    assert breaker.check() is True
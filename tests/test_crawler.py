@@ -0,0 +1,62 @@
+import os
+
+from conftest import CACHE_DIR
+from fiap_tech_challenge_5mlet.config import settings
+from fiap_tech_challenge_5mlet.crawler import build_tasks, crawl, main
+from fiap_tech_challenge_5mlet.scraper import CircuitBreaker, html_fetcher
+
+
+def test_build_tasks_covers_every_category_and_year():
+    tasks = build_tasks(2019, 2020, ["importacao", "producao"])
+    assert len(tasks) == 5 * 2 + 2
+    assert {task.cache_filename for task in tasks} >= {
+        "importacao_espumantes_2019.html", "producao_2020.html"
+    }
+
+
+def test_crawl_fetches_missing_pages_and_resumes(upstream, tmp_path):
+    cache_dir = str(tmp_path / "warm")
+    available = {task.cache_filename
+                 for task in build_tasks(2019, 2020, ["importacao"])
+                 if os.path.exists(os.path.join(CACHE_DIR,
+                                                task.cache_filename))}
+
+    report = crawl(2019, 2020, ["importacao"], cache_dir=cache_dir,
+                   workers=4, verbose=False)
+    assert report.total == 10
+    assert report.fetched == len(available)
+    assert not {task.cache_filename for task in report.failed} & available
+
+    # Pages cached by the first run are not fetched again
+    served = upstream.requests
+    report = crawl(2019, 2020, ["importacao"], cache_dir=cache_dir,
+                   workers=4, verbose=False)
+    assert report.skipped == len(available)
+    assert report.fetched == 0
+    assert upstream.requests == served + len(report.failed)
+
+
+def test_main_exits_with_failures(upstream, tmp_path):
+    argv = ["--start-year", "2023", "--end-year", "2023",
+            "--cache-dir", str(tmp_path / "warm")]
+    assert main(argv + ["--datasets", "producao"]) == 0
+    assert main(argv + ["--datasets", "processamento"]) == 1
+
+
+def test_crawl_stops_when_the_circuit_opens(silent_upstream, tmp_path,
+                                            monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(html_fetcher, "upstream_breaker", breaker)
+    monkeypatch.setattr(settings, "embrapa_base_url", silent_upstream)
+    monkeypatch.setattr(settings, "upstream_timeout_seconds", 0.2)
+    monkeypatch.setattr(settings, "upstream_max_attempts", 1)
+
+    report = crawl(2000, 2009, ["producao"], cache_dir=str(tmp_path),
+                   workers=1, verbose=False)
+
+    assert report.stopped
+    assert report.fetched == 0
+    assert len(report.failed) == report.total == 10
+    # One timed-out request opened the circuit, one was turned away
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 1
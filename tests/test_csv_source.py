@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from conftest import CACHE_DIR
+from fiap_tech_challenge_5mlet.scraper.csv_source import (
+    HTML_PARSERS,
+    parse_csv,
+)
+
+# Trimmed downloads in Embrapa's layout: "id;control;produto;<year>..." for
+# products, "Id;País;<year>;<year>..." (quantity, then value) for trade, with
+# missing values written as "0" or "-"
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _read_csv(dataset, filename):
+    with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as f:
+        return parse_csv(dataset, f)
+
+
+def _html_page(dataset, page):
+    with open(os.path.join(CACHE_DIR, page), encoding="utf-8") as f:
+        return HTML_PARSERS[dataset](f.read())
+
+
+def test_product_download_matches_the_html_page():
+    pages = _read_csv("producao", "Producao.csv")
+
+    assert list(pages) == [2023]
+    assert pages[2023] == _html_page("producao", "producao_2023.html")
+
+
+@pytest.mark.parametrize("year", [2022, 2023])
+def test_trade_download_matches_the_html_page(year):
+    pages = _read_csv("importacao", "ImpVinhos.csv")
+
+    assert sorted(pages) == [2022, 2023]
+    assert pages[year] == _html_page(
+        "importacao", f"importacao_vinhos_de_mesa_{year}.html")
+
+
+def test_trade_download_pairs_the_duplicated_year_columns():
+    pages = _read_csv("importacao", "ImpVinhos.csv")
+    countries = {year: {row["country"]: row for row in page}
+                 for year, page in pages.items()}
+
+    assert countries[2022]["Chile"]["quantity_kg"] == 73111416.0
+    assert countries[2022]["Chile"]["value_usd"] == 199874777.0
+    assert countries[2023]["Chile"]["quantity_kg"] == 62358765.0
+    assert countries[2023]["Chile"]["value_usd"] == 170146247.0
+    # "-" and "0" cells leave the country out of that year's page
+    assert "Arábia Saudita" not in countries[2022]
+    assert "Armênia" not in countries[2022]
+    assert "Turquia" not in countries[2023]
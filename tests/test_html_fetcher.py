@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+import pytest
+
+from fiap_tech_challenge_5mlet.config import settings
+from fiap_tech_challenge_5mlet.metrics import CACHE_EVENTS, UPSTREAM_REQUESTS
+from fiap_tech_challenge_5mlet.scraper import (
+    DATASETS,
+    CircuitBreaker,
+    CircuitOpenError,
+    close_async_client,
+    html_fetcher,
+    make_cache_backend
+)
+
+KEY = "producao_2023.html"
+
+
+@pytest.fixture
+def page(upstream, tmp_path):
+    """
+    Returns the URL of the 2023 producao page on the local upstream and an
+    empty page cache.
+    """
+    spec = DATASETS["producao"]
+    url, key = spec.build_request(*spec.args(2023, None))
+    assert key == KEY
+    return url, make_cache_backend("sqlite",
+                                   cache_dir=str(tmp_path / "pages"))
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_miss_fetches_once_then_hits_the_cache(upstream, page):
+    url, backend = page
+    hits = CACHE_EVENTS.value("producao", "page", "hit")
+    misses = CACHE_EVENTS.value("producao", "page", "miss")
+
+    first = html_fetcher.fetch_or_cache(url, KEY, backend)
+    second = html_fetcher.fetch_or_cache(url, KEY, backend)
+
+    assert first == second
+    assert upstream.requests == 1
+    assert CACHE_EVENTS.value("producao", "page", "miss") == misses + 1
+    assert CACHE_EVENTS.value("producao", "page", "hit") == hits + 1
+
+
+def test_concurrent_async_misses_fetch_the_page_once(upstream, page):
+    url, backend = page
+
+    async def fetch_all():
+        try:
+            return await asyncio.gather(*[
+                html_fetcher.fetch_or_cache_async(url, KEY, backend)
+                for _ in range(5)
+            ])
+        finally:
+            await close_async_client()
+
+    pages = asyncio.run(fetch_all())
+
+    assert len(set(pages)) == 1
+    assert upstream.requests == 1
+
+
+def test_revalidating_an_unchanged_page_costs_a_304(upstream, page):
+    url, backend = page
+    html = html_fetcher.fetch_or_cache(url, KEY, backend)
+    assert backend.get(KEY).etag
+    fetched_at = backend.get(KEY).fetched_at
+    not_modified = UPSTREAM_REQUESTS.value("producao", "not_modified")
+
+    time.sleep(0.01)
+    assert html_fetcher.revalidate(url, KEY, backend) == html
+
+    assert upstream.requests == 2
+    assert UPSTREAM_REQUESTS.value("producao", "not_modified") \
+        == not_modified + 1
+    assert backend.get(KEY).fetched_at > fetched_at
+
+
+def test_stale_page_is_served_and_refreshed_in_the_background(
+        upstream, page, tmp_path):
+    url, backend = page
+    html = html_fetcher.fetch_or_cache(url, KEY, backend)
+    refreshed = []
+
+    def on_refresh():
+        refreshed.append(1)
+
+    # The upstream page changes; the stale copy is still served right away
+    fixture = tmp_path / "fixtures" / KEY
+    fixture.write_text(html.replace("VINHO DE MESA", "VINHO NOVO"),
+                       encoding="utf-8")
+    served = html_fetcher.fetch_or_cache(url, KEY, backend, max_age=0,
+                                         on_refresh=on_refresh)
+    assert served == html
+
+    _wait_for(lambda: refreshed)
+    assert upstream.requests == 2
+    assert "VINHO NOVO" in backend.get(KEY).html
+    assert html_fetcher.fetch_or_cache(url, KEY, backend) \
+        == backend.get(KEY).html
+
+
+def test_circuit_opens_then_half_opens_with_one_probe(
+        upstream, page, silent_upstream, monkeypatch):
+    url, backend = page
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.3)
+    monkeypatch.setattr(html_fetcher, "upstream_breaker", breaker)
+    monkeypatch.setattr(settings, "upstream_timeout_seconds", 0.1)
+    monkeypatch.setattr(settings, "upstream_max_attempts", 1)
+    down_url = f"{silent_upstream}?opcao=opt_02&ano=2023"
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            html_fetcher.fetch_or_cache(down_url, KEY, backend)
+    assert breaker.stats()["state"] == CircuitBreaker.OPEN
+
+    # Open: fails fast without reaching any upstream
+    with pytest.raises(CircuitOpenError):
+        html_fetcher.fetch_or_cache(url, KEY, backend)
+    assert upstream.requests == 0
+
+    # Half-open: one probe goes through and its success closes the circuit
+    time.sleep(0.3)
+    assert html_fetcher.fetch_or_cache(url, KEY, backend)
+    assert upstream.requests == 1
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
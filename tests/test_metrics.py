@@ -0,0 +1,44 @@
+import re
+import threading
+import time
+
+from fiap_tech_challenge_5mlet.scraper import fetch_flight
+
+
+def _coalesced(metrics: str) -> float:
+    match = re.search(
+        r'^single_flight\{flight="fetch",counter="coalesced"\} (\S+)$',
+        metrics, re.MULTILINE
+    )
+    assert match is not None
+    return float(match.group(1))
+
+
+def test_single_flight_coalescing_is_exported(client):
+    test_client, _ = client
+    before = _coalesced(test_client.get("/metrics").text)
+
+    started, release = threading.Event(), threading.Event()
+
+    def leader():
+        started.set()
+        release.wait(5)
+        return "page"
+
+    threads = [threading.Thread(
+        target=fetch_flight.do, args=("metrics-test", leader)
+    )]
+    threads[0].start()
+    started.wait(5)
+    for _ in range(2):
+        threads.append(threading.Thread(
+            target=fetch_flight.do, args=("metrics-test", leader)
+        ))
+        threads[-1].start()
+    while fetch_flight.stats()["coalesced"] < before + 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert _coalesced(test_client.get("/metrics").text) == before + 2
@@ -0,0 +1,34 @@
+from fiap_tech_challenge_5mlet.api.page_query import PageIndex, PageQuery
+
+ROWS = [
+    {"country": "Alemanha", "quantity_kg": 10, "value_usd": 30},
+    {"country": "África do Sul", "quantity_kg": 5, "value_usd": 20},
+    {"country": "Argentina", "quantity_kg": 20, "value_usd": 10},
+    {"country": "Total", "quantity_kg": 35, "value_usd": 60},
+]
+
+
+def _countries(query: PageQuery) -> list[str]:
+    return [row["country"]
+            for row in PageIndex("importacao", ROWS).query(query)]
+
+
+def test_exact_names_compare_the_raw_text():
+    assert _countries(PageQuery(names=("África do Sul",))) == [
+        "África do Sul"
+    ]
+    assert _countries(PageQuery(names=("africa do sul",))) == []
+    assert _countries(PageQuery(names=("ALEMANHA", "Argentina"))) == [
+        "Argentina"
+    ]
+
+
+def test_prefix_ignores_case_and_accents():
+    assert _countries(PageQuery(prefix="afr")) == ["África do Sul"]
+    assert _countries(PageQuery(prefix="A", sort="country")) == [
+        "África do Sul", "Alemanha", "Argentina"
+    ]
+
+
+def test_totals_are_not_indexed():
+    assert _countries(PageQuery(names=("Total",))) == []
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from conftest import CACHE_DIR
+from fiap_tech_challenge_5mlet.config import settings
+from fiap_tech_challenge_5mlet.utils import (
+    parse_pool,
+    parse_processamento,
+    parse_producao
+)
+
+
+def _page(name: str) -> str:
+    with open(os.path.join(CACHE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(settings, "parse_workers", 1)
+    pool = parse_pool.start_parse_pool()
+    try:
+        yield pool
+    finally:
+        parse_pool.shutdown_parse_pool()
+
+
+def test_pool_parses_like_the_calling_thread(pool):
+    html = _page("producao_2023.html")
+    assert parse_pool.run_parse(parse_producao, html) == parse_producao(html)
+
+
+def test_empty_tab_404_keeps_the_pool(pool):
+    html = _page("processamento_espumantes_200.html")
+    with pytest.raises(HTTPException) as raised:
+        parse_processamento(html)
+
+    with pytest.raises(HTTPException) as from_pool:
+        parse_pool.run_parse(parse_processamento, html)
+    assert from_pool.value.status_code == raised.value.status_code == 404
+    assert from_pool.value.detail == raised.value.detail
+    # The worker is still in use, not torn down as broken
+    assert parse_pool._pool is pool
+    assert parse_pool.parse_pool_stats()["submitted"] >= 1
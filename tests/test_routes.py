@@ -0,0 +1,55 @@
+def test_cached_page_matches_the_fetched_one(client):
+    test_client, headers = client
+    first = test_client.get("/producao?year=2023", headers=headers)
+    second = test_client.get("/producao?year=2023", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()[0]["product"]
+    assert first.headers["ETag"] == second.headers["ETag"]
+
+
+def test_repeat_request_is_served_from_memory(client):
+    from fiap_tech_challenge_5mlet.metrics import CACHE_EVENTS
+
+    test_client, headers = client
+    test_client.get("/comercializacao?year=2023", headers=headers)
+    page_misses = CACHE_EVENTS.value("comercializacao", "page", "miss")
+    hits = CACHE_EVENTS.value("comercializacao", "response", "hit")
+
+    response = test_client.get("/comercializacao?year=2023",
+                               headers=headers)
+
+    assert response.status_code == 200
+    assert CACHE_EVENTS.value("comercializacao", "response", "hit") \
+        == hits + 1
+    # Neither the page cache nor the upstream was asked again
+    assert CACHE_EVENTS.value("comercializacao", "page", "miss") \
+        == page_misses
+
+
+def test_conditional_get_answers_304(client):
+    test_client, headers = client
+    response = test_client.get("/importacao?year=2023&category=espumantes",
+                               headers=headers)
+    etag = response.headers["ETag"]
+
+    response = test_client.get(
+        "/importacao?year=2023&category=espumantes",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_multi_year_request_reports_each_year(client):
+    test_client, headers = client
+    response = test_client.get(
+        "/importacao?years=2019&years=2020&years=2021&category=espumantes",
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["year"] for item in body["years"]] == [2019, 2020]
+    assert [error["year"] for error in body["errors"]] == [2021]
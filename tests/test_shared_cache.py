@@ -0,0 +1,114 @@
+import importlib
+import time
+
+import pytest
+
+from fiap_tech_challenge_5mlet.scraper.resp_server import LocalRespServer
+from fiap_tech_challenge_5mlet.scraper.result_cache import (
+    cached_result,
+    clear_caches,
+)
+from fiap_tech_challenge_5mlet.scraper.shared_cache import SharedCache
+
+# The package re-exports a `result_cache` instance under the module's name
+result_module = importlib.import_module(
+    "fiap_tech_challenge_5mlet.scraper.result_cache")
+
+PAGE = [{"product": "VINHO DE MESA", "quantity": "169.762.429"}]
+
+
+@pytest.fixture
+def resp_server():
+    with LocalRespServer() as server:
+        yield server
+
+
+@pytest.fixture
+def stopped_server_url():
+    server = LocalRespServer().start()
+    url = server.url
+    server.stop()
+    return url
+
+
+@pytest.fixture
+def use_shared_cache(monkeypatch):
+    """
+    Plugs a shared cache into the result cache decorator, with empty
+    in-process caches before and after the test.
+    """
+    def use(cache):
+        monkeypatch.setattr(result_module, "shared_cache", cache)
+        clear_caches()
+
+    yield use
+    clear_caches()
+
+
+def _loader(calls):
+    @cached_result("producao")
+    def get_data(year):
+        calls.append(year)
+        return PAGE
+    return get_data
+
+
+def test_set_then_get_round_trips_with_the_ttl(resp_server):
+    cache = SharedCache(resp_server.url, ttl_seconds=60, prefix="test")
+
+    cache.set(("producao", None, 2023), PAGE)
+
+    assert cache.get(("producao", None, 2023)) == PAGE
+    ttl = cache.client.execute("TTL", "test:producao:-:2023")
+    assert 0 < ttl <= 60
+    assert cache.stats()["hits"] == 1
+
+
+def test_entry_expires_after_its_ttl(resp_server):
+    cache = SharedCache(resp_server.url, ttl_seconds=60, prefix="test")
+
+    cache.set(("producao", None, 2023), PAGE, ttl_seconds=1)
+    time.sleep(1.1)
+
+    assert cache.get(("producao", None, 2023)) is None
+
+
+def test_unknown_key_is_a_miss(resp_server):
+    cache = SharedCache(resp_server.url, ttl_seconds=60, prefix="test")
+
+    assert cache.get(("producao", None, 1999)) is None
+    stats = cache.stats()
+    assert (stats["misses"], stats["errors"], stats["down"]) == (1, 0, False)
+
+
+def test_other_node_is_served_from_the_shared_cache(resp_server,
+                                                    use_shared_cache):
+    calls = []
+    get_data = _loader(calls)
+    use_shared_cache(SharedCache(resp_server.url, ttl_seconds=60,
+                                 prefix="test"))
+    assert get_data(2023) == PAGE
+
+    # A fresh process: empty in-process caches, same shared server
+    clear_caches()
+    assert get_data(2023) == PAGE
+    assert calls == [2023]
+
+
+def test_server_down_falls_back_to_the_in_process_cache(stopped_server_url,
+                                                        use_shared_cache):
+    cache = SharedCache(stopped_server_url, ttl_seconds=60, prefix="test",
+                        timeout=0.2, retry_seconds=30)
+    use_shared_cache(cache)
+    calls = []
+    get_data = _loader(calls)
+
+    assert get_data(2023) == PAGE
+    assert get_data(2023) == PAGE
+
+    # Loaded once, then served from memory; the server was given up on
+    # after the first failure instead of on every call
+    assert calls == [2023]
+    stats = cache.stats()
+    assert stats["down"] is True
+    assert stats["errors"] == 1
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fiap_tech_challenge_5mlet.scraper.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "page"
+
+    results = []
+    threads = [threading.Thread(
+        target=lambda: results.append(flight.do("key", work))
+    ) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["coalesced"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["page"] * 3
+    assert len(calls) == 1
+
+
+def test_cancelled_async_leader_hands_over_to_a_waiter():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.2 if len(runs) == 1 else 0)
+        return f"run {len(runs)}"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do_async("key", work))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(flight.do_async("key", work))
+                   for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(scenario()) == ["run 2", "run 2"]
+    assert flight.stats()["in_flight"] == 0
+
+
+class _Interrupt(BaseException):
+    pass
+
+
+def test_interrupted_sync_leader_hands_over_to_a_waiter():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait(5)
+        raise _Interrupt()
+
+    def leader():
+        with pytest.raises(_Interrupt):
+            flight.do("key", interrupted)
+
+    results = []
+    leader_thread = threading.Thread(target=leader)
+    leader_thread.start()
+    started.wait(5)
+    waiter = threading.Thread(
+        target=lambda: results.append(flight.do("key", lambda: "page"))
+    )
+    waiter.start()
+    while flight.stats()["coalesced"] < 1:
+        time.sleep(0.01)
+    release.set()
+    leader_thread.join()
+    waiter.join()
+
+    assert results == ["page"]
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail)
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,27 @@
+import os
+import shutil
+
+from conftest import CACHE_DIR
+from fiap_tech_challenge_5mlet.scraper import (
+    SqliteCacheBackend,
+    load_year_catalog,
+    make_cache_backend,
+    year_catalog
+)
+
+
+def test_purge_keeps_the_legacy_html_files(tmp_path):
+    for page in ("processamento_espumantes_2020.html",
+                 "processamento_espumantes_200.html"):
+        shutil.copy(os.path.join(CACHE_DIR, page), tmp_path)
+    backend = make_cache_backend("sqlite", cache_dir=str(tmp_path))
+    # Imported into the database on first read
+    assert backend.get("processamento_espumantes_200.html") is not None
+
+    load_year_catalog(backend)
+
+    assert year_catalog.years("processamento") == (1970, 2024)
+    assert os.path.exists(tmp_path / "processamento_espumantes_200.html")
+    assert SqliteCacheBackend(backend.db_path).keys() == [
+        "processamento_espumantes_2020.html"
+    ]